@@ -1,9 +1,21 @@
-import uuid, logging, json, time
-from flask import Flask, request, jsonify, send_from_directory
 import asyncio
+import inspect
+import uuid, logging, json, time
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
+import atexit
 import os
 from pathlib import Path
-from utils import MCPClient, GraphRAG, ChatAgent, Preprocess, CompanyInsightsScraper
+from utils import (
+    MCPClient,
+    GraphRAG,
+    ChatAgent,
+    Preprocess,
+    CompanyInsightsScraper,
+    BackgroundEventLoop,
+    InputBlockedError,
+    METRICS,
+    openai_clients,
+)
 from werkzeug.utils import secure_filename
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
@@ -26,6 +38,10 @@ AWS_ENDPOINT_URL = os.environ.get("AWS_ENDPOINT_URL")  # e.g. http://localhost:4
 S3_BUCKET_RESUMES = os.environ.get("S3_BUCKET_RESUMES", "recruitlens-resumes")
 SQS_QUEUE_URL = os.environ.get("SQS_QUEUE_URL")  # optional; used in later phases for workers
 
+# Each suggestion box section (skills, tips, company) gets this long before
+# it is returned empty.
+SUGGESTIONS_TASK_TIMEOUT_SECONDS = float(os.environ.get("SUGGESTIONS_TASK_TIMEOUT_SECONDS", "20"))
+
 _s3_client = None
 _sqs_client = None
 
@@ -90,30 +106,122 @@ def _maybe_enqueue_resume_job(user_id: str, s3_key: str | None, ext: str) -> Non
     except (BotoCoreError, ClientError) as exc:
         logging.warning("Failed to enqueue resume job to SQS: %s", exc)
 
-# Simple in-memory cache for suggestion box content.
-# Keyed by (user_id, role_title) so we don't recompute LLM skills/tips every time.
-SUGGESTIONS_CACHE: dict[tuple[str, str], dict] = {}
-
 
 ##App initialize
 app = Flask(__name__)
 
+# One persistent event loop for the whole process. Every async call made by the
+# request handlers is submitted here, so the MCP session, the OpenAI clients and
+# GraphRAG created in init() stay bound to a live loop across requests.
+event_loop = BackgroundEventLoop()
+
+def _company_profile_kwargs():
+    """
+    Company settings from the environment, or None if no company site is configured.
+    """
+    company_name = os.environ.get("COMPANY_NAME", "").strip()
+    company_website = os.environ.get("COMPANY_WEBSITE", "").strip() or None
+    if not (company_name and company_website):
+        return None
+    return {
+        "company_name": company_name,
+        "website_url": company_website,
+        "linkedin_url": os.environ.get("COMPANY_LINKEDIN", "").strip() or None,
+        "max_pages": 5,
+    }
+
+
 async def init():
-    global agent , preprocess, company_scraper
+    global agent , preprocess, company_scraper, mcp_client
 
 
     mcp_client = MCPClient()
 
     server = str(BASE_DIR / "server.py") ##add the path
-    await mcp_client.connect_to_server(server)
+    await mcp_client.start(server)
 
     rag = GraphRAG()
+    await rag.connect()
     agent = ChatAgent(mcp_client=mcp_client,rag=rag)
+    # Background workers that deliver owner reports after an interview ends.
+    await agent.start_jobs()
     company_scraper = CompanyInsightsScraper()
     preprocess = Preprocess()
 
+    # Warm the shared company profile so /suggestions never waits on a crawl.
+    company_kwargs = _company_profile_kwargs()
+    if company_kwargs:
+        company_scraper.start_refresher(**company_kwargs)
+
+
+async def shutdown():
+    try:
+        await company_scraper.stop_refresher()
+    except Exception as exc:
+        logging.warning("Failed to stop company profile refresher: %s", exc)
+    try:
+        await agent.stop_jobs()
+    except Exception as exc:
+        logging.warning("Failed to stop background job workers: %s", exc)
+    try:
+        await mcp_client.close()
+    except Exception as exc:
+        logging.warning("Failed to close MCP client cleanly: %s", exc)
+    try:
+        await agent.rag.close()
+    except Exception as exc:
+        logging.warning("Failed to close Neo4j driver cleanly: %s", exc)
+
+
+def _shutdown_event_loop():
+    try:
+        event_loop.run(shutdown(), timeout=10)
+    except Exception as exc:
+        logging.warning("Shutdown hook failed: %s", exc)
+    event_loop.stop()
+
+
+
+def _blocked_input_payload(user_id, risky_input):
+    app.logger.warning(
+        "Blocked user message for user %s: heuristic=%s harmful=%s cats=%s",
+        user_id,
+        risky_input["heuristic_flag"],
+        risky_input["harmful_flag"],
+        risky_input["categories"],
+    )
+    return {
+        "answer": "I can’t follow those instructions, but I can still help with normal questions.",
+        "interview_state": None,
+        "tool_calls": [],
+        "flagged": True,
+        "reason": "input_blocked",
+        "risk": risky_input,
+    }
 
 
+async def _moderate_output(user_id, result):
+    """
+    Run the output risk check on the agent's answer and replace it in place
+    if it is blocked. Uses the async moderation call on the serving loop, like
+    the input check.
+    """
+    output_risk = await preprocess.aclassify_prompt_risk(result.get("answer", ""))
+    if not output_risk["allowed"]:
+        app.logger.warning(
+            "Blocked output for user %s: heuristic=%s harmful=%s cats=%s",
+            user_id,
+            output_risk["heuristic_flag"],
+            output_risk["harmful_flag"],
+            output_risk["categories"],
+        )
+        result["answer"] = (
+            "I'm not able to provide that response. Please try asking in a different way."
+        )
+        result["flagged"] = True
+        result["reason"] = "output_blocked"
+        result["risk"] = output_risk
+    return result
 
 
 @app.route("/chat", methods = ["POST"])
@@ -126,54 +234,22 @@ def chat():
     request_id = str(uuid.uuid4())
     t0 = time.time()
 
-    risk_service = preprocess
-    risky_input = risk_service.classify_prompt_risk(message)
-    if not risky_input["allowed"]:
-        app.logger.warning(
-            "Blocked user message for user %s: heuristic=%s harmful=%s cats=%s",
-            user_id,
-            risky_input["heuristic_flag"],
-            risky_input["harmful_flag"],
-            risky_input["categories"],
-        )
-
-        return jsonify({
-            "answer": "I can’t follow those instructions, but I can still help with normal questions.",
-            "interview_state": None,
-            "tool_calls": [],
-            "flagged": True,
-            "reason": "input_blocked",
-            "risk": risky_input,
-        })
-    
-
     async def _run():
-
-        return  await agent.handle_message(
+        # The input risk check runs concurrently with the planner call; the
+        # agent discards the planner result if the message is flagged.
+        result = await agent.handle_message(
             user_id = user_id,
             message = message,
-            
+            input_check = preprocess.aclassify_prompt_risk(message),
         )
+        return await _moderate_output(user_id, result)
 
-    
-    result= asyncio.run(_run())
+    try:
+        result= event_loop.run(_run())
+    except InputBlockedError as blocked:
+        return jsonify(_blocked_input_payload(user_id, blocked.risk))
     
     latency_ms = int((time.time() - t0) * 1000)
-    output_risk = risk_service.classify_prompt_risk(result.get("answer", ""))
-    if not output_risk["allowed"]:
-        app.logger.warning(
-            "Blocked output for user %s: heuristic=%s harmful=%s cats=%s",
-            user_id,
-            output_risk["heuristic_flag"],
-            output_risk["harmful_flag"],
-            output_risk["categories"],
-        )
-        result["answer"] = (
-            "I'm not able to provide that response. Please try asking in a different way."
-        )
-        result["flagged"] = True
-        result["reason"] = "output_blocked"
-        result["risk"] = output_risk
 
     ##Logger json for the event happened with a specific id
     logger.info(json.dumps({
@@ -190,6 +266,82 @@ def chat():
     return jsonify(result)
 
 
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Streaming variant of /chat. Responds with newline-delimited JSON events:
+    a "state" event as soon as the planner has decided, "token" events with
+    answer text as the speaker generates it, and a final "done" event carrying
+    the same payload /chat returns (after output moderation, so the client
+    should replace the streamed text with done.answer if it was flagged).
+    If the turn fails, an "error" event is sent followed by a "done" event
+    with error=true, so the stream always ends with "done".
+    """
+    data = request.get_json(force=True) or {}
+    user_id = data.get("user_id","anonymous")
+    message = data.get("message", "")
+
+    request_id = str(uuid.uuid4())
+    t0 = time.time()
+
+    def _events():
+        first_token_ms = None
+        result = {}
+        status = "ok"
+        input_check = preprocess.aclassify_prompt_risk(message)
+        stream = agent.handle_message_stream(
+            user_id=user_id,
+            message=message,
+            input_check=input_check,
+        )
+        try:
+            for event in event_loop.iterate(stream):
+                if event.get("type") == "token" and first_token_ms is None:
+                    first_token_ms = int((time.time() - t0) * 1000)
+                if event.get("type") == "done":
+                    result = event_loop.run(_moderate_output(user_id, event))
+                    event = result
+                yield json.dumps(event) + "\n"
+        except InputBlockedError as blocked:
+            yield json.dumps({"type": "done", **_blocked_input_payload(user_id, blocked.risk)}) + "\n"
+            return
+        except Exception as exc:
+            app.logger.exception("Chat stream failed for user %s: %s", user_id, exc)
+            status = "error"
+            yield json.dumps({"type": "error", "message": "Something went wrong while answering."}) + "\n"
+            yield json.dumps({
+                "type": "done",
+                "answer": "",
+                "interview_state": None,
+                "tool_calls": [],
+                "error": True,
+                "reason": "internal_error",
+            }) + "\n"
+        finally:
+            # If the stream was abandoned before the agent awaited the check
+            # (e.g. the client disconnected), close it so it is not leaked.
+            if inspect.getcoroutinestate(input_check) == inspect.CORO_CREATED:
+                input_check.close()
+
+        logger.info(json.dumps({
+            "type": "request",
+            "endpoint": "/chat/stream",
+            "request_id": request_id,
+            "user_id": user_id,
+            "latency_ms": int((time.time() - t0) * 1000),
+            "first_token_ms": first_token_ms,
+            "status": status,
+            "graph_used": bool(result.get("interview_state")),
+            "tool_calls": result.get("tool_calls", []),
+        }))
+
+    return Response(
+        stream_with_context(_events()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/voice", methods=["POST"])
 def voice_chat():
     """
@@ -236,7 +388,7 @@ def voice_chat():
             audio_metrics=metrics # Pass WPM etc.
         )
 
-    result = asyncio.run(_run())
+    result = event_loop.run(_run())
     result["transcription"] = text # send back what we heard
     
     latency_ms = int((time.time() - t0) * 1000)
@@ -296,28 +448,21 @@ def upload():
     return jsonify(payload)
 
 
-@app.route("/suggestions", methods=["GET"])
-def suggestions():
+def _suggestions_role(user_id, explicit_role):
     """
-    Suggestion box endpoint:
-    - Reads the candidate's role (title) from query or parsed CV.
-    - Runs two tools in sequence:
-        1) ESCO-based role skill extraction (+ LLM rewriting) via fetch_esco_role_skills
-        2) Generic interview attitude suggestions via generate_attitude_suggestions
-    - Returns a compact payload for the frontend side panel.
+    Role title for the suggestion box: the explicit `role` argument, else
+    something descriptive built from the parsed CV.
     """
-    user_id = request.args.get("user_id", "anonymous")
-    explicit_role = request.args.get("role")
-
     # Determine role title / headline for display in the side panel.
     # Prefer a richer, longer headline from the parsed CV where possible.
     role_title = explicit_role
     try:
-        candidate = getattr(agent.rag, "candidate_info", {}) or {}
-        resume_struct = getattr(agent.rag, "resume_struct", {}) or {}
-    except Exception:
-        candidate = {}
-        resume_struct = {}
+        resume = event_loop.run(agent.rag.load_resume(user_id))
+    except Exception as exc:
+        logger.warning("Failed to load resume for %s: %s", user_id, exc)
+        resume = None
+    candidate = resume.candidate_info if resume else {}
+    resume_struct = resume.resume_struct if resume else {}
 
     if not role_title:
         # 1) Prefer CV headline if it is reasonably descriptive (more than 3 words)
@@ -341,84 +486,129 @@ def suggestions():
     if not role_title:
         # Final fallback if CV parsing didn't give us anything meaningful.
         role_title = "Machine Learning Engineer"
+    return role_title
 
-    occupation_label = role_title
-
-    # If we've already generated suggestions for this user + role, serve from cache.
-    cache_key = (user_id, role_title)
-    cached = SUGGESTIONS_CACHE.get(cache_key)
-    if cached is not None:
-        payload = {
-            "role": role_title,
-            "hot_skills": cached.get("hot_skills", []),
-            "attitude_tips": cached.get("attitude_tips", []),
-            "company": cached.get("company"),
-        }
-        return jsonify(payload)
 
-    # Company insights (can run before any CV upload)
-    company_name = os.environ.get("COMPANY_NAME", "").strip()
-    company_website = os.environ.get("COMPANY_WEBSITE", "").strip() or None
-    company_linkedin = os.environ.get("COMPANY_LINKEDIN", "").strip() or None
+async def _suggestion_sections(role_title):
+    """
+    Yield (section, value) pairs for the suggestion box as each tool finishes.
+    Skills -> tips (tips need the skills) runs concurrently with the company
+    profile; every section is bounded by SUGGESTIONS_TASK_TIMEOUT_SECONDS and
+    falls back to an empty value on timeout or error.
+    """
+    ready: asyncio.Queue = asyncio.Queue()
+    company_kwargs = _company_profile_kwargs()
 
-    async def _run_tools():
-        # Tool 1: role tech keywords via ChatAgent (LLM-only, no ESCO/ONET)
+    async def _section(name, coro, default):
         try:
-            hot = await agent.generate_role_tech_keywords(role_title, limit=15)
+            value = await asyncio.wait_for(coro, SUGGESTIONS_TASK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Suggestions: %s timed out after %ss", name, SUGGESTIONS_TASK_TIMEOUT_SECONDS)
+            value = default
         except Exception as exc:
-            logger.warning("generate_role_tech_keywords failed: %s", exc)
-            hot = []
-
+            logger.warning("Suggestions: %s failed: %s", name, exc)
+            value = default
+        await ready.put((name, value))
+        return value
+
+    async def _skills_then_tips():
+        # Tool 1: role tech keywords via ChatAgent (LLM-only, no ESCO/ONET),
+        # cached per normalised role and shared across users.
+        hot = await _section(
+            "hot_skills", agent.cached_role_tech_keywords(role_title, limit=15), []
+        )
         # Tool 2: generic interview attitude suggestions (LLM, via agent)
-        try:
-            tips = await agent.generate_attitude_tips(occupation_label, hot)
-        except Exception as exc:
-            logger.warning("generate_attitude_tips failed: %s", exc)
-            tips = []
-
-        # Company profile via scraper if configured
-        company_profile = None
-        if company_name and company_website:
-            try:
-                profile = await company_scraper.scrape_company(
-                    company_name=company_name,
-                    website_url=company_website,
-                    linkedin_url=company_linkedin,
-                    max_pages=5,
-                )
-                company_profile = {
-                    "name": profile.name,
-                    "website": profile.website,
-                    "linkedin": profile.linkedin,
-                    "services_summary": profile.services_summary,
-                    "culture_summary": profile.culture_summary,
-                }
-            except Exception as e:
-                logger.warning("CompanyInsightsScraper failed: %s", e)
-                company_profile = None
-
-        return hot, tips, company_profile
-
-    hot_skills, attitude_tips, company_profile = asyncio.run(_run_tools())
-
-    # Store in cache so subsequent sidebar refreshes don't re-hit the LLM.
-    SUGGESTIONS_CACHE[cache_key] = {
-        "hot_skills": hot_skills,
-        "attitude_tips": attitude_tips,
-        "company": company_profile,
-    }
+        await _section("attitude_tips", agent.cached_attitude_tips(role_title, hot), [])
+
+    async def _company():
+        # Company profile via scraper if configured; served from the shared
+        # profile cache that init() keeps warm.
+        if not company_kwargs:
+            return None
+        profile = await company_scraper.get_profile(**company_kwargs)
+        return {
+            "name": profile.name,
+            "website": profile.website,
+            "linkedin": profile.linkedin,
+            "services_summary": profile.services_summary,
+            "culture_summary": profile.culture_summary,
+        }
+
+    tasks = [
+        asyncio.create_task(_skills_then_tips()),
+        asyncio.create_task(_section("company", _company(), None)),
+    ]
+    try:
+        for _ in range(3):
+            yield await ready.get()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.route("/suggestions", methods=["GET"])
+def suggestions():
+    """
+    Suggestion box endpoint:
+    - Reads the candidate's role (title) from query or parsed CV.
+    - Runs the tools concurrently, each with its own timeout:
+        1) Role tech keywords, then interview attitude tips built on them
+        2) Company profile from the shared company cache
+    - Returns a compact payload for the frontend side panel.
+    """
+    user_id = request.args.get("user_id", "anonymous")
+    role_title = _suggestions_role(user_id, request.args.get("role"))
+
+    async def _run_tools():
+        return {name: value async for name, value in _suggestion_sections(role_title)}
+
+    sections = event_loop.run(_run_tools())
 
     # For display in the UI, prefer the role/title as extracted from the CV or
     # explicitly provided by the caller (e.g. "packing machinery engineer").
     payload = {
         "role": role_title,
-        "hot_skills": hot_skills,
-        "attitude_tips": attitude_tips,
-        "company": company_profile,
+        "hot_skills": sections.get("hot_skills", []),
+        "attitude_tips": sections.get("attitude_tips", []),
+        "company": sections.get("company"),
     }
     return jsonify(payload)
 
 
+@app.route("/suggestions/stream", methods=["GET"])
+def suggestions_stream():
+    """
+    Streaming variant of /suggestions. Responds with newline-delimited JSON
+    events: a "role" event, one "section" event per side panel section
+    (hot_skills, attitude_tips, company) as soon as it is ready, then "done".
+    """
+    user_id = request.args.get("user_id", "anonymous")
+    role_title = _suggestions_role(user_id, request.args.get("role"))
+
+    def _events():
+        yield json.dumps({"type": "role", "role": role_title}) + "\n"
+        for name, value in event_loop.iterate(_suggestion_sections(role_title)):
+            yield json.dumps({"type": "section", "name": name, "value": value}) + "\n"
+        yield json.dumps({"type": "done"}) + "\n"
+
+    return Response(
+        stream_with_context(_events()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Scrapeable JSON snapshot of the process-wide counters.
+    """
+    return jsonify({
+        "counters": METRICS.snapshot(),
+        "openai_pool": openai_clients.stats(),
+    })
+
+
 @app.route("/", defaults={"path": ""})
 @app.route("/<path:path>")
 def serve_frontend(path):
@@ -434,12 +624,15 @@ def serve_frontend(path):
     return send_from_directory(FRONTEND_DIST, "index.html")
 
 
-asyncio.run(init())
+event_loop.run(init())
+atexit.register(_shutdown_event_loop)
 
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    # use_reloader=False: the reloader would spawn a second process with its own
+    # MCP server and event loop.
+    app.run(debug=True, port=5001, threaded=True, use_reloader=False)
 
 
 
@@ -0,0 +1,255 @@
+"""
+Per-turn prompt size (and, with --live, latency) for two context reductions:
+
+- planner (default): the whole CV in the planner prompt versus the
+  slot-relevant sections picked by retrieve_cv_context.
+- graph: the full resume_struct in the speaker's question prompt versus the
+  slot's Neo4j subgraph from retrieve_graph_context.
+
+    python benchmarks/planner_prompt.py [--compare planner|graph]
+        [--sections 15] [--experiences 8] [--turns 10] [--live]
+
+Offline it only builds the requests and counts their tokens; in graph mode
+retrieve_graph_context is replaced by a stub that applies the same trimming
+as the Cypher templates to the in-memory resume_struct. With --live (needs
+OPENAI_API_KEY) it also sends them and reports prompt tokens and latency as
+measured by the API.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+import utils  # noqa: E402
+
+
+SECTION_TOPICS = [
+    ("PROFILE", "Backend engineer focused on data platforms, reliability and developer tooling."),
+    ("EXPERIENCE", "Senior engineer at Acme Corp from 2019 to present, owning the billing platform."),
+    ("PROJECT", "Built and delivered a streaming ingestion system; designed and implemented the pipeline."),
+    ("RESULTS", "Reduced p99 latency by 40 percent, increased throughput and cut cost per invoice."),
+    ("CHALLENGES", "The main bottleneck was scaling the partition consumers under burst traffic."),
+    ("SOLUTION", "Redesigned the consumer groups and automated backfills, which resolved the issue."),
+    ("TEAM", "Collaborated with cross functional stakeholders and resolved a conflict over priorities."),
+    ("LEARNING", "Learned Rust in a month and migrated the hot path; adopted new observability tooling."),
+    ("LEADERSHIP", "Led a team of five, mentored two juniors and coordinated the migration initiative."),
+    ("AVAILABILITY", "Notice period of one month; EU citizenship, no visa or permit needed; open to relocation."),
+]
+
+
+def synthetic_cv(n_sections):
+    sections = []
+    for i in range(n_sections):
+        title, body = SECTION_TOPICS[i % len(SECTION_TOPICS)]
+        filler = " Worked on internal tools, reviews, on-call and documentation." * 8
+        sections.append(f"{title} {i + 1}\n{body}{filler}")
+    return "\n\n".join(sections)
+
+
+def synthetic_resume_struct(n_experiences):
+    experiences = []
+    for i in range(n_experiences):
+        title, body = SECTION_TOPICS[i % len(SECTION_TOPICS)]
+        experiences.append({
+            "role": f"Engineer {i + 1}",
+            "company": f"Company {i + 1}",
+            "start_date": f"{2010 + i}-01",
+            "end_date": f"{2011 + i}-01",
+            "summary": f"{body} Worked on internal tools, reviews, on-call and documentation.",
+            "skills": ["Python", "Kafka", "PostgreSQL", "Kubernetes", f"Tool {i}"],
+            "metrics": [f"{10 + i}% faster builds", f"{i + 2}x throughput"],
+        })
+    return {
+        "candidate": {
+            "full_name": "Ann Lee",
+            "headline": "Backend engineer",
+            "location": "Berlin",
+            "email": "ann@example.com",
+            "phone": "+49 000 000",
+            "summary": SECTION_TOPICS[0][1],
+        },
+        "experiences": experiences,
+        "skills": [f"Skill {i}" for i in range(40)],
+    }
+
+
+def stub_graph_context(resume_struct, slot, limit=utils.GRAPH_RETRIEVAL_MAX_EXPERIENCES):
+    """Offline stand-in for retrieve_graph_context, mirroring GRAPH_RETRIEVAL_QUERIES."""
+    template = utils.SLOT_GRAPH_QUERY.get(slot, "experience_details")
+    candidate = resume_struct["candidate"]
+    experiences = resume_struct["experiences"]
+    if template == "candidate_profile":
+        return {
+            "candidate": {k: candidate.get(k) for k in ("full_name", "headline", "location")},
+            "experiences": [],
+            "skills": resume_struct["skills"][:10],
+        }
+    if template == "experience_overview":
+        keys = ("role", "company", "start_date", "end_date")
+        return {
+            "candidate": {k: candidate.get(k) for k in ("full_name", "headline")},
+            "experiences": [{k: e.get(k) for k in keys} for e in experiences],
+            "skills": [],
+        }
+    extra = "metrics" if template == "experience_metrics" else "skills"
+    if template == "experience_metrics":
+        experiences = sorted(experiences, key=lambda e: -len(e.get("metrics") or []))
+    return {
+        "candidate": {"full_name": candidate.get("full_name")},
+        "experiences": [
+            {k: e.get(k) for k in ("role", "company", "summary", extra)}
+            for e in experiences[:limit]
+        ],
+        "skills": [],
+    }
+
+
+def planner_messages(agent, user_id, state, message, history):
+    planner_input = agent._planner_input(user_id, message, state, history)
+    return [
+        {"role": "system", "content": utils.PLANNER_SYSTEM_PROMPT},
+        {"role": "user", "content": agent._planner_profile_message(user_id)},
+        {"role": "user", "content": json.dumps(planner_input)},
+    ]
+
+
+def speaker_messages(system_prompt, user_payload):
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_payload},
+    ]
+
+
+async def measure(args, agent, build_messages, max_tokens):
+    """
+    Per turn: prompt tokens, time to build the prompt (includes the graph
+    query with --live-graph) and, with --live, API prompt tokens and latency.
+    """
+    tokens, build_ms, latencies, api_tokens = [], [], [], []
+    for turn in range(args.turns):
+        started = time.perf_counter()
+        messages = await build_messages(turn)
+        build_ms.append((time.perf_counter() - started) * 1000)
+        tokens.append(sum(utils._count_tokens(m["content"]) for m in messages))
+        if args.live:
+            started = time.perf_counter()
+            response = await utils._achat_completion(
+                model=agent.model, messages=messages, max_tokens=max_tokens,
+                temperature=utils.DEFAULT_TEMPERATURE,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            api_tokens.append(response.usage.prompt_tokens)
+    return tokens, build_ms, latencies, api_tokens
+
+
+def report(results, baseline, reduced):
+    for mode, (tokens, build_ms, latencies, api_tokens) in results.items():
+        line = (f"{mode:>12}: {statistics.mean(tokens):8.0f} prompt tokens/turn (estimated),"
+                f" {statistics.median(build_ms):6.1f} ms median prompt build")
+        if latencies:
+            line += (f", {statistics.mean(api_tokens):8.0f} prompt tokens/turn (API),"
+                     f" {statistics.median(latencies):7.0f} ms median latency")
+        print(line)
+    whole, trimmed = (statistics.mean(results[m][0]) for m in (baseline, reduced))
+    print(f"   reduction: {100 * (1 - trimmed / whole):.1f}% fewer prompt tokens per turn")
+
+
+async def run(args):
+    user_id = "bench"
+    text = synthetic_cv(args.sections)
+    resume_struct = synthetic_resume_struct(args.experiences)
+    rag = utils.GraphRAG()
+    rag._resumes.set(
+        user_id,
+        utils.ResumeRecord(user_id, text, resume_struct,
+                           section_index=rag._build_section_index(text)),
+    )
+    agent = utils.ChatAgent(mcp_client=None, rag=rag)
+    slots = [s for s in utils.PLANNER_REQUIRED_SLOTS if s != "greeting"]
+    try:
+        if args.live_graph:
+            if not await rag.connect():
+                sys.exit("Neo4j is not reachable; check NEO4J_URI/NEO4J_USERNAME/NEO4J_PASSWORD.")
+            await rag._write_resume_to_graph(user_id, resume_struct)
+        if args.compare == "graph":
+            await run_graph(args, agent, rag, user_id, resume_struct, slots)
+        else:
+            await run_planner(args, agent, rag, user_id, slots)
+    finally:
+        await rag.close()
+
+
+async def run_planner(args, agent, rag, user_id, slots):
+    results = {}
+    for mode in ("whole_cv", "retrieval"):
+        if mode == "whole_cv":
+            # The behaviour before retrieval: every planner call carried the full text.
+            agent._cv_context = lambda uid, slot, query_text="": rag.cached_resume(uid).text
+        else:
+            agent.__dict__.pop("_cv_context", None)
+        state = agent._get_or_create_interview_state(user_id)
+
+        async def build(turn, state=state):
+            message = f"Answer number {turn} about my work."
+            messages = planner_messages(agent, user_id, state, message, [])
+            # Walk through the interview so retrieval follows the slot order.
+            state.slots[slots[turn % len(slots)]] = "answered"
+            return messages
+
+        results[mode] = await measure(args, agent, build, max_tokens=600)
+
+    text = rag.cached_resume(user_id).text
+    print(f"CV: {args.sections} sections, {len(text)} chars; {args.turns} planner turns")
+    report(results, "whole_cv", "retrieval")
+
+
+async def run_graph(args, agent, rag, user_id, resume_struct, slots):
+    results = {}
+    for mode in ("full_struct", "graph"):
+        if mode == "full_struct":
+            # The behaviour before graph retrieval: the whole struct every time.
+            async def retrieve(uid, slot=None, limit=None):
+                return None
+        elif not args.live_graph:
+            async def retrieve(uid, slot=None, limit=None):
+                return stub_graph_context(resume_struct, slot, limit or utils.GRAPH_RETRIEVAL_MAX_EXPERIENCES)
+        else:
+            retrieve = type(rag).retrieve_graph_context.__get__(rag)
+        rag.retrieve_graph_context = retrieve
+        state = agent._get_or_create_interview_state(user_id)
+
+        async def build(turn, state=state):
+            slot = slots[turn % len(slots)]
+            return speaker_messages(*await agent._question_prompt(user_id, slot, state))
+
+        results[mode] = await measure(args, agent, build, max_tokens=200)
+
+    size = len(json.dumps(resume_struct))
+    print(f"resume_struct: {args.experiences} experiences, {size} chars; {args.turns} speaker turns")
+    report(results, "full_struct", "graph")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--compare", choices=("planner", "graph"), default="planner")
+    parser.add_argument("--sections", type=int, default=15)
+    parser.add_argument("--experiences", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument(
+        "--live-graph", action="store_true",
+        help="write the synthetic resume to Neo4j (NEO4J_URI etc.) as user 'bench' "
+             "and query it instead of using the offline graph stub",
+    )
+    parser.add_argument("--live", action="store_true", help="send the requests to the OpenAI API")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import { useEffect, useRef, useState } from "react";
-import { useQuery } from "@tanstack/react-query";
-import { API_BASE_URL } from "../config";
-import type { InterviewState } from "../types";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
+import { streamSuggestions } from "../lib/api";
+import type { InterviewState, SuggestionsPayload } from "../types";
 import { Camera, Lightbulb, Square, Shield, ChevronDown } from "lucide-react";
 
 interface SidePanelProps {
@@ -12,21 +12,6 @@ interface SidePanelProps {
   interviewState: InterviewState | null;
 }
 
-interface CompanySummary {
-  name: string;
-  website: string | null;
-  linkedin: string | null;
-  services_summary: string;
-  culture_summary: string;
-}
-
-interface SuggestionsPayload {
-  role: string | null;
-  hot_skills: string[];
-  attitude_tips: string[];
-  company?: CompanySummary | null;
-}
-
 const SuggestionBox = ({
   userId,
   interviewState
@@ -34,19 +19,18 @@ const SuggestionBox = ({
   userId: string;
   interviewState: InterviewState | null;
 }) => {
+  const queryClient = useQueryClient();
   const { data, isLoading, error } = useQuery<SuggestionsPayload>({
     queryKey: ["suggestions", userId],
     // We can show company + default role suggestions even before CV upload,
     // so only gate on userId.
     enabled: Boolean(userId),
-    queryFn: async () => {
-      const params = new URLSearchParams({ user_id: userId });
-      const res = await fetch(`${API_BASE_URL}/suggestions?${params.toString()}`);
-      if (!res.ok) {
-        throw new Error("Failed to load suggestions");
-      }
-      return (await res.json()) as SuggestionsPayload;
-    }
+    // Sections are streamed; show each one as soon as the backend has it.
+    queryFn: () =>
+      streamSuggestions({
+        userId,
+        onUpdate: (partial) => queryClient.setQueryData(["suggestions", userId], partial)
+      })
   });
 
   const displayRole = data?.role || "this role";
@@ -1,7 +1,7 @@
-import { useMemo, useState } from "react";
+import { useMemo, useRef, useState } from "react";
 import { useMutation } from "@tanstack/react-query";
-import { sendChatMessage, uploadResume } from "../lib/api";
-import type { ChatMessage, InterviewState, ToolCall } from "../types";
+import { streamChatMessage, uploadResume } from "../lib/api";
+import type { ChatMessage, ChatStreamEvent, InterviewState, ToolCall } from "../types";
 
 const ensureUserId = () => crypto.randomUUID();
 
@@ -15,9 +15,35 @@ export const useChat = () => {
   const [hasResume, setHasResume] = useState(false);
   const [inputMode, setInputMode] = useState<"text" | "voice">("text");
 
+  // Tracks the id of the assistant placeholder for the in-flight message so
+  // streamed tokens can be appended to it as they arrive.
+  const streamingMessageId = useRef<string | null>(null);
+
+  const applyStreamEvent = (event: ChatStreamEvent) => {
+    const targetId = streamingMessageId.current;
+    if (!targetId) return;
+    if (event.type === "state") {
+      setInterviewState(event.interview_state);
+      return;
+    }
+    if (event.type === "token") {
+      setMessages((prev) =>
+        prev.map((msg) =>
+          msg.id === targetId
+            ? {
+                ...msg,
+                content: msg.pending ? event.text : msg.content + event.text,
+                pending: false
+              }
+            : msg
+        )
+      );
+    }
+  };
+
   const sendMutation = useMutation({
     mutationFn: ({ message }: { message: string }) =>
-      sendChatMessage({ userId, message, temperature }),
+      streamChatMessage({ userId, message, temperature, onEvent: applyStreamEvent }),
     onMutate: async ({ message }) => {
       const userMessage: ChatMessage = {
         id: crypto.randomUUID(),
@@ -32,6 +58,7 @@ export const useChat = () => {
         createdAt: new Date().toISOString(),
         pending: true
       };
+      streamingMessageId.current = assistantPlaceholder.id;
 
       setMessages((prev) => [...prev, userMessage, assistantPlaceholder]);
       setComposerValue("");
@@ -42,6 +69,7 @@ export const useChat = () => {
       };
     },
     onSuccess: (data, _variables, context) => {
+      streamingMessageId.current = null;
       if (!context) return;
       setMessages((prev) =>
         prev.map((msg) =>
@@ -64,6 +92,7 @@ export const useChat = () => {
       }
     },
     onError: (_error, variables, context) => {
+      streamingMessageId.current = null;
       if (context) {
         setMessages((prev) =>
           prev.filter(
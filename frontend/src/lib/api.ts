@@ -1,5 +1,10 @@
 import { API_BASE_URL } from "../config";
-import type { ChatResponse } from "../types";
+import type {
+  ChatResponse,
+  ChatStreamEvent,
+  SuggestionsPayload,
+  SuggestionsStreamEvent
+} from "../types";
 
 const defaultHeaders = {
   "Content-Type": "application/json"
@@ -13,6 +18,36 @@ const handleResponse = async (resp: Response) => {
   return resp.json();
 };
 
+// Read a newline-delimited JSON response, calling onEvent for each line.
+async function readNdjson<T>(resp: Response, onEvent: (event: T) => void): Promise<void> {
+  if (!resp.ok || !resp.body) {
+    const text = await resp.text();
+    throw new Error(text || "Unexpected API error");
+  }
+
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    onEvent(JSON.parse(line) as T);
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let newline = buffer.indexOf("\n");
+    while (newline !== -1) {
+      handleLine(buffer.slice(0, newline));
+      buffer = buffer.slice(newline + 1);
+      newline = buffer.indexOf("\n");
+    }
+  }
+  handleLine(buffer + decoder.decode());
+}
+
 export async function sendChatMessage({
   userId,
   message,
@@ -34,6 +69,82 @@ export async function sendChatMessage({
   return handleResponse(resp);
 }
 
+export async function streamChatMessage({
+  userId,
+  message,
+  temperature,
+  onEvent
+}: {
+  userId: string;
+  message: string;
+  temperature: number;
+  onEvent: (event: ChatStreamEvent) => void;
+}): Promise<ChatResponse> {
+  const resp = await fetch(`${API_BASE_URL}/chat/stream`, {
+    method: "POST",
+    headers: defaultHeaders,
+    body: JSON.stringify({
+      user_id: userId,
+      message,
+      temperature
+    })
+  });
+  // The backend sends newline-delimited JSON events.
+  let final: ChatResponse | null = null;
+  let failure: string | null = null;
+  await readNdjson<ChatStreamEvent>(resp, (event) => {
+    if (event.type === "error") {
+      failure = event.message;
+    } else if (event.type === "done" && !event.error) {
+      final = event;
+    }
+    onEvent(event);
+  });
+
+  if (failure) {
+    throw new Error(failure);
+  }
+  if (!final) {
+    throw new Error("Chat stream ended before completion");
+  }
+  return final;
+}
+
+// Streams the suggestion box: onUpdate receives the payload each time another
+// section (skills, tips, company) arrives, so fast sections render first.
+export async function streamSuggestions({
+  userId,
+  onUpdate
+}: {
+  userId: string;
+  onUpdate: (payload: SuggestionsPayload) => void;
+}): Promise<SuggestionsPayload> {
+  const params = new URLSearchParams({ user_id: userId });
+  const resp = await fetch(`${API_BASE_URL}/suggestions/stream?${params.toString()}`);
+
+  let payload: SuggestionsPayload = {
+    role: null,
+    hot_skills: [],
+    attitude_tips: [],
+    company: null
+  };
+  await readNdjson<SuggestionsStreamEvent>(resp, (event) => {
+    if (event.type === "role") {
+      payload = { ...payload, role: event.role };
+    } else if (event.type === "section") {
+      if (event.name === "company") {
+        payload = { ...payload, company: event.value };
+      } else if (event.name === "hot_skills") {
+        payload = { ...payload, hot_skills: event.value };
+      } else {
+        payload = { ...payload, attitude_tips: event.value };
+      }
+      onUpdate(payload);
+    }
+  });
+  return payload;
+}
+
 export async function uploadResume({
   userId,
   file
@@ -27,3 +27,36 @@ export interface ChatResponse {
   next_input_mode?: "text" | "voice";
 }
 
+
+export type ChatStreamEvent =
+  | {
+      type: "state";
+      next_action: string;
+      target_slot: string | null;
+      next_input_mode: "text" | "voice";
+      interview_state: InterviewState;
+    }
+  | { type: "token"; text: string }
+  | { type: "error"; message: string }
+  | ({ type: "done"; error?: boolean } & ChatResponse);
+
+export interface CompanySummary {
+  name: string;
+  website: string | null;
+  linkedin: string | null;
+  services_summary: string;
+  culture_summary: string;
+}
+
+export interface SuggestionsPayload {
+  role: string | null;
+  hot_skills: string[];
+  attitude_tips: string[];
+  company?: CompanySummary | null;
+}
+
+export type SuggestionsStreamEvent =
+  | { type: "role"; role: string }
+  | { type: "section"; name: "hot_skills" | "attitude_tips"; value: string[] }
+  | { type: "section"; name: "company"; value: CompanySummary | null }
+  | { type: "done" };
@@ -0,0 +1,45 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# The pooled OpenAI clients are created eagerly by some constructors; tests
+# never reach the API, they only need the clients to build.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+
+SAMPLE_CV = "\n\n".join([
+    "PROFILE\nBackend engineer with a focus on data platforms and reliability.",
+    "EXPERIENCE\nAcme Corp, Senior Engineer, 2019 - present. Owned the billing platform.",
+    "PROJECTS\nBuilt and delivered a streaming ingestion system that developers designed around "
+    "Kafka; implemented the pipeline end to end.",
+    "RESULTS\nReduced p99 latency by 40 percent and increased throughput; improved accuracy of "
+    "invoice matching, cutting cost per invoice.",
+    "LEADERSHIP\nLed a team of five, mentored two juniors and coordinated the migration initiative.",
+    "AVAILABILITY\nNotice period: one month. Visa: EU citizenship, open to relocation; no permit needed.",
+    "HOBBIES\n" + "Cycling, chess and amateur astronomy. " * 40,
+])
+
+
+@pytest.fixture
+def make_agent():
+    """ChatAgent over an in-memory GraphRAG holding SAMPLE_CV for `user_id`."""
+    import utils
+
+    def _make(user_id="u1", text=SAMPLE_CV, resume_struct=None):
+        rag = utils.GraphRAG()
+        record = utils.ResumeRecord(
+            user_id,
+            text,
+            resume_struct or {"candidate": {"full_name": "Ann Lee"}, "experiences": []},
+            section_index=rag._build_section_index(text),
+        )
+        rag._resumes.set(user_id, record)
+        return utils.ChatAgent(mcp_client=None, rag=rag)
+
+    return _make
@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import utils
+
+
+def _page(title, links=()):
+    anchors = "".join(f'<a href="{href}">{href}</a>' for href in links)
+    body = f"{title}. " + "We build reliable logistics software for retailers. " * 8
+    return f"<html><body><h1>{title}</h1><p>{body}</p>{anchors}</body></html>"
+
+
+SITE = {
+    "/": _page("Home", ["/about", "/services", "/careers", "/broken-company", "/team", "https://other.example/about"]),
+    "/about": _page("About us", ["/culture"]),
+    "/services": _page("Services"),
+    "/careers": _page("Careers"),
+    "/team": _page("Team"),
+    "/culture": _page("Culture"),
+}
+
+
+class FixtureSite:
+    """Local HTTP server for SITE that records requests and peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests.append((self.path, dict(self.headers)))
+                    site.active += 1
+                    site.peak = max(site.peak, site.active)
+                try:
+                    time.sleep(site.delay)
+                    if self.path == "/broken-company":
+                        self.send_error(500)
+                        return
+                    html = SITE.get(self.path)
+                    if html is None:
+                        self.send_error(404)
+                        return
+                    etag = f'"{hash(html)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    data = html.encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html")
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with site._lock:
+                        site.active -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def scraper():
+    return utils.CompanyInsightsScraper(cache=utils.LRUTTLCache())
+
+
+@pytest.fixture(autouse=True)
+def fast_crawl(monkeypatch):
+    monkeypatch.setattr(utils, "CRAWL_RATE_PER_SECOND", 100.0)
+
+
+def _paths(site):
+    return [path for path, _ in site.requests]
+
+
+def test_crawls_internal_company_pages_in_bfs_order(scraper):
+    with FixtureSite() as site:
+        texts = asyncio.run(scraper._scrape_site(site.url, max_pages=10))
+
+    titles = [text.split(".")[0].split()[0] for text in texts]
+    assert titles == ["Home", "About", "Services", "Careers", "Team", "Culture"]
+    # Off-site links are never followed; each page is fetched once.
+    assert sorted(_paths(site)) == sorted(set(_paths(site)))
+    assert all(not path.startswith("http") for path in _paths(site))
+
+
+def test_respects_max_pages(scraper):
+    with FixtureSite() as site:
+        texts = asyncio.run(scraper._scrape_site(site.url, max_pages=3))
+
+    assert len(site.requests) == 3
+    assert len(texts) == 3
+
+
+def test_limits_concurrency_per_host(scraper, monkeypatch):
+    monkeypatch.setattr(utils, "CRAWL_MAX_PER_HOST", 2)
+    with FixtureSite(delay=0.2) as site:
+        asyncio.run(scraper._scrape_site(site.url, max_pages=10))
+
+    assert site.peak == 2
+
+
+def test_bad_pages_do_not_abort_the_crawl(scraper, monkeypatch):
+    parse = utils._parse_company_page
+
+    def flaky_parse(html, page_url):
+        if page_url.endswith("/services"):
+            raise ValueError("unparsable page")
+        return parse(html, page_url)
+
+    monkeypatch.setattr(utils, "_parse_company_page", flaky_parse)
+    with FixtureSite() as site:
+        texts = asyncio.run(scraper._scrape_site(site.url, max_pages=10))
+
+    titles = {text.split()[0] for text in texts}
+    assert "Services" not in titles
+    assert {"Home", "About", "Careers", "Team", "Culture"} <= titles
+    assert "/broken-company" in _paths(site)
+
+
+def test_conditional_requests_reuse_cached_pages(scraper):
+    page_cache = {}
+    with FixtureSite() as site:
+        first = asyncio.run(scraper._scrape_site(site.url, max_pages=10, page_cache=page_cache))
+        site.requests.clear()
+        second = asyncio.run(scraper._scrape_site(site.url, max_pages=10, page_cache=page_cache))
+
+    assert second == first
+    home_headers = dict(site.requests)["/"]
+    assert home_headers.get("If-None-Match") == page_cache[site.url]["etag"]
+
+
+def test_crawl_drops_cached_pages_it_no_longer_reaches(scraper):
+    page_cache = {"http://127.0.0.1:1/old-careers": {"etag": '"x"', "text": "gone", "links": []}}
+    with FixtureSite() as site:
+        asyncio.run(scraper._scrape_site(site.url, max_pages=3, page_cache=page_cache))
+
+    assert len(page_cache) == 3
+    assert all(url.startswith(site.url) for url in page_cache)
+
+
+def _fake_summary(scraper, monkeypatch):
+    calls = []
+
+    async def summarise(*, company_name, website_url, linkedin_url, text):
+        calls.append(text)
+        return f"services {len(calls)}", "culture"
+
+    monkeypatch.setattr(scraper, "_summarise_with_llm", summarise)
+    return calls
+
+
+def test_empty_recrawl_keeps_profile_and_retries_sooner(scraper, monkeypatch):
+    calls = _fake_summary(scraper, monkeypatch)
+    with FixtureSite() as site:
+        url = site.url
+        key = scraper._cache_key("Acme", url, None)
+        profile = asyncio.run(scraper._do_refresh(key, "Acme", url, None, 5))
+    assert profile.services_summary == "services 1"
+    stored = scraper.cache.get(key)
+    stored["fetched_at"] -= scraper.ttl_seconds + 1
+    scraper.cache.set(key, stored)
+    assert scraper._refresh_due_in(stored) <= 0
+
+    # The fixture server is gone: the recrawl finds nothing.
+    again = asyncio.run(scraper._do_refresh(key, "Acme", url, None, 5))
+
+    entry = scraper.cache.get(key)
+    assert again.services_summary == "services 1"
+    assert len(calls) == 1
+    assert entry["fetched_at"] == stored["fetched_at"]
+    assert entry["pages"] == stored["pages"]
+    assert 0 < scraper._refresh_due_in(entry) <= utils.COMPANY_PROFILE_RETRY_SECONDS
@@ -0,0 +1,57 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+import utils
+
+
+def _sleepy_pdf_to_text(source, max_pages):
+    # Stand-in for the PDF parser: `source` is the number of seconds to take.
+    time.sleep(float(source))
+    return source.decode()
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    # The patched parser only reaches the workers if they are forked from
+    # this process; spawn/forkserver workers re-import utils unpatched.
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs the fork start method")
+    monkeypatch.setattr(utils, "_pdf_to_text", _sleepy_pdf_to_text)
+    extractor = utils.DocumentExtractor(
+        max_workers=2, timeout=1.0, mp_context=multiprocessing.get_context("fork")
+    )
+    yield extractor
+    extractor.close()
+
+
+def test_timeout_does_not_fail_other_extractions(extractor):
+    async def _run():
+        stuck = asyncio.create_task(extractor.extract_text(b"5", ".pdf"))
+        await asyncio.sleep(0.5)
+        # Still running when the stuck file's timeout resets the pool.
+        neighbour = asyncio.create_task(extractor.extract_text(b"0.8", ".pdf"))
+        return await asyncio.gather(stuck, neighbour, return_exceptions=True)
+
+    stuck, neighbour = asyncio.run(_run())
+
+    assert isinstance(stuck, RuntimeError) and not isinstance(stuck, utils.ExtractionPoolError)
+    assert neighbour == "0.8"
+    assert utils.METRICS.get("extract.pool_retries") >= 1
+
+
+def test_pool_that_keeps_breaking_raises_extraction_pool_error(monkeypatch):
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise utils.BrokenProcessPool("worker died")
+
+        def shutdown(self, **kwargs):
+            pass
+
+    extractor = utils.DocumentExtractor(max_workers=1)
+    monkeypatch.setattr(extractor, "_get_pool", lambda: BrokenPool())
+
+    with pytest.raises(utils.ExtractionPoolError):
+        asyncio.run(extractor.extract_text(b"0", ".pdf"))
@@ -0,0 +1,178 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+
+
+def _completion(content, prompt_tokens, completion_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=None,
+        ),
+    )
+
+
+PLANNER_REPLY = json.dumps({
+    "next_action": "ASK_SLOT",
+    "target_slot": "project_metric",
+    "updated_slots": {"project_description": "Built the billing pipeline"},
+    "goal_completed": False,
+})
+FUSED_REPLY = json.dumps({
+    "next_action": "ASK_SLOT",
+    "target_slot": "project_metric",
+    "updated_slots": {"project_description": "Built the billing pipeline"},
+    "goal_completed": False,
+    "question": "How did you measure the pipeline's success?",
+})
+SPEAKER_QUESTION = "Which metric told you the billing pipeline worked?"
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stub completion: records which calls a turn made and answers each kind."""
+    calls = []
+    replies = {"fused": FUSED_REPLY}
+
+    async def achat_completion(client=None, **kwargs):
+        system_prompt = kwargs["messages"][0]["content"]
+        if system_prompt == utils.FUSED_TURN_SYSTEM_PROMPT:
+            calls.append("fused")
+            reply = replies["fused"]
+            if isinstance(reply, Exception):
+                raise reply
+            return _completion(reply, 1000, 60)
+        if system_prompt == utils.PLANNER_SYSTEM_PROMPT:
+            calls.append("planner")
+            return _completion(PLANNER_REPLY, 900, 40)
+        calls.append("speaker")
+        return _completion(SPEAKER_QUESTION, 500, 20)
+
+    monkeypatch.setattr(utils, "_achat_completion", achat_completion)
+    monkeypatch.setattr(utils.random, "random", lambda: 1.0)  # never force voice
+    return SimpleNamespace(calls=calls, replies=replies)
+
+
+def _turn(make_agent, fraction, monkeypatch):
+    monkeypatch.setattr(utils, "FUSED_TURN_FRACTION", fraction)
+    agent = make_agent()
+    before = utils.METRICS.snapshot()
+    response = asyncio.run(agent.handle_message("u1", "I built the billing pipeline at Acme."))
+    after = utils.METRICS.snapshot()
+    delta = {
+        key: after[key] - before.get(key, 0)
+        for key in after
+        if key.startswith("turn_path.") and not key.split(".")[-1].startswith("last_")
+    }
+    delta.update({key: after[key] for key in after if ".last_" in key})
+    return response, delta
+
+
+def test_valid_fused_turn_skips_planner_and_speaker(make_agent, llm, monkeypatch):
+    response, delta = _turn(make_agent, 1, monkeypatch)
+
+    assert llm.calls == ["fused"]
+    assert response["answer"].endswith("How did you measure the pipeline's success?")
+    assert response["interview_state"]["slots"]["project_description"] == "Built the billing pipeline"
+    assert delta["turn_path.fused.turns"] == 1
+    assert delta["turn_path.fused.tokens_total"] == 1060
+    assert "turn_path.fused.latency_ms_total" in delta
+
+
+@pytest.mark.parametrize("reply", [
+    "not json",
+    json.dumps({"next_action": "ASK_SLOT", "target_slot": "project_metric", "updated_slots": {}}),
+    RuntimeError("fused call failed"),
+])
+def test_rejected_fused_turn_falls_back_to_planner_and_speaker(make_agent, llm, monkeypatch, reply):
+    llm.replies["fused"] = reply
+
+    response, delta = _turn(make_agent, 1, monkeypatch)
+
+    assert llm.calls == ["fused", "planner", "speaker"]
+    assert response["answer"].endswith(SPEAKER_QUESTION)
+    assert delta["turn_path.fused.fallbacks"] == 1
+    assert delta["turn_path.fused_fallback.turns"] == 1
+    assert delta.get("turn_path.fused.turns", 0) == 0
+    # The rejected fused call counts towards the fallback path, unless it never returned.
+    fused_tokens = 0 if isinstance(reply, Exception) else 1060
+    assert delta["turn_path.fused_fallback.tokens_total"] == fused_tokens + 940 + 520
+
+
+def test_two_call_path_records_its_counters(make_agent, llm, monkeypatch):
+    response, delta = _turn(make_agent, 0, monkeypatch)
+
+    assert llm.calls == ["planner", "speaker"]
+    assert response["answer"].endswith(SPEAKER_QUESTION)
+    assert delta["turn_path.two_call.turns"] == 1
+    assert delta["turn_path.two_call.tokens_total"] == 940 + 520
+    assert delta["turn_path.two_call.last_tokens"] == 940 + 520
+
+
+STATE_SLOTS = {"full_name": None, "project_description": None, "greeting": None}
+
+
+@pytest.mark.parametrize("data", [
+    None,
+    ["ASK_SLOT"],
+    {"next_action": "ASK", "target_slot": "full_name", "question": "Name?"},
+    {"next_action": "ASK_SLOT", "target_slot": "full_name", "updated_slots": ["x"], "question": "Name?"},
+    {"next_action": "ASK_SLOT", "target_slot": "salary", "question": "Salary?"},
+    {"next_action": "ASK_SLOT", "target_slot": "greeting", "question": "Hi!"},
+    {"next_action": "ASK_SLOT", "target_slot": "full_name", "question": "   "},
+    {"next_action": "ASK_SLOT", "target_slot": "full_name", "question": 42},
+    {"next_action": "ASK_SLOT", "target_slot": "full_name"},
+])
+def test_validate_fused_turn_rejects_bad_shapes(make_agent, data):
+    agent = make_agent()
+    state = utils.InterviewState(slots=dict(STATE_SLOTS))
+
+    assert agent._validate_fused_turn(data, state) is None
+
+
+def test_validate_fused_turn_accepts_ask_and_end(make_agent):
+    agent = make_agent()
+    state = utils.InterviewState(slots=dict(STATE_SLOTS))
+
+    ask = agent._validate_fused_turn(
+        {"next_action": "ASK_SLOT", "target_slot": "full_name",
+         "updated_slots": {"notice_period": 30}, "question": "  What is your name? "},
+        state,
+    )
+    end = agent._validate_fused_turn(
+        {"next_action": "END", "goal_completed": True, "question": "ignored"}, state
+    )
+
+    assert (ask.target_slot, ask.question, ask.updated_slots, ask.path) == (
+        "full_name", "What is your name?", {"notice_period": "30"}, "fused"
+    )
+    assert (end.next_action, end.question, end.goal_completed) == ("END", None, True)
+
+
+def test_streamed_question_tokens_count_towards_the_turn_path(make_agent, llm, monkeypatch):
+    async def astream_completion(client=None, on_usage=None, **kwargs):
+        llm.calls.append("speaker_stream")
+        for delta in ("Which metric ", "told you it worked?"):
+            yield delta
+        if on_usage is not None:
+            on_usage(_completion("", 500, 20))
+
+    monkeypatch.setattr(utils, "_astream_completion", astream_completion)
+    monkeypatch.setattr(utils, "FUSED_TURN_FRACTION", 0)
+    agent = make_agent()
+    tokens = utils.METRICS.get("turn_path.two_call.tokens_total")
+
+    async def scenario():
+        return [event async for event in agent.handle_message_stream("u1", "I built it.")]
+
+    events = asyncio.run(scenario())
+
+    assert llm.calls == ["planner", "speaker_stream"]
+    assert events[-1]["answer"].endswith("Which metric told you it worked?")
+    assert utils.METRICS.get("turn_path.two_call.tokens_total") == tokens + 940 + 520
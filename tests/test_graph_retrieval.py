@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import utils
+
+
+def test_every_interview_slot_has_a_retrieval_template():
+    for slot in utils.INTERVIEW_SLOT_ORDER:
+        assert utils.SLOT_GRAPH_QUERY.get(slot) in utils.GRAPH_RETRIEVAL_QUERIES, slot
+    for slot in utils.PLANNER_REQUIRED_SLOTS:
+        assert utils.SLOT_GRAPH_QUERY.get(slot) in utils.GRAPH_RETRIEVAL_QUERIES, slot
+
+
+def _graph_agent(make_agent, rows):
+    agent = make_agent(resume_struct={
+        "candidate": {"full_name": "Ann Lee", "email": "ann@example.com"},
+        "experiences": [{"role": "Engineer", "company": "Acme", "summary": "Billing"}],
+        "skills": ["Python"],
+    })
+    queries = []
+
+    async def read_query(query, params):
+        queries.append((query, params))
+        return rows
+
+    agent.rag._use_graph = True
+    agent.rag._read_query = read_query
+    return agent, queries
+
+
+def test_slot_resume_struct_uses_the_slot_subgraph(make_agent):
+    row = {"candidate": {"full_name": "Ann Lee"}, "experiences": [], "skills": ["Python"]}
+    agent, queries = _graph_agent(make_agent, [row])
+
+    context = asyncio.run(agent._slot_resume_struct("u1", "visa_status"))
+
+    assert context == row
+    assert queries[0][0] == utils.GRAPH_RETRIEVAL_QUERIES["candidate_profile"]
+    assert queries[0][1] == {"cid": "u1", "limit": utils.GRAPH_RETRIEVAL_MAX_EXPERIENCES}
+
+
+def test_empty_graph_result_falls_back_to_full_resume_struct(make_agent):
+    agent, queries = _graph_agent(make_agent, [])
+
+    context = asyncio.run(agent._slot_resume_struct("u1", "project_metric"))
+
+    assert queries[0][0] == utils.GRAPH_RETRIEVAL_QUERIES["experience_metrics"]
+    assert context == agent.rag.cached_resume("u1").resume_struct
+
+
+def test_graph_errors_fall_back_to_full_resume_struct(make_agent):
+    agent, _ = _graph_agent(make_agent, [])
+
+    async def failing_read(query, params):
+        raise RuntimeError("neo4j down")
+
+    agent.rag._read_query = failing_read
+    context = asyncio.run(agent._slot_resume_struct("u1", "project_description"))
+
+    assert context == agent.rag.cached_resume("u1").resume_struct
+
+
+def test_query_graph_path_returns_the_slot_template_result(make_agent):
+    row = {"candidate": {"full_name": "Ann Lee"}, "experiences": [], "skills": []}
+    agent, _ = _graph_agent(make_agent, [row])
+
+    result = asyncio.run(agent.rag.query("What is the visa status?", "u1", slot="visa_status"))
+
+    assert result.intermediate_steps == [{"query": "candidate_profile", "slot": "visa_status"}]
+    assert json.loads(result.answer) == row
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def ending_agent(make_agent, monkeypatch):
+    """Agent whose planner ends the interview, recording persistence order."""
+    agent = make_agent()
+    events = []
+
+    async def plan_turn(user_id, message, audio_metrics=None, input_check=None):
+        state = utils.InterviewState()
+        history = [{"role": "user", "content": message}]
+        decision = utils.PlannerDecision("END", None, {}, True)
+        return history, state, dict(state.slots), decision
+
+    async def speak_goodbye(state):
+        return "Thanks, that's everything."
+
+    async def save_session(user_id, history, state):
+        events.append(("save", state.ended, [m["content"] for m in history]))
+
+    async def queue_owner_report(user_id, state, history):
+        events.append(("report", state.ended, [m["content"] for m in history]))
+
+    monkeypatch.setattr(agent, "_plan_turn", plan_turn)
+    monkeypatch.setattr(agent, "_speak_goodbye", speak_goodbye)
+    monkeypatch.setattr(agent, "_save_session", save_session)
+    monkeypatch.setattr(agent, "_queue_owner_report", queue_owner_report)
+    return agent, events
+
+
+def test_end_queues_owner_report_after_saving_session(ending_agent):
+    agent, events = ending_agent
+
+    response = asyncio.run(agent.handle_message("u1", "That's all from me."))
+
+    assert response["interview_state"]["ended"] is True
+    assert [event[0] for event in events] == ["save", "report"]
+    # The report sees the saved, ended session including the goodbye.
+    assert events[1][1] is True
+    assert events[1][2][-1].endswith("Thanks, that's everything.")
+
+
+def _state(**filled):
+    slots = {slot: "" for slot in utils.INTERVIEW_SLOT_ORDER}
+    slots.update(greeting="completed", **filled)
+    return utils.InterviewState(slots=slots)
+
+
+def test_prefetch_predicts_from_planner_slot_order(make_agent):
+    agent = make_agent()
+    state = _state()
+
+    # total_experience comes first in INTERVIEW_SLOT_ORDER, but the planner never asks it.
+    assert agent._predict_next_slot(state, "project_description") == "project_metric"
+    assert agent._predict_next_slot(_state(project_description="x"), None) == "project_metric"
+
+
+def _pending_entry(slot, state):
+    task = asyncio.ensure_future(asyncio.sleep(60, result=("question", 10)))
+    return {"slot": slot, "interview_id": state.interview_id, "task": task}
+
+
+def test_evicted_prefetch_is_cancelled_and_counted_as_miss(make_agent):
+    agent = make_agent()
+    agent._prefetched_questions.max_entries = 1
+    state = _state()
+
+    async def scenario():
+        first = _pending_entry("project_metric", state)
+        agent._prefetched_questions.set("u1", first)
+        agent._prefetched_questions.set("u2", _pending_entry("project_metric", state))
+        await asyncio.sleep(0)
+        agent._discard_prefetched_question("u2")
+        return first["task"]
+
+    misses = utils.METRICS.get("question_prefetch.misses")
+    task = asyncio.run(scenario())
+
+    assert task.cancelled()
+    assert utils.METRICS.get("question_prefetch.misses") == misses + 2
+    assert len(agent._prefetched_questions) == 0
+
+
+def test_cancelled_prefetch_is_a_miss_not_an_error(make_agent):
+    agent = make_agent()
+    state = _state()
+
+    async def scenario():
+        entry = _pending_entry("project_metric", state)
+        agent._prefetched_questions.set("u1", entry)
+        entry["task"].cancel()
+        return await agent._take_prefetched_question("u1", "project_metric", state)
+
+    misses = utils.METRICS.get("question_prefetch.misses")
+
+    assert asyncio.run(scenario()) is None
+    assert utils.METRICS.get("question_prefetch.misses") == misses + 1
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def _make(**kwargs):
+        kwargs.setdefault("poll_seconds", 0.01)
+        queue = utils.JobQueue(path=tmp_path / "jobs.sqlite3", **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield _make
+    for queue in queues:
+        if queue._conn is not None:
+            queue._conn.close()
+
+
+def _row(queue, key):
+    with queue._lock:
+        return queue._connect().execute(
+            "SELECT status, attempts, run_at, last_error FROM jobs WHERE key = ?", (key,)
+        ).fetchone()
+
+
+async def _drain(queue, key, statuses=("done", "failed"), timeout=5):
+    await queue.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while _row(queue, key)[0] not in statuses:
+            assert time.monotonic() < deadline, _row(queue, key)
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+
+def test_duplicate_enqueue_is_a_noop(make_queue):
+    queue = make_queue()
+    runs = []
+
+    async def handler(payload):
+        runs.append(payload)
+
+    queue.register("owner_report", handler)
+
+    async def scenario():
+        added = [
+            await queue.enqueue("owner_report", "owner_report:u1:i1", {"n": 1}),
+            await queue.enqueue("owner_report", "owner_report:u1:i1", {"n": 2}),
+        ]
+        await _drain(queue, "owner_report:u1:i1")
+        # Still a no-op once the job has completed.
+        added.append(await queue.enqueue("owner_report", "owner_report:u1:i1", {"n": 3}))
+        return added
+
+    assert asyncio.run(scenario()) == [True, False, False]
+    assert runs == [{"n": 1}]
+
+
+def test_expired_lease_is_reclaimed(make_queue):
+    queue = make_queue(lease_seconds=0.05)
+    other_process = make_queue(lease_seconds=0.05)
+    asyncio.run(queue.enqueue("owner_report", "k", {}))
+
+    job, _ = queue._claim()
+    # While leased, nobody (in this process or another) can claim it.
+    assert queue._claim()[0] is None
+    assert other_process._claim()[0] is None
+
+    time.sleep(0.1)
+    reclaimed, _ = other_process._claim()
+
+    assert (job["key"], job["attempts"]) == ("k", 1)
+    assert (reclaimed["key"], reclaimed["attempts"]) == ("k", 2)
+
+
+def test_failure_is_retried_with_backoff(make_queue):
+    queue = make_queue(retry_base_seconds=10, max_attempts=3)
+
+    async def handler(payload):
+        raise RuntimeError("whatsapp down")
+
+    queue.register("owner_report", handler)
+    asyncio.run(queue.enqueue("owner_report", "k", {}))
+
+    job, _ = queue._claim()
+    before = time.time()
+    asyncio.run(queue._run(job))
+    status, attempts, run_at, error = _row(queue, "k")
+
+    assert (status, attempts) == ("pending", 1)
+    assert before + 8 <= run_at <= time.time() + 12
+    assert "whatsapp down" in error
+
+
+def test_job_fails_after_max_attempts(make_queue):
+    queue = make_queue(retry_base_seconds=0, max_attempts=3)
+    runs = []
+
+    async def handler(payload):
+        runs.append(payload)
+        raise RuntimeError("whatsapp down")
+
+    queue.register("owner_report", handler)
+    failed = utils.METRICS.get("job_queue.failed")
+
+    async def scenario():
+        await queue.enqueue("owner_report", "k", {})
+        await _drain(queue, "k")
+
+    asyncio.run(scenario())
+    status, attempts, _, error = _row(queue, "k")
+
+    assert (status, attempts, len(runs)) == ("failed", 3, 3)
+    assert "whatsapp down" in error
+    assert utils.METRICS.get("job_queue.failed") == failed + 1
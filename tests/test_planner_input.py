@@ -0,0 +1,63 @@
+import utils
+
+
+def _state(agent, user_id, **filled):
+    state = agent._get_or_create_interview_state(user_id)
+    state.slots.update(filled)
+    return state
+
+
+def test_cv_context_follows_planner_slot_order(make_agent):
+    agent = make_agent()
+    state = _state(agent, "u1")
+    # total_experience is never prefilled and never asked by the planner, so
+    # it must not pin retrieval for the whole interview.
+    assert state.slots["total_experience"] is None
+    assert agent._next_missing_slot(state) == "project_description"
+
+    planner_input = agent._planner_input("u1", "hello", state, [])
+    assert "streaming ingestion system" in planner_input["cv_context"]
+    assert "Cycling" not in planner_input["cv_context"]
+
+
+def test_cv_context_moves_on_as_slots_fill(make_agent):
+    agent = make_agent()
+    filled = {
+        slot: "done"
+        for slot in utils.PLANNER_REQUIRED_SLOTS
+        if slot not in ("greeting", "notice_period", "visa_status")
+    }
+    state = _state(agent, "u1", **filled)
+    assert agent._next_missing_slot(state) == "notice_period"
+
+    planner_input = agent._planner_input("u1", "", state, [])
+    assert "Notice period: one month" in planner_input["cv_context"]
+
+
+def test_cv_context_is_smaller_than_the_whole_cv(make_agent):
+    agent = make_agent()
+    state = _state(agent, "u1")
+    cv_context = agent._planner_input("u1", "", state, [])["cv_context"]
+    assert len(cv_context) < len(agent.rag.cached_resume("u1").text) / 2
+
+
+def test_history_summary_and_tail_are_sent(make_agent):
+    agent = make_agent()
+    state = _state(agent, "u1")
+    summary = {"role": "summary", "content": "Candidate built a Kafka pipeline.", "metadata": {}}
+    turns = [{"role": "user", "content": f"answer {i}"} for i in range(20)]
+    planner_input = agent._planner_input("u1", "next", state, [summary] + turns)
+
+    assert planner_input["history_summary"] == summary["content"]
+    assert planner_input["history"] == turns[-utils.HISTORY_TAIL_MESSAGES:]
+
+
+def test_history_is_trimmed_to_the_token_budget(make_agent, monkeypatch):
+    monkeypatch.setattr(utils, "PLANNER_HISTORY_TOKEN_BUDGET", 60)
+    agent = make_agent()
+    state = _state(agent, "u1")
+    turns = [{"role": "user", "content": "word " * 30} for _ in range(5)]
+    planner_input = agent._planner_input("u1", "", state, turns)
+
+    assert 0 < len(planner_input["history"]) < 5
+    assert planner_input["history"] == turns[-len(planner_input["history"]):]
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import utils
+
+ANN_CV = "PROFILE\nAnn Lee, backend engineer at Acme. Notice period: one month."
+BOB_CV = "PROFILE\nBob Stone, data scientist at Globex. Visa: needs sponsorship."
+
+
+@pytest.fixture
+def rag(monkeypatch, tmp_path):
+    async def extract(text):
+        return {"candidate": {"full_name": text.split("\n")[1].split(",")[0]}, "experiences": []}
+
+    monkeypatch.setattr(utils, "_extract_resume_structure", extract)
+    rag = utils.GraphRAG()
+    rag.store_dir = tmp_path / "resumes"
+    rag._resumes = utils.LRUTTLCache(max_entries=1, metrics_prefix="resume_cache")
+    return rag
+
+
+def test_resumes_are_isolated_per_user(rag):
+    async def scenario():
+        await rag.index_text("ann", ANN_CV)
+        await rag.index_text("bob", BOB_CV)
+        return await rag.load_resume("ann"), await rag.load_resume("bob")
+
+    ann, bob = asyncio.run(scenario())
+
+    assert (ann.text, ann.candidate_info) == (ANN_CV, {"full_name": "Ann Lee"})
+    assert (bob.text, bob.candidate_info) == (BOB_CV, {"full_name": "Bob Stone"})
+    assert "Bob" not in rag.retrieve_cv_context("ann", slot="notice_period")
+    assert asyncio.run(rag.load_resume("carol")) is None
+    assert rag.has_index()
+
+
+def test_cache_bound_evicts_and_reloads_from_store(rag):
+    asyncio.run(rag.index_text("ann", ANN_CV))
+    asyncio.run(rag.index_text("bob", BOB_CV))
+
+    # max_entries=1: indexing bob pushed ann out of memory, not out of the store.
+    assert rag.cached_resume("ann") is None
+    assert len(rag._resumes) == 1
+
+    ann = asyncio.run(rag.load_resume("ann"))
+
+    assert ann.text == ANN_CV
+    assert ann.section_index is not None
+    assert rag.cached_resume("ann") is ann
+    assert rag.cached_resume("bob") is None
+
+
+def test_load_resume_falls_back_to_graph(rag, monkeypatch):
+    graph_reads = []
+
+    async def read_from_graph(user_id):
+        graph_reads.append(user_id)
+        return utils.ResumeRecord(user_id, ANN_CV, {"candidate": {"full_name": "Ann Lee"}})
+
+    monkeypatch.setattr(rag, "_read_resume_from_graph", read_from_graph)
+    rag._use_graph = True
+
+    record = asyncio.run(rag.load_resume("ann"))
+
+    assert graph_reads == ["ann"]
+    assert record.text == ANN_CV and record.section_index is not None
+    assert asyncio.run(rag.load_resume("ann")) is record
+    assert graph_reads == ["ann"]
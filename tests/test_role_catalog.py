@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import utils
+
+ENTRIES = [
+    ("Machine Learning Engineer", ["PyTorch", "MLOps"], ["Show end-to-end ownership."]),
+    ("Packaging Engineer", ["CAD", "Materials"], ["Talk about cost trade-offs."]),
+    ("Data Scientist", ["SQL", "Statistics"], ["Explain experiments clearly."]),
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "role_catalog.sqlite3"
+    utils.RoleCatalog.write(path, ENTRIES)
+    return utils.RoleCatalog(path)
+
+
+@pytest.mark.parametrize("title, role", [
+    ("machine learning engineer", "Machine Learning Engineer"),
+    ("Senior Machine Learning Engineer with experience in NLP", "Machine Learning Engineer"),
+    ("Sr. Data Scientist", "Data Scientist"),
+    # Near-miss token: "packing" counts as "packaging".
+    ("Packing Engineer", "Packaging Engineer"),
+])
+def test_match_finds_canonical_role(catalog, title, role):
+    entry = catalog.match(title)
+
+    assert entry is not None and entry["role"] == role
+
+
+@pytest.mark.parametrize("title", [
+    "Engineer",
+    "Data Engineer",
+    "Machine Learning Researcher",
+    "Pastry Chef",
+    "",
+])
+def test_match_rejects_roles_below_min_score(catalog, title):
+    assert catalog.match(title) is None
+
+
+def test_min_score_is_the_threshold(tmp_path):
+    path = tmp_path / "role_catalog.sqlite3"
+    utils.RoleCatalog.write(path, ENTRIES)
+
+    assert utils.RoleCatalog(path, min_score=0.99).match("Packing Engineer") is None
+    assert utils.RoleCatalog(path, min_score=0.3).match("Data Engineer") is not None
+
+
+def test_missing_catalog_matches_nothing(tmp_path):
+    catalog = utils.RoleCatalog(tmp_path / "missing.sqlite3")
+
+    assert catalog.match("Machine Learning Engineer") is None
+
+
+def test_reload_picks_up_new_entries(catalog):
+    assert catalog.match("Site Reliability Engineer") is None
+
+    utils.RoleCatalog.write(catalog.path, [("Site Reliability Engineer", ["SLOs"], ["On-call."])])
+    catalog.reload()
+
+    assert catalog.match("site reliability engineer")["skills"] == ["SLOs"]
+
+
+def test_catalog_hits_skip_generation(make_agent, catalog, monkeypatch):
+    agent = make_agent()
+    agent.role_catalog = catalog
+
+    async def generate(*args, **kwargs):
+        raise AssertionError("catalog roles must not call the LLM")
+
+    monkeypatch.setattr(agent, "generate_role_tech_keywords", generate)
+    monkeypatch.setattr(agent, "generate_attitude_tips", generate)
+
+    skills = asyncio.run(agent.cached_role_tech_keywords("Senior ML Engineer Machine Learning", limit=1))
+    tips = asyncio.run(agent.cached_attitude_tips("Packing Engineer", []))
+
+    assert skills == ["PyTorch"]
+    assert tips == ["Talk about cost trade-offs."]
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+import utils
+
+
+@pytest.mark.parametrize("variant", [
+    "Sr. ML Engineer", "sr ml engineer", "  SR  ML-Engineer ", "Sr. ML Engineer",
+])
+def test_normalize_role_maps_variants_to_one_key(variant):
+    assert utils.normalize_role(variant) == "sr ml engineer"
+
+
+def test_normalize_role_keeps_language_names():
+    assert utils.normalize_role("C++ / C# Developer") == "c++ c# developer"
+    assert utils.normalize_role(None) == ""
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = utils.SingleFlight(metrics_prefix="test_flight")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["python"]
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("role", work) for _ in range(5)))
+        # Once finished, the key is forgotten: a later call does the work again.
+        results.append(await flight.do("role", work))
+        return results
+
+    coalesced = utils.METRICS.get("test_flight.coalesced")
+    results = asyncio.run(scenario())
+
+    assert results == [["python"]] * 6
+    assert len(calls) == 2
+    assert utils.METRICS.get("test_flight.coalesced") == coalesced + 4
+
+
+def test_single_flight_shares_failures_without_keeping_them():
+    flight = utils.SingleFlight()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return "ok"
+
+    async def scenario():
+        first = await asyncio.gather(flight.do("k", flaky), flight.do("k", flaky), return_exceptions=True)
+        return first, await flight.do("k", flaky)
+
+    first, retry = asyncio.run(scenario())
+
+    assert [type(r) for r in first] == [RuntimeError, RuntimeError]
+    assert retry == "ok"
+    assert len(attempts) == 2
+
+
+@pytest.fixture
+def agent(make_agent, tmp_path):
+    agent = make_agent()
+    # No catalog entries: every role goes through the cached generator.
+    agent.role_catalog = utils.RoleCatalog(tmp_path / "missing.sqlite3")
+    return agent
+
+
+def _stub_generator(agent, monkeypatch, results):
+    calls = []
+
+    async def generate(role, limit=15):
+        calls.append(role)
+        await asyncio.sleep(0.02)
+        return results.pop(0) if results else []
+
+    monkeypatch.setattr(agent, "generate_role_tech_keywords", generate)
+    return calls
+
+
+def test_concurrent_misses_share_one_generation(agent, monkeypatch):
+    calls = _stub_generator(agent, monkeypatch, [["PyTorch", "SQL"]])
+
+    async def scenario():
+        return await asyncio.gather(
+            agent.cached_role_tech_keywords("Sr. ML Engineer"),
+            agent.cached_role_tech_keywords("sr ml engineer"),
+            agent.cached_role_tech_keywords("SR ML-Engineer"),
+        )
+
+    results = asyncio.run(scenario())
+    again = asyncio.run(agent.cached_role_tech_keywords("Sr ML Engineer"))
+
+    assert results == [["PyTorch", "SQL"]] * 3
+    assert again == ["PyTorch", "SQL"]
+    assert calls == ["Sr. ML Engineer"]
+
+
+def test_empty_results_are_not_cached(agent, monkeypatch):
+    calls = _stub_generator(agent, monkeypatch, [[], ["PyTorch"]])
+
+    first = asyncio.run(agent.cached_role_tech_keywords("ML Engineer"))
+    second = asyncio.run(agent.cached_role_tech_keywords("ML Engineer"))
+    third = asyncio.run(agent.cached_role_tech_keywords("ML Engineer"))
+
+    assert (first, second, third) == ([], ["PyTorch"], ["PyTorch"])
+    assert len(calls) == 2
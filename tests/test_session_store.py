@@ -0,0 +1,180 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+import utils
+
+
+@pytest.fixture(params=["lru", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "lru":
+        yield utils.LRUTTLCache(max_entries=3, ttl_seconds=60)
+        return
+    cache = utils.SQLiteCache(tmp_path / "sessions.sqlite3", max_bytes=1 << 20, ttl_seconds=60)
+    yield cache
+    cache.close()
+
+
+def test_store_get_set_pop(store):
+    assert store.get("u1") is None
+    store.set("u1", {"history": [], "version": 1})
+
+    assert store.get("u1") == {"history": [], "version": 1}
+    assert store.pop("u1") == {"history": [], "version": 1}
+    assert store.pop("u1", "gone") == "gone"
+    assert store.get("u1") is None
+
+
+def test_store_compare_and_set(store):
+    assert store.compare_and_set("u1", {"n": "first", "version": 1}, 0)
+    # A second writer that also started from "no session" loses.
+    assert not store.compare_and_set("u1", {"n": "other", "version": 1}, 0)
+    assert not store.compare_and_set("u1", {"n": "stale", "version": 3}, 2)
+    assert store.compare_and_set("u1", {"n": "second", "version": 2}, 1)
+
+    assert store.get("u1") == {"n": "second", "version": 2}
+
+
+def test_store_entries_expire(store):
+    store.ttl_seconds = 0.05
+    store.set("u1", {"version": 4})
+    time.sleep(0.1)
+
+    assert store.get("u1") is None
+    # An expired session counts as absent for compare_and_set too.
+    store.set("u2", {"version": 4})
+    time.sleep(0.1)
+    assert not store.compare_and_set("u2", {"version": 5}, 4)
+    assert store.compare_and_set("u2", {"version": 1}, 0)
+
+
+def test_lru_store_is_bounded():
+    store = utils.LRUTTLCache(max_entries=2)
+    for user in ("u1", "u2", "u3"):
+        store.set(user, {"version": 1})
+
+    assert store.get("u1") is None
+    assert len(store) == 2
+
+
+def test_sqlite_store_migrates_old_schema(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+        " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO entries VALUES ('u1', '{\"history\": []}', 15, 0)")
+    conn.commit()
+    conn.close()
+
+    store = utils.SQLiteCache(path, max_bytes=1 << 20, ttl_seconds=60)
+    try:
+        assert store.get("u1") == {"history": []}
+        assert store.compare_and_set("u1", {"history": ["x"], "version": 1}, 0)
+        assert store.get("u1") == {"history": ["x"], "version": 1}
+        columns = {row[1] for row in store._connect().execute("PRAGMA table_info(entries)")}
+    finally:
+        store.close()
+    assert {"expires_at", "version"} <= columns
+
+
+def test_sqlite_compare_and_set_holds_across_connections(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+    first = utils.SQLiteCache(path, max_bytes=1 << 20)
+    second = utils.SQLiteCache(path, max_bytes=1 << 20)
+    try:
+        first.set("u1", {"version": 1})
+        second.set("u1", {"version": 2})
+
+        assert not first.compare_and_set("u1", {"version": 2}, 1)
+        assert first.compare_and_set("u1", {"version": 3}, 2)
+        assert second.get("u1") == {"version": 3}
+    finally:
+        first.close()
+        second.close()
+
+
+def _messages(n, start=0):
+    return [{"role": "user", "content": f"message {i}"} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def session_agent(make_agent, monkeypatch):
+    monkeypatch.setattr(utils, "HISTORY_TAIL_MESSAGES", 2)
+    monkeypatch.setattr(utils, "HISTORY_FOLD_BATCH", 2)
+    agent = make_agent()
+    # Folds are driven explicitly by the tests.
+    monkeypatch.setattr(agent, "_fold_history_task", lambda user_id: None)
+    return agent
+
+
+def test_save_session_trims_to_max_turns_and_bumps_version(session_agent, monkeypatch):
+    monkeypatch.setattr(utils, "SESSION_MAX_TURNS", 4)
+    summary = {"role": "summary", "content": "earlier", "metadata": {}}
+    state = utils.InterviewState(slots={"full_name": None})
+
+    async def scenario():
+        await session_agent._save_session("u1", [summary] + _messages(10), state)
+        await session_agent._save_session("u1", [summary] + _messages(10), state)
+
+    asyncio.run(scenario())
+    data = session_agent.sessions.get("u1")
+
+    assert data["history"] == [summary] + _messages(4, start=6)
+    assert data["version"] == 2
+    assert data["state"]["slots"] == {"full_name": None}
+
+
+def test_fold_replaces_older_turns_with_summary(session_agent, monkeypatch):
+    async def fold(summary, messages):
+        return {"role": "summary", "content": f"{len(messages)} folded", "metadata": {}}
+
+    monkeypatch.setattr(session_agent.summarizer, "fold", fold)
+
+    async def scenario():
+        await session_agent._save_session("u1", _messages(5), None)
+        await session_agent._fold_history("u1")
+
+    asyncio.run(scenario())
+    data = session_agent.sessions.get("u1")
+
+    assert data["history"] == [
+        {"role": "summary", "content": "3 folded", "metadata": {}}
+    ] + _messages(2, start=3)
+    assert data["version"] == 2
+
+
+@pytest.mark.parametrize("backend", ["lru", "sqlite"])
+def test_fold_conflicts_with_a_concurrent_turn(make_agent, monkeypatch, tmp_path, backend):
+    monkeypatch.setattr(utils, "HISTORY_TAIL_MESSAGES", 2)
+    monkeypatch.setattr(utils, "HISTORY_FOLD_BATCH", 2)
+    folding = make_agent()
+    # The turn may be saved by this process or, with a shared store, another one.
+    turn = folding if backend == "lru" else make_agent()
+    if backend == "sqlite":
+        path = tmp_path / "sessions.sqlite3"
+        folding.sessions = utils.SQLiteCache(path, max_bytes=1 << 20)
+        turn.sessions = utils.SQLiteCache(path, max_bytes=1 << 20)
+    for agent in (folding, turn):
+        monkeypatch.setattr(agent, "_fold_history_task", lambda user_id: None)
+
+    async def fold_while_a_turn_lands(summary, messages):
+        await turn._save_session("u1", _messages(6), None)
+        return {"role": "summary", "content": "stale", "metadata": {}}
+
+    monkeypatch.setattr(folding.summarizer, "fold", fold_while_a_turn_lands)
+    conflicts = utils.METRICS.get("history_summary.conflicts")
+
+    async def scenario():
+        await folding._save_session("u1", _messages(5), None)
+        await folding._fold_history("u1")
+
+    asyncio.run(scenario())
+    data = folding.sessions.get("u1")
+
+    assert data["history"] == _messages(6)
+    assert data["version"] == 2
+    assert utils.METRICS.get("history_summary.conflicts") == conflicts + 1
@@ -0,0 +1,214 @@
+import asyncio
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import utils
+import worker
+
+
+class RecordingSQS:
+    """
+    The moto SQS client with long polling disabled (so the worker loop can be
+    stopped promptly) and receive/delete/visibility calls recorded.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.receives = []
+        self.delete_batches = []
+        self.visibility_changes = []
+
+    def receive_message(self, **kwargs):
+        self.receives.append(kwargs)
+        return self._client.receive_message(**dict(kwargs, WaitTimeSeconds=0))
+
+    def delete_message_batch(self, **kwargs):
+        self.delete_batches.append(kwargs["Entries"])
+        return self._client.delete_message_batch(**kwargs)
+
+    def change_message_visibility(self, **kwargs):
+        self.visibility_changes.append(kwargs)
+        return self._client.change_message_visibility(**kwargs)
+
+
+class FakeRAG:
+    def __init__(self, fail_users=(), delay=0.0):
+        self.fail_users = set(fail_users)
+        self.delay = delay
+        self.indexed = {}
+        self.connected = self.closed = False
+        self.active = self.peak = 0
+
+    async def connect(self):
+        self.connected = True
+
+    async def close(self):
+        self.closed = True
+
+    async def index_text(self, user_id, text):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if user_id in self.fail_users:
+                raise RuntimeError("indexing failed")
+            self.indexed[user_id] = text
+        finally:
+            self.active -= 1
+
+
+class FakePreprocess:
+    def __init__(self, pool_broken_for=()):
+        self.pool_broken_for = set(pool_broken_for)
+
+    async def aextract_text(self, data, ext):
+        text = data.decode("utf-8")
+        if any(user_id in text for user_id in self.pool_broken_for):
+            raise utils.ExtractionPoolError("extraction pool failed")
+        return text
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    for name, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=worker.S3_BUCKET_RESUMES)
+        client = boto3.client("sqs", region_name="us-east-1")
+        queue_url = client.create_queue(QueueName="resumes")["QueueUrl"]
+        monkeypatch.setattr(worker, "SQS_QUEUE_URL", queue_url)
+        monkeypatch.setattr(worker, "WORKER_DELETE_FLUSH_SECONDS", 0.05)
+        yield s3, client, RecordingSQS(client)
+
+
+def _enqueue_resumes(s3, client, user_ids):
+    for user_id in user_ids:
+        key = f"{user_id}/cv.txt"
+        s3.put_object(Bucket=worker.S3_BUCKET_RESUMES, Key=key, Body=f"resume of {user_id}".encode())
+        client.send_message(
+            QueueUrl=worker.SQS_QUEUE_URL,
+            MessageBody=json.dumps({"type": "resume_uploaded", "user_id": user_id, "s3_key": key, "ext": ".txt"}),
+        )
+
+
+def _queue_counts(client):
+    attrs = client.get_queue_attributes(
+        QueueUrl=worker.SQS_QUEUE_URL,
+        AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+    )["Attributes"]
+    return int(attrs["ApproximateNumberOfMessages"]), int(attrs["ApproximateNumberOfMessagesNotVisible"])
+
+
+async def _run_until(rag, s3, sqs, done, timeout=10.0, preprocessor=None):
+    task = asyncio.create_task(worker.run_worker(rag, preprocessor or FakePreprocess(), s3, sqs))
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not done():
+        assert asyncio.get_running_loop().time() < deadline, "worker did not finish in time"
+        await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+def test_receives_in_batches_and_processes_concurrently(aws, monkeypatch):
+    s3, client, sqs = aws
+    monkeypatch.setattr(worker, "WORKER_CONCURRENCY", 5)
+    users = [f"user{i}" for i in range(7)]
+    _enqueue_resumes(s3, client, users)
+    rag = FakeRAG(delay=0.2)
+
+    asyncio.run(_run_until(rag, s3, sqs, lambda: len(rag.indexed) == len(users) and _queue_counts(client) == (0, 0)))
+
+    assert rag.indexed == {u: f"resume of {u}" for u in users}
+    assert sqs.receives[0]["MaxNumberOfMessages"] == 5
+    assert all(r["MaxNumberOfMessages"] <= worker.SQS_MAX_BATCH for r in sqs.receives)
+    assert 1 < rag.peak <= 5
+    assert rag.connected and rag.closed
+
+
+def test_failed_messages_are_not_deleted(aws):
+    s3, client, sqs = aws
+    _enqueue_resumes(s3, client, ["ok1", "bad", "ok2"])
+    rag = FakeRAG(fail_users={"bad"})
+
+    asyncio.run(_run_until(rag, s3, sqs, lambda: len(rag.indexed) == 2 and _queue_counts(client)[1] <= 1))
+
+    deleted = sum(len(batch) for batch in sqs.delete_batches)
+    assert deleted == 2
+    # The failed message stays in flight and is redelivered after its visibility timeout.
+    assert _queue_counts(client) == (0, 1)
+
+
+def test_extraction_pool_failures_are_redelivered(aws):
+    s3, client, sqs = aws
+    _enqueue_resumes(s3, client, ["ok", "unlucky"])
+    rag = FakeRAG()
+    preprocessor = FakePreprocess(pool_broken_for={"unlucky"})
+
+    asyncio.run(_run_until(
+        rag, s3, sqs, lambda: "ok" in rag.indexed and _queue_counts(client) == (0, 1),
+        preprocessor=preprocessor,
+    ))
+
+    assert "unlucky" not in rag.indexed
+    assert sum(len(batch) for batch in sqs.delete_batches) == 1
+
+
+def test_deletes_processed_messages_in_batches(aws):
+    s3, client, sqs = aws
+    for i in range(12):
+        client.send_message(QueueUrl=worker.SQS_QUEUE_URL, MessageBody=f"m{i}")
+    messages = []
+    while len(messages) < 12:
+        messages += client.receive_message(QueueUrl=worker.SQS_QUEUE_URL, MaxNumberOfMessages=10)["Messages"]
+
+    async def _delete_all():
+        processed = asyncio.Queue()
+        for message in messages:
+            processed.put_nowait({"ReceiptHandle": message["ReceiptHandle"]})
+        deleter = asyncio.create_task(worker._delete_processed(sqs, processed))
+        while sum(len(batch) for batch in sqs.delete_batches) < 12:
+            await asyncio.sleep(0.01)
+        deleter.cancel()
+
+    asyncio.run(_delete_all())
+
+    # One full batch of 10, then the rest flushed after WORKER_DELETE_FLUSH_SECONDS.
+    assert [len(batch) for batch in sqs.delete_batches] == [10, 2]
+    assert all(len({e["Id"] for e in batch}) == len(batch) for batch in sqs.delete_batches)
+    assert _queue_counts(client) == (0, 0)
+
+
+def test_delete_batch_logs_failed_entries(aws, caplog):
+    _, client, sqs = aws
+    client.send_message(QueueUrl=worker.SQS_QUEUE_URL, MessageBody="m")
+    message = client.receive_message(QueueUrl=worker.SQS_QUEUE_URL)["Messages"][0]
+
+    asyncio.run(worker._delete_batch(sqs, [
+        {"ReceiptHandle": message["ReceiptHandle"]},
+        {"ReceiptHandle": "not-a-receipt"},
+    ]))
+
+    assert _queue_counts(client) == (0, 0)
+    assert "failed to delete message" in caplog.text
+
+
+def test_slow_jobs_get_their_visibility_extended(aws, monkeypatch):
+    s3, client, sqs = aws
+    monkeypatch.setattr(worker, "WORKER_VISIBILITY_TIMEOUT", 2)
+    _enqueue_resumes(s3, client, ["slow"])
+    rag = FakeRAG(delay=1.5)
+
+    asyncio.run(_run_until(rag, s3, sqs, lambda: "slow" in rag.indexed and _queue_counts(client) == (0, 0)))
+
+    assert len(sqs.visibility_changes) >= 1
+    assert sqs.visibility_changes[0]["VisibilityTimeout"] == 2
@@ -1,24 +1,181 @@
 import asyncio
+import difflib
+import hashlib
+import io
 import json
-import os,requests
+import os
 import pathlib
 import sys
 import logging
+import math
 import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+import weakref
 import PyPDF2
 import docx2txt
-from openai import OpenAI
 
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import AsyncExitStack
 from importlib import import_module
+from urllib.parse import urljoin, urldefrag, urlparse
+
+import httpx
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+try:
+    from bs4 import BeautifulSoup
+except ModuleNotFoundError:  # only needed by CompanyInsightsScraper
+    BeautifulSoup = None
+
+try:
+    import tiktoken
+except ModuleNotFoundError:  # token budgets fall back to a chars/4 estimate
+    tiktoken = None
+
 
 # Default temperature for most LLM calls: a bit flexible, but not too random.
 DEFAULT_TEMPERATURE = 0.4
 
+# Per-user resume store: in-memory LRU/TTL cache in front of a JSON-on-disk store
+# that is shared with the indexing worker.
+RESUME_CACHE_MAX_ENTRIES = int(os.environ.get("RESUME_CACHE_MAX_ENTRIES", "512"))
+RESUME_CACHE_TTL_SECONDS = float(os.environ.get("RESUME_CACHE_TTL_SECONDS", "3600"))
+RESUME_STORE_DIR = os.environ.get(
+    "RESUME_STORE_DIR", str(pathlib.Path(__file__).parent / "resume_store")
+)
+
+# Content-addressed cache for resume structure extraction, so re-uploads and
+# SQS redeliveries of the same CV skip the LLM. Bump the prompt version whenever
+# the extraction prompt or model changes.
+RESUME_STRUCTURE_PROMPT_VERSION = "1"
+RESUME_STRUCTURE_CACHE_PATH = os.environ.get(
+    "RESUME_STRUCTURE_CACHE_PATH",
+    str(pathlib.Path(RESUME_STORE_DIR) / "structure_cache.sqlite3"),
+)
+RESUME_STRUCTURE_CACHE_MAX_BYTES = int(
+    os.environ.get("RESUME_STRUCTURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# Neo4j async driver pool: max open connections per process and how long a
+# query waits for a free connection before failing.
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE") or None
+NEO4J_MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT_SECONDS = float(
+    os.environ.get("NEO4J_ACQUISITION_TIMEOUT_SECONDS", "30")
+)
+# Graph retrieval: experiences returned per slot subgraph.
+GRAPH_RETRIEVAL_MAX_EXPERIENCES = int(os.environ.get("GRAPH_RETRIEVAL_MAX_EXPERIENCES", "3"))
+# Number of resumes written to Neo4j per transaction by bulk/backfill writes.
+GRAPH_WRITE_BATCH_SIZE = int(os.environ.get("GRAPH_WRITE_BATCH_SIZE", "200"))
+
+# CV retrieval: number of resume sections sent per LLM call, and the CV size
+# below which the whole text is sent anyway.
+CV_RETRIEVAL_TOP_K = int(os.environ.get("CV_RETRIEVAL_TOP_K", "3"))
+CV_RETRIEVAL_MIN_CHARS = int(os.environ.get("CV_RETRIEVAL_MIN_CHARS", "1500"))
+
+# Resume text extraction (PDF/DOCX) runs in a process pool.
+EXTRACT_MAX_WORKERS = int(os.environ.get("EXTRACT_MAX_WORKERS", str(os.cpu_count() or 2)))
+EXTRACT_TIMEOUT_SECONDS = float(os.environ.get("EXTRACT_TIMEOUT_SECONDS", "30"))
+EXTRACT_MAX_PAGES = int(os.environ.get("EXTRACT_MAX_PAGES", "20"))
+
+# Company website crawler: concurrent fetches and request rate per host.
+CRAWL_MAX_PER_HOST = int(os.environ.get("CRAWL_MAX_PER_HOST", "2"))
+CRAWL_RATE_PER_SECOND = float(os.environ.get("CRAWL_RATE_PER_SECOND", "3"))
+CRAWL_TIMEOUT_SECONDS = float(os.environ.get("CRAWL_TIMEOUT_SECONDS", "8"))
+
+# Company profiles are shared by all users: cached on disk, served stale while
+# a background task recrawls them every COMPANY_PROFILE_TTL_SECONDS.
+COMPANY_PROFILE_TTL_SECONDS = float(os.environ.get("COMPANY_PROFILE_TTL_SECONDS", "86400"))
+# A recrawl that finds no pages keeps the stored profile and retries sooner.
+COMPANY_PROFILE_RETRY_SECONDS = float(os.environ.get("COMPANY_PROFILE_RETRY_SECONDS", "300"))
+COMPANY_PROFILE_CACHE_PATH = os.environ.get(
+    "COMPANY_PROFILE_CACHE_PATH",
+    str(pathlib.Path(__file__).parent / "cache" / "company_profiles.sqlite3"),
+)
+COMPANY_PROFILE_CACHE_MAX_BYTES = int(
+    os.environ.get("COMPANY_PROFILE_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+
+# Role-level suggestion box data (hot skills, attitude tips), keyed by the
+# normalised role. Set SUGGESTIONS_CACHE_URL (redis://...) to share it across
+# processes; otherwise it is an in-process LRU.
+SUGGESTIONS_CACHE_URL = os.environ.get("SUGGESTIONS_CACHE_URL") or None
+SUGGESTIONS_CACHE_MAX_ENTRIES = int(os.environ.get("SUGGESTIONS_CACHE_MAX_ENTRIES", "1024"))
+SUGGESTIONS_CACHE_TTL_SECONDS = float(os.environ.get("SUGGESTIONS_CACHE_TTL_SECONDS", "86400"))
+
+# Precomputed skills/tips for canonical roles (built offline with
+# `python worker.py build-role-catalog`); sidebar roles that match one closely
+# enough are served from it without an LLM call.
+ROLE_CATALOG_PATH = os.environ.get(
+    "ROLE_CATALOG_PATH", str(pathlib.Path(__file__).parent / "cache" / "role_catalog.sqlite3")
+)
+ROLE_CATALOG_MIN_SCORE = float(os.environ.get("ROLE_CATALOG_MIN_SCORE", "0.75"))
+
+# Per-user chat sessions (history + interview state). SESSION_STORE_URL picks
+# the backend: unset for an in-process LRU, sqlite:///path or redis://... to
+# persist them and share them between API processes.
+SESSION_STORE_URL = os.environ.get("SESSION_STORE_URL") or None
+SESSION_MAX_ENTRIES = int(os.environ.get("SESSION_MAX_ENTRIES", "10000"))
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+SESSION_STORE_MAX_BYTES = int(os.environ.get("SESSION_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Messages kept per user; older ones are dropped when the session is saved.
+SESSION_MAX_TURNS = int(os.environ.get("SESSION_MAX_TURNS", "60"))
+
+# Speculative question prefetch: after each reply, pre-generate the question
+# for the slot the planner is most likely to pick next and use it if it does.
+# Off by default since misses spend tokens for nothing.
+SPECULATIVE_QUESTIONS = os.environ.get("SPECULATIVE_QUESTIONS", "0").lower() in ("1", "true", "yes")
+SPECULATIVE_QUESTION_TTL_SECONDS = float(os.environ.get("SPECULATIVE_QUESTION_TTL_SECONDS", "900"))
+
+# Fused turn mode: one JSON completion returns both the planner decision and
+# the question text. FUSED_TURN_FRACTION is the share of users (stable hash
+# buckets) served by it, for A/B comparison against the planner + speaker path.
+FUSED_TURN_FRACTION = float(os.environ.get("FUSED_TURN_FRACTION", "0"))
+
+# Durable background jobs (end-of-interview owner reports) kept in SQLite so
+# they survive restarts. A claimed job is leased for JOB_LEASE_SECONDS; failed
+# jobs are retried with exponential backoff up to JOB_MAX_ATTEMPTS times.
+JOB_QUEUE_PATH = os.environ.get(
+    "JOB_QUEUE_PATH", str(pathlib.Path(__file__).parent / "cache" / "jobs.sqlite3")
+)
+JOB_QUEUE_CONCURRENCY = int(os.environ.get("JOB_QUEUE_CONCURRENCY", "2"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "6"))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get("JOB_RETRY_BASE_SECONDS", "10"))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "5"))
+# Finished jobs (and their idempotency keys) are pruned after this long.
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", str(30 * 24 * 3600)))
+
+# Rolling history summary: once a session holds more than
+# HISTORY_TAIL_MESSAGES + HISTORY_FOLD_BATCH unsummarised messages, the older
+# ones are folded into a running summary in the background after the turn.
+HISTORY_TAIL_MESSAGES = int(os.environ.get("HISTORY_TAIL_MESSAGES", "8"))
+HISTORY_FOLD_BATCH = int(os.environ.get("HISTORY_FOLD_BATCH", "8"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.environ.get("HISTORY_SUMMARY_MAX_TOKENS", "400"))
+# Prompt token budgets for the history carried by the planner and analyzer.
+PLANNER_HISTORY_TOKEN_BUDGET = int(os.environ.get("PLANNER_HISTORY_TOKEN_BUDGET", "1500"))
+ANALYZER_TOKEN_BUDGET = int(os.environ.get("ANALYZER_TOKEN_BUDGET", "4000"))
+
+# Connection pool tuning for the shared OpenAI HTTP clients.
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", "60"))
+# Max concurrent in-flight completions per model; per-model overrides as JSON,
+# e.g. OPENAI_MAX_IN_FLIGHT_PER_MODEL='{"gpt-4.1-mini": 128}'.
+OPENAI_MAX_IN_FLIGHT = int(os.environ.get("OPENAI_MAX_IN_FLIGHT", "64"))
+OPENAI_MAX_IN_FLIGHT_PER_MODEL = json.loads(
+    os.environ.get("OPENAI_MAX_IN_FLIGHT_PER_MODEL") or "{}"
+)
+
 
 # Ordered list of interview slots used by the planner and speaker.
 INTERVIEW_SLOT_ORDER = [
@@ -37,6 +194,47 @@ INTERVIEW_SLOT_ORDER = [
 ]
 
 
+# Default catalog of canonical roles for the offline role-catalog build.
+CANONICAL_ROLES = [
+    "Machine Learning Engineer",
+    "Data Scientist",
+    "Data Engineer",
+    "Data Analyst",
+    "MLOps Engineer",
+    "AI Research Scientist",
+    "Computer Vision Engineer",
+    "NLP Engineer",
+    "Software Engineer",
+    "Backend Engineer",
+    "Frontend Engineer",
+    "Full Stack Engineer",
+    "Mobile Developer",
+    "DevOps Engineer",
+    "Site Reliability Engineer",
+    "Cloud Engineer",
+    "Security Engineer",
+    "QA Engineer",
+    "Embedded Software Engineer",
+    "Product Manager",
+    "Project Manager",
+    "UX Designer",
+    "Business Analyst",
+    "Mechanical Engineer",
+    "Electrical Engineer",
+    "Civil Engineer",
+    "Chemical Engineer",
+    "Process Engineer",
+    "Manufacturing Engineer",
+    "Packaging Machinery Engineer",
+    "Automation Engineer",
+    "Controls Engineer",
+    "Sales Manager",
+    "Marketing Manager",
+    "Accountant",
+    "HR Manager",
+]
+
+
 ##prompt- injections heuristic
 
 SUSPICIOUS_PATTERNS = [
@@ -52,6 +250,23 @@ SUSPICIOUS_PATTERNS = [
 ]
 
 
+# Retrieval query terms per interview slot, used to pick the CV sections that
+# are relevant to the question being asked.
+SLOT_RETRIEVAL_TERMS = {
+    "greeting": "summary profile headline experience",
+    "total_experience": "experience years role company present",
+    "project_description": "project built developed designed implemented delivered system",
+    "project_metric": "metric kpi accuracy improved reduced increased percent revenue latency cost",
+    "project_bottleneck": "challenge bottleneck problem scaling performance constraint issue",
+    "project_solution": "solution optimized redesigned migrated automated implemented resolved",
+    "team_challenge": "team stakeholders collaborated cross functional communication conflict",
+    "adaptability_example": "learned new migrated adopted pivot transition certification",
+    "leadership_example": "led lead managed mentored owned initiative coordinated",
+    "notice_period": "available notice current role present",
+    "visa_status": "visa citizenship authorization location relocation permit",
+}
+
+
 # Simple heuristic patterns to detect when the user refuses or cannot answer.
 REFUSAL_PATTERNS = [
     "i don't know",
@@ -67,6 +282,12 @@ REFUSAL_PATTERNS = [
 ]
 
 
+# Prefixed to the answer when the next reply must be given via /voice.
+VOICE_REQUIRED_NOTICE = (
+    "I need to hear this one — please tap the Voice button and tell me about it."
+)
+
+
 def is_refusal_message(text: str) -> bool:
     """
     Very simple heuristic: check if the user is refusing / unable to answer.
@@ -76,21 +297,297 @@ def is_refusal_message(text: str) -> bool:
 
 
 
+class Metrics:
+    """
+    Process-wide, thread-safe counters exposed by the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """
+        Record a gauge (last observed value) rather than a running total.
+        """
+        with self._lock:
+            self._counters[name] = value
+
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+
+METRICS = Metrics()
+
+
+def _record_llm_usage(call_name, response):
+    """
+    Count prompt/cached/completion tokens for one completion under
+    llm.<call_name>.*, plus the cached-token ratio of this call as a gauge.
+    Returns the call's prompt + completion tokens (0 without usage).
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+    METRICS.incr(f"llm.{call_name}.calls")
+    METRICS.incr(f"llm.{call_name}.prompt_tokens", prompt_tokens)
+    METRICS.incr(f"llm.{call_name}.cached_tokens", cached_tokens)
+    METRICS.incr(f"llm.{call_name}.completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+    METRICS.set(
+        f"llm.{call_name}.last_cached_ratio",
+        round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+    )
+    return prompt_tokens + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+_TOKEN_ENCODING = None
+
+
+def _count_tokens(text):
+    """
+    Token count of `text` in the chat models' encoding; a chars/4 estimate if
+    tiktoken (or its encoding file) is unavailable.
+    """
+    global _TOKEN_ENCODING
+    if not text:
+        return 0
+    if tiktoken is not None and _TOKEN_ENCODING is not False:
+        try:
+            if _TOKEN_ENCODING is None:
+                _TOKEN_ENCODING = tiktoken.get_encoding("o200k_base")
+            return len(_TOKEN_ENCODING.encode(text))
+        except Exception as e:
+            logging.warning(f"tiktoken unavailable, estimating token counts: {e}")
+            _TOKEN_ENCODING = False
+    return (len(text) + 3) // 4
+
+
+def _fit_token_budget(call_name, budget, fixed_tokens, items, render=json.dumps):
+    """
+    Keep the newest `items` that fit in `budget` tokens next to `fixed_tokens`
+    of other prompt content (oldest are dropped first).
+
+    Records llm.<call_name>.budget_tokens / .history_tokens gauges and counts
+    trimmed calls and dropped items. Returns (kept_items, tokens_used).
+    """
+    kept = []
+    used = fixed_tokens
+    for item in reversed(items):
+        cost = _count_tokens(render(item))
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    kept.reverse()
+    dropped = len(items) - len(kept)
+    METRICS.set(f"llm.{call_name}.budget_tokens", budget)
+    METRICS.set(f"llm.{call_name}.history_tokens", used)
+    if dropped:
+        METRICS.incr(f"llm.{call_name}.budget_trimmed")
+        METRICS.incr(f"llm.{call_name}.budget_dropped_items", dropped)
+    return kept, used
+
+
+def _split_history_summary(history):
+    """
+    (summary message or None, remaining messages) for a session history; the
+    running summary, when present, is always the first entry.
+    """
+    if history and history[0].get("role") == "summary":
+        return history[0], list(history[1:])
+    return None, list(history or [])
+
+
+class OpenAIClientRegistry:
+    """
+    Hands out one shared OpenAI client (and one AsyncOpenAI client per event
+    loop) backed by a keep-alive httpx connection pool, so the whole process
+    reuses TLS connections instead of building a new pool per call site.
+
+    Every HTTP request and every newly opened TCP connection is counted in
+    METRICS ("openai.http_requests" / "openai.connections_opened"); the
+    difference is the number of requests served on a reused connection.
+    """
+
+    def __init__(
+        self,
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+        self._sync_client = None
+        # httpx async pools (and our semaphores) are bound to the loop that uses them.
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._in_flight = weakref.WeakKeyDictionary()
+
+    def _openai_module(self):
+        try:
+            return import_module("openai")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "OpenAI SDK is required. Install it with `pip install openai`."
+            ) from exc
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @staticmethod
+    def _trace(event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            METRICS.incr("openai.connections_opened")
+
+    def _on_request(self, request):
+        METRICS.incr("openai.http_requests")
+        request.extensions["trace"] = self._trace
+
+    async def _on_request_async(self, request):
+        METRICS.incr("openai.http_requests")
+
+        async def _trace(event_name, info):
+            self._trace(event_name, info)
+
+        request.extensions["trace"] = _trace
+
+    def sync(self):
+        with self._lock:
+            if self._sync_client is None:
+                openai_module = self._openai_module()
+                http_client = openai_module.DefaultHttpxClient(
+                    limits=self._limits(),
+                    event_hooks={"request": [self._on_request]},
+                )
+                self._sync_client = openai_module.OpenAI(http_client=http_client)
+            return self._sync_client
+
+    def async_(self):
+        """
+        AsyncOpenAI client for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                openai_module = self._openai_module()
+                http_client = openai_module.DefaultAsyncHttpxClient(
+                    limits=self._limits(),
+                    event_hooks={"request": [self._on_request_async]},
+                )
+                client = openai_module.AsyncOpenAI(http_client=http_client)
+                self._async_clients[loop] = client
+            return client
+
+    def in_flight(self, model):
+        """
+        Semaphore bounding concurrent completions for `model` on the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            per_loop = self._in_flight.setdefault(loop, {})
+            sem = per_loop.get(model)
+            if sem is None:
+                limit = int(OPENAI_MAX_IN_FLIGHT_PER_MODEL.get(model, OPENAI_MAX_IN_FLIGHT))
+                sem = asyncio.Semaphore(limit)
+                per_loop[model] = sem
+            return sem
+
+    def stats(self):
+        requests_made = METRICS.get("openai.http_requests")
+        opened = METRICS.get("openai.connections_opened")
+        reused = max(requests_made - opened, 0)
+        return {
+            "http_requests": requests_made,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / requests_made, 4) if requests_made else 0.0,
+        }
+
+
+openai_clients = OpenAIClientRegistry()
+
+
 def _create_openai_client():
-    try:
-        openai_module = import_module("openai")
-    except ModuleNotFoundError as exc:
-        raise RuntimeError(
-            "OpenAI SDK is required. Install it with `pip install openai`."
-        ) from exc
-    return openai_module.OpenAI()
+    """
+    Return the process-wide pooled OpenAI client.
+    """
+    return openai_clients.sync()
+
 
-def _extract_resume_structure(text):
+async def _achat_completion(client=None, **kwargs):
+    """
+    Run a chat completion on the shared AsyncOpenAI client (or `client`),
+    bounded by the per-model in-flight limit. For stream=True the caller
+    iterates the returned stream; use _astream_completion to keep the
+    in-flight slot held for the whole stream.
+    """
+    model = kwargs["model"]
+    METRICS.incr(f"llm.calls.{model}")
+    async with openai_clients.in_flight(model):
+        return await (client or openai_clients.async_()).chat.completions.create(**kwargs)
+
+
+async def _astream_completion(client=None, on_usage=None, **kwargs):
+    """
+    Stream a chat completion, yielding text deltas while holding the model's
+    in-flight slot until the stream is exhausted. With `on_usage`, the stream
+    includes token usage and the final chunk carrying it is passed to it.
+    """
+    model = kwargs["model"]
+    METRICS.incr(f"llm.calls.{model}")
+    if on_usage is not None:
+        kwargs.setdefault("stream_options", {"include_usage": True})
+    async with openai_clients.in_flight(model):
+        stream = await (client or openai_clients.async_()).chat.completions.create(
+            stream=True, **kwargs
+        )
+        async for chunk in stream:
+            if on_usage is not None and getattr(chunk, "usage", None) is not None:
+                on_usage(chunk)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+def _resume_structure_cache_key(text):
+    """
+    Cache key for a CV: hash of the whitespace/Unicode-normalised text plus the
+    extraction prompt version.
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text or "").split())
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"v{RESUME_STRUCTURE_PROMPT_VERSION}:{digest}"
+
+
+async def _extract_resume_structure(text):
     """
     Use the same OpenAI client as ChatAgent to turn raw CV text into a structured JSON
-    with candidate, experiences, and skills.
+    with candidate, experiences, and skills. Results are cached by content hash,
+    so the same CV is only ever sent to the LLM once per prompt version.
     """
-    llm = _create_openai_client()
+    cache_key = _resume_structure_cache_key(text)
+    cached = await asyncio.to_thread(RESUME_STRUCTURE_CACHE.get, cache_key)
+    if cached is not None:
+        return cached
 
     system_prompt = (
         "You are a resume parser for an ATS. "
@@ -120,7 +617,7 @@ def _extract_resume_structure(text):
         "Be concise; do NOT invent details that are not clearly implied in the text."
     )
 
-    response = llm.chat.completions.create(
+    response = await _achat_completion(
         model="gpt-4.1-mini",
         messages=[
             {"role": "system", "content": system_prompt},
@@ -132,7 +629,8 @@ def _extract_resume_structure(text):
     try:
         data = json.loads(content)
     except json.JSONDecodeError:
-        # Very simple fallback: wrap everything in a single experience
+        # Very simple fallback: wrap everything in a single experience. Not
+        # cached, so the next upload of this CV gets another try.
         return {
             "candidate": {
                 "full_name": None,
@@ -154,32 +652,31 @@ def _extract_resume_structure(text):
             ],
             "skills": [],
         }
+    await asyncio.to_thread(RESUME_STRUCTURE_CACHE.set, cache_key, data)
     return data
 
-def _create_neo4j_graph(*, url, username, password):
+def _create_neo4j_driver(*, url, username, password):
     """
-    Create a Neo4jGraph using the modern langchain-neo4j package when available.
-    Fall back to None (disabling graph mode) if the dependency is missing.
+    Create an async Neo4j driver with a bounded connection pool when the
+    official `neo4j` package is available. Fall back to None (disabling graph
+    mode) if the dependency is missing. No connection is opened here.
     """
     try:
-        neo4j_module = import_module("langchain_neo4j")
+        neo4j_module = import_module("neo4j")
     except ModuleNotFoundError as exc:
         logging.warning(
-            "langchain-neo4j / Neo4jGraph not available: %s. "
+            "neo4j driver not available: %s. "
             "Graph RAG will run in in-memory fallback mode.",
             exc,
         )
         return None
 
-    Neo4jGraph = getattr(neo4j_module, "Neo4jGraph", None)
-    if Neo4jGraph is None:
-        logging.warning(
-            "Neo4jGraph class not found in langchain_neo4j; "
-            "Graph RAG will run in in-memory fallback mode."
-        )
-        return None
-
-    return Neo4jGraph(url=url, username=username, password=password)
+    return neo4j_module.AsyncGraphDatabase.driver(
+        url,
+        auth=(username, password),
+        max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+        connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT_SECONDS,
+    )
 
 
 def _create_neo4j_chain(graph, model_name):
@@ -195,13 +692,839 @@ def _create_neo4j_chain(graph, model_name):
     For now this returns None, which means GraphRAG will still index resumes
     into Neo4j but will use the in-memory text fallback for answering queries.
     If you later want full graph QA, you can plug in a custom chain here that
-    calls your LLM with Cypher results from `graph.query(...)`.
+    calls your LLM with Cypher results from the driver's `execute_query(...)`.
     """
     if graph is None:
         return None
         return None
 
 
+class LRUTTLCache:
+    """
+    Small thread-safe LRU cache whose entries also expire after `ttl_seconds`
+    (None disables expiry). Hits/misses are counted in METRICS under
+    `metrics_prefix` when one is given. `on_evict(key, value)` is called,
+    outside the lock, for entries dropped for capacity or expiry (not for
+    pop() or clear()).
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=None, metrics_prefix=None, on_evict=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.metrics_prefix = metrics_prefix
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def _count(self, outcome):
+        if self.metrics_prefix:
+            METRICS.incr(f"{self.metrics_prefix}.{outcome}")
+
+    def _evicted(self, items):
+        if self.on_evict is not None:
+            for key, value in items:
+                self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._count("hits")
+                    return value
+                del self._data[key]
+        self._count("misses")
+        if item is not None:
+            self._evicted([(key, item[1])])
+        return default
+
+    def set(self, key, value):
+        with self._lock:
+            evicted = self._store(key, value)
+        self._evicted(evicted)
+
+    def _store(self, key, value):
+        # Caller holds the lock; returns the entries evicted for capacity.
+        expires_at = (
+            time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        )
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        evicted = []
+        while len(self._data) > self.max_entries:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            evicted.append((old_key, old_value))
+        return evicted
+
+    def peek(self, key, default=None):
+        """
+        Like get(), but without touching the hit/miss counters.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is None or expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                return value
+            del self._data[key]
+        self._evicted([(key, value)])
+        return default
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def compare_and_set(self, key, value, version):
+        """
+        Store dict `value` only if the stored entry's "version" field equals
+        `version` (a missing or expired entry counts as version 0). Returns
+        whether it was written.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            current = None
+            if item is not None and (item[0] is None or item[0] > time.monotonic()):
+                current = item[1]
+            if (current or {}).get("version", 0) != version:
+                return False
+            evicted = self._store(key, value)
+        self._evicted(evicted)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCache:
+    """
+    get/set/pop with the same semantics as LRUTTLCache, backed by a Redis (or
+    Redis-compatible) server so several processes share entries. Values are
+    stored as JSON under `key_prefix`; entries expire after `ttl_seconds` and
+    memory is bounded by the server's maxmemory/LRU policy.
+    """
+
+    def __init__(self, url, ttl_seconds=None, key_prefix="", metrics_prefix=None):
+        try:
+            redis_module = import_module("redis")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "Redis cache backend requires `pip install redis`."
+            ) from exc
+        self._client = redis_module.Redis.from_url(url)
+        self._watch_error = redis_module.WatchError
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.metrics_prefix = metrics_prefix
+
+    def _count(self, outcome):
+        if self.metrics_prefix:
+            METRICS.incr(f"{self.metrics_prefix}.{outcome}")
+
+    def get(self, key, default=None):
+        raw = self._client.get(f"{self.key_prefix}{key}")
+        if raw is None:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return json.loads(raw)
+
+    def set(self, key, value):
+        ttl = int(math.ceil(self.ttl_seconds)) if self.ttl_seconds is not None else None
+        self._client.set(f"{self.key_prefix}{key}", json.dumps(value, ensure_ascii=False), ex=ttl)
+
+    def pop(self, key, default=None):
+        full_key = f"{self.key_prefix}{key}"
+        raw = self._client.getdel(full_key)
+        return default if raw is None else json.loads(raw)
+
+    def compare_and_set(self, key, value, version):
+        """
+        Like LRUTTLCache.compare_and_set, atomically across processes:
+        WATCH the key and write in MULTI/EXEC, so a write by anyone else
+        between the version check and the SET aborts this one.
+        """
+        full_key = f"{self.key_prefix}{key}"
+        ttl = int(math.ceil(self.ttl_seconds)) if self.ttl_seconds is not None else None
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(full_key)
+                raw = pipe.get(full_key)
+                current = json.loads(raw) if raw is not None else {}
+                if current.get("version", 0) != version:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.set(full_key, json.dumps(value, ensure_ascii=False), ex=ttl)
+                pipe.execute()
+            except self._watch_error:
+                return False
+        return True
+
+
+def create_shared_cache(
+    url, *, max_entries, ttl_seconds, key_prefix, metrics_prefix, max_bytes=64 * 1024 * 1024
+):
+    """
+    Cache backend chosen by `url`: SQLiteCache for sqlite:///path (bounded by
+    `max_bytes`), RedisCache for redis://..., otherwise (or if the Redis client
+    is not installed) an in-process LRUTTLCache bounded by `max_entries`.
+    """
+    if url and url.startswith("sqlite:///"):
+        return SQLiteCache(
+            url[len("sqlite:///"):],
+            max_bytes,
+            metrics_prefix=metrics_prefix,
+            ttl_seconds=ttl_seconds,
+        )
+    if url:
+        try:
+            return RedisCache(
+                url, ttl_seconds=ttl_seconds, key_prefix=key_prefix, metrics_prefix=metrics_prefix
+            )
+        except RuntimeError as exc:
+            logging.warning("%s; falling back to an in-process cache.", exc)
+    return LRUTTLCache(
+        max_entries=max_entries, ttl_seconds=ttl_seconds, metrics_prefix=metrics_prefix
+    )
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the
+    work, later callers await the same task instead of repeating it.
+    """
+
+    def __init__(self, metrics_prefix=None):
+        self.metrics_prefix = metrics_prefix
+        self._tasks: dict = {}
+
+    async def do(self, key, func):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        elif self.metrics_prefix:
+            METRICS.incr(f"{self.metrics_prefix}.coalesced")
+        # Shielded so one caller giving up does not cancel the shared work.
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+
+def normalize_role(role):
+    """
+    Canonical cache key for a role title: case, punctuation and spacing
+    differences ("Sr. ML Engineer " vs "sr ml engineer") map to one key.
+    """
+    role = unicodedata.normalize("NFKC", role or "").casefold()
+    return " ".join(re.sub(r"[^\w+#]+", " ", role).split())
+
+
+class RoleCatalog:
+    """
+    Read-side of the precomputed role catalog: canonical roles with their hot
+    skills and attitude tips, stored in SQLite and held in memory once loaded.
+    match() maps a free-form role title to the closest canonical role.
+    """
+
+    def __init__(self, path=ROLE_CATALOG_PATH, min_score=ROLE_CATALOG_MIN_SCORE):
+        self.path = pathlib.Path(path)
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._entries = None
+        self._by_token: dict[str, set[int]] = {}
+
+    @staticmethod
+    def _connect(path):
+        conn = sqlite3.connect(str(path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS roles ("
+            " role TEXT PRIMARY KEY,"
+            " skills TEXT NOT NULL,"
+            " tips TEXT NOT NULL)"
+        )
+        return conn
+
+    @classmethod
+    def write(cls, path, entries):
+        """
+        Upsert (role, skills, tips) rows into the catalog at `path`.
+        """
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = cls._connect(path)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO roles (role, skills, tips) VALUES (?, ?, ?)",
+                    [
+                        (role, json.dumps(skills, ensure_ascii=False), json.dumps(tips, ensure_ascii=False))
+                        for role, skills, tips in entries
+                    ],
+                )
+        finally:
+            conn.close()
+
+    def _load(self):
+        with self._lock:
+            if self._entries is not None:
+                return
+            entries = []
+            if self.path.exists():
+                conn = self._connect(self.path)
+                try:
+                    rows = conn.execute("SELECT role, skills, tips FROM roles").fetchall()
+                finally:
+                    conn.close()
+                for role, skills, tips in rows:
+                    entries.append({
+                        "role": role,
+                        "normalized": normalize_role(role),
+                        "skills": json.loads(skills),
+                        "tips": json.loads(tips),
+                    })
+            by_token: dict[str, set[int]] = {}
+            for idx, entry in enumerate(entries):
+                for token in entry["normalized"].split():
+                    by_token.setdefault(token, set()).add(idx)
+            self._by_token = by_token
+            self._entries = entries
+
+    def reload(self):
+        with self._lock:
+            self._entries = None
+        self._load()
+
+    def match(self, role_title):
+        """
+        Catalog entry for the canonical role closest to `role_title`, or None.
+        Candidates share at least one token with the title; the score is the
+        fraction of the canonical role's tokens (nearly) present in the title, blended
+        with the string similarity of the two, so extra words in the title
+        (seniority, "with experience in ...") do not prevent a match.
+        """
+        self._load()
+        normalized = normalize_role(role_title)
+        tokens = set(normalized.split())
+        candidates = set()
+        for token in tokens:
+            candidates |= self._by_token.get(token, set())
+        best, best_score = None, 0.0
+        for idx in candidates:
+            entry = self._entries[idx]
+            role_tokens = set(entry["normalized"].split())
+            # Tokens count as present on a near-miss too ("packing"/"packaging").
+            covered = sum(
+                1 for token in role_tokens
+                if token in tokens or difflib.get_close_matches(token, tokens, n=1, cutoff=0.8)
+            )
+            coverage = covered / len(role_tokens)
+            similarity = difflib.SequenceMatcher(None, normalized, entry["normalized"]).ratio()
+            score = 0.8 * coverage + 0.2 * similarity
+            if score > best_score:
+                best, best_score = entry, score
+        if best is None or best_score < self.min_score:
+            METRICS.incr("role_catalog.misses")
+            return None
+        METRICS.incr("role_catalog.hits")
+        return best
+
+
+async def build_role_catalog(agent, roles, path=ROLE_CATALOG_PATH, concurrency=4):
+    """
+    Offline batch job: generate hot skills and attitude tips for every role in
+    `roles` with `agent` (a ChatAgent) and write them to the role catalog.
+    Roles whose generation comes back empty are skipped. Returns the number
+    of roles written.
+    """
+    limit = asyncio.Semaphore(concurrency)
+
+    async def _generate(role):
+        async with limit:
+            skills = await agent.generate_role_tech_keywords(role, limit=15)
+            tips = await agent.generate_attitude_tips(role, skills) if skills else []
+        if not (skills and tips):
+            logging.warning("Role catalog: no suggestions generated for %r; skipping.", role)
+            return None
+        return role, skills, tips
+
+    results = await asyncio.gather(*(_generate(role) for role in roles))
+    entries = [entry for entry in results if entry is not None]
+    await asyncio.to_thread(RoleCatalog.write, path, entries)
+    return len(entries)
+
+
+class SQLiteCache:
+    """
+    Persistent JSON cache in SQLite, e.g. for values keyed by content hash.
+    Entries expire after `ttl_seconds` (None: never); once the stored values
+    exceed `max_bytes` the least recently used ones are evicted. The database
+    is opened lazily, and hits/misses plus the running hit rate are recorded
+    in METRICS under `metrics_prefix`. The "version" field of dict values is
+    mirrored in a column so compare_and_set() is a single conditional UPDATE.
+    """
+
+    def __init__(self, path, max_bytes, metrics_prefix=None, ttl_seconds=None):
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.metrics_prefix = metrics_prefix
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " expires_at REAL,"
+                " version INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "expires_at" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+            if "version" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _count(self, outcome):
+        if not self.metrics_prefix:
+            return
+        METRICS.incr(f"{self.metrics_prefix}.{outcome}")
+        hits = METRICS.get(f"{self.metrics_prefix}.hits")
+        misses = METRICS.get(f"{self.metrics_prefix}.misses")
+        METRICS.set(f"{self.metrics_prefix}.hit_rate", round(hits / (hits + misses), 4))
+
+    def get(self, key, default=None):
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] is not None and row[1] <= now:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    row = None
+                elif row is not None:
+                    conn.execute(
+                        "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+                    )
+                conn.commit()
+        except sqlite3.Error as exc:
+            logging.warning("SQLiteCache: read from %s failed: %s", self.path, exc)
+            row = None
+        if row is None:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return json.loads(row[0])
+
+    def _row(self, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else None
+        version = value.get("version", 0) if isinstance(value, dict) else 0
+        return payload, len(payload.encode("utf-8")), now, expires_at, version
+
+    def set(self, key, value):
+        payload, size, now, expires_at, version = self._row(value)
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (key, value, size, last_access, expires_at, version)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, payload, size, now, expires_at, version),
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error as exc:
+            logging.warning("SQLiteCache: write to %s failed: %s", self.path, exc)
+
+    def compare_and_set(self, key, value, version):
+        """
+        Like LRUTTLCache.compare_and_set; the check and the write are one
+        UPDATE ... WHERE version = ? (or INSERT OR IGNORE for version 0), so
+        it holds across processes sharing the database.
+        """
+        payload, size, now, expires_at, new_version = self._row(value)
+        try:
+            with self._lock:
+                conn = self._connect()
+                written = conn.execute(
+                    "UPDATE entries SET value = ?, size = ?, last_access = ?, expires_at = ?,"
+                    " version = ? WHERE key = ? AND version = ?"
+                    " AND (expires_at IS NULL OR expires_at > ?)",
+                    (payload, size, now, expires_at, new_version, key, version, now),
+                ).rowcount == 1
+                if not written and version == 0:
+                    conn.execute(
+                        "DELETE FROM entries WHERE key = ? AND expires_at <= ?", (key, now)
+                    )
+                    written = conn.execute(
+                        "INSERT OR IGNORE INTO entries"
+                        " (key, value, size, last_access, expires_at, version)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, payload, size, now, expires_at, new_version),
+                    ).rowcount == 1
+                if written:
+                    self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error as exc:
+            logging.warning("SQLiteCache: write to %s failed: %s", self.path, exc)
+            return False
+        return written
+
+    def pop(self, key, default=None):
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+        except sqlite3.Error as exc:
+            logging.warning("SQLiteCache: delete from %s failed: %s", self.path, exc)
+            row = None
+        return default if row is None else json.loads(row[0])
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if self.metrics_prefix and evicted:
+            METRICS.incr(f"{self.metrics_prefix}.evictions", evicted)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class JobQueue:
+    """
+    Durable at-least-once job queue in SQLite, drained by worker tasks on the
+    running event loop. Each job has an idempotency key: enqueueing a key that
+    is already known is a no-op. Claiming a job leases it for `lease_seconds`,
+    so a job whose process died mid-run is picked up again; a failing job is
+    retried with exponential backoff and marked failed after `max_attempts`.
+    Counts go to METRICS under job_queue.*.
+    """
+
+    def __init__(
+        self,
+        path=JOB_QUEUE_PATH,
+        concurrency=JOB_QUEUE_CONCURRENCY,
+        max_attempts=JOB_MAX_ATTEMPTS,
+        retry_base_seconds=JOB_RETRY_BASE_SECONDS,
+        lease_seconds=JOB_LEASE_SECONDS,
+        poll_seconds=JOB_POLL_SECONDS,
+    ):
+        self.path = pathlib.Path(path)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._workers = []
+        self._wakeup = None
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " key TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " run_at REAL NOT NULL,"
+                " last_error TEXT,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def register(self, kind, handler):
+        """Run jobs of `kind` with `await handler(payload)`."""
+        self._handlers[kind] = handler
+
+    def _insert(self, kind, key, payload):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO jobs (key, kind, payload, status, run_at, updated_at)"
+                " VALUES (?, ?, ?, 'pending', ?, ?)",
+                (key, kind, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            conn.commit()
+        return cur.rowcount == 1
+
+    async def enqueue(self, kind, key, payload):
+        """
+        Persist a job unless `key` was already enqueued; returns True if added.
+        """
+        added = await asyncio.to_thread(self._insert, kind, key, payload)
+        METRICS.incr("job_queue.enqueued" if added else "job_queue.duplicates")
+        if added and self._wakeup is not None:
+            self._wakeup.set()
+        return added
+
+    def _claim(self):
+        """
+        Lease the next due job: (job, None), or (None, run_at of the next
+        pending job or None).
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT key, kind, payload, attempts, run_at FROM jobs"
+                " WHERE status = 'pending' AND run_at <= ? ORDER BY run_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                next_run_at = conn.execute(
+                    "SELECT MIN(run_at) FROM jobs WHERE status = 'pending'"
+                ).fetchone()[0]
+                return None, next_run_at
+            key, kind, payload, attempts, run_at = row
+            # Conditional on run_at so two processes cannot claim the same lease.
+            cur = conn.execute(
+                "UPDATE jobs SET run_at = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE key = ? AND status = 'pending' AND run_at = ?",
+                (now + self.lease_seconds, now, key, run_at),
+            )
+            conn.commit()
+        if cur.rowcount != 1:
+            return None, now
+        job = {"key": key, "kind": kind, "payload": json.loads(payload), "attempts": attempts + 1}
+        return job, None
+
+    def _update(self, key, status, run_at=None, error=None):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_at = COALESCE(?, run_at), last_error = ?,"
+                " updated_at = ? WHERE key = ?",
+                (status, run_at, error, now, key),
+            )
+            conn.commit()
+
+    def _prune(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (time.time() - JOB_RETENTION_SECONDS,),
+            )
+            conn.commit()
+
+    async def _run(self, job):
+        kind = job["kind"]
+        started = time.perf_counter()
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise LookupError(f"no handler registered for job kind {kind!r}")
+            await handler(job["payload"])
+        except Exception as exc:
+            if job["attempts"] >= self.max_attempts:
+                METRICS.incr("job_queue.failed")
+                logging.error("Job %s failed after %d attempts: %s", job["key"], job["attempts"], exc)
+                await asyncio.to_thread(self._update, job["key"], "failed", error=repr(exc))
+            else:
+                delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1) * random.uniform(0.8, 1.2)
+                METRICS.incr("job_queue.retries")
+                logging.warning(
+                    "Job %s failed (attempt %d), retrying in %.0fs: %s",
+                    job["key"], job["attempts"], delay, exc,
+                )
+                await asyncio.to_thread(
+                    self._update, job["key"], "pending", time.time() + delay, repr(exc)
+                )
+            return
+        METRICS.incr("job_queue.completed")
+        METRICS.set(f"job_queue.{kind}.last_duration_ms", round((time.perf_counter() - started) * 1000, 1))
+        await asyncio.to_thread(self._update, job["key"], "done")
+
+    async def _work(self):
+        while True:
+            # Cleared before claiming so an enqueue during the claim still wakes us.
+            self._wakeup.clear()
+            try:
+                job, next_run_at = await asyncio.to_thread(self._claim)
+            except sqlite3.Error as exc:
+                logging.warning("JobQueue: claim from %s failed: %s", self.path, exc)
+                job, next_run_at = None, None
+            if job is not None:
+                await self._run(job)
+                continue
+            delay = self.poll_seconds
+            if next_run_at is not None:
+                delay = min(max(next_run_at - time.time(), 0), delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        """Start the worker tasks on the running loop (no-op if started)."""
+        if self._workers:
+            return
+        await asyncio.to_thread(self._prune)
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """
+        Cancel the workers; a job interrupted mid-run is retried once its lease
+        expires.
+        """
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+RESUME_STRUCTURE_CACHE = SQLiteCache(
+    RESUME_STRUCTURE_CACHE_PATH,
+    RESUME_STRUCTURE_CACHE_MAX_BYTES,
+    metrics_prefix="resume_structure_cache",
+)
+
+
+class CVSectionIndex:
+    """
+    BM25 index over the sections of one CV, built once at index time so each
+    LLM call can carry only the top-k sections relevant to the current slot.
+    """
+
+    def __init__(self, sections, k1=1.5, b=0.75):
+        # sections: [{"index", "text", "tokens"}] as built by GraphRAG.
+        self.sections = sections
+        self.k1 = k1
+        self.b = b
+        self._tfs = []
+        self._lengths = []
+        doc_freq = {}
+        for section in sections:
+            tf = {}
+            for token in section["tokens"]:
+                tf[token] = tf.get(token, 0) + 1
+            self._tfs.append(tf)
+            self._lengths.append(len(section["tokens"]))
+            for token in tf:
+                doc_freq[token] = doc_freq.get(token, 0) + 1
+        n = len(sections)
+        self._avg_length = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            token: math.log(1 + (n - df + 0.5) / (df + 0.5)) for token, df in doc_freq.items()
+        }
+
+    def top_k(self, query_tokens, k):
+        """
+        Return up to `k` section texts ranked by BM25 score, in CV order.
+        """
+        terms = set(query_tokens)
+        scored = []
+        for idx, tf in enumerate(self._tfs):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[idx] / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scored.append((score, idx))
+        best = sorted(idx for _, idx in sorted(scored, reverse=True)[:k])
+        return [self.sections[idx]["text"] for idx in best]
+
+
+class ResumeRecord:
+    """
+    One candidate's indexed resume: raw text plus the structured parse.
+    """
+
+    def __init__(self, user_id, text, resume_struct, section_index=None):
+        self.user_id = user_id
+        self.text = text or ""
+        self.resume_struct = resume_struct or {}
+        # CVSectionIndex over `text`; built by GraphRAG when the record is indexed or loaded.
+        self.section_index = section_index
+
+    @property
+    def candidate_info(self):
+        return self.resume_struct.get("candidate") or {}
+
+    @property
+    def fingerprint(self):
+        """
+        Content hash of the record, used to key derived caches.
+        """
+        payload = json.dumps([self.text, self.resume_struct], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def to_dict(self):
+        return {"user_id": self.user_id, "text": self.text, "resume_struct": self.resume_struct}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("user_id"), data.get("text"), data.get("resume_struct"))
+
+
 class GraphQueryResult:
     def __init__(self, answer, intermediate_steps):
         self.answer = answer
@@ -213,24 +1536,128 @@ class InterviewState:
     Holds structured information we want to collect during an interview-style flow.
     """
 
-    def __init__(self, slots=None, goal_completed=False, ended=False, greeted=False):
+    def __init__(self, slots=None, goal_completed=False, ended=False, greeted=False, interview_id=None):
         self.slots = slots if slots is not None else {}
+        # Stable id for this interview, used to deduplicate its owner report.
+        self.interview_id = interview_id or uuid.uuid4().hex
         self.goal_completed = goal_completed
         self.ended = ended
         # Track whether we've already greeted the candidate by name.
         self.greeted = greeted
 
+    def to_dict(self):
+        return {
+            "slots": dict(self.slots),
+            "goal_completed": self.goal_completed,
+            "ended": self.ended,
+            "greeted": self.greeted,
+            "interview_id": self.interview_id,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            slots=dict(data.get("slots") or {}),
+            goal_completed=bool(data.get("goal_completed")),
+            ended=bool(data.get("ended")),
+            greeted=bool(data.get("greeted")),
+            interview_id=data.get("interview_id"),
+        )
+
 
 class PlannerDecision:
     """
     Output of the planner-level model: what should happen next in the interview.
     """
 
-    def __init__(self, next_action, target_slot, updated_slots, goal_completed):
+    def __init__(
+        self, next_action, target_slot, updated_slots, goal_completed, question=None,
+        path="two_call", tokens=0,
+    ):
         self.next_action = next_action  # "ASK_SLOT" | "END"
         self.target_slot = target_slot
         self.updated_slots = updated_slots
         self.goal_completed = goal_completed
+        # Question for target_slot when it came from the fused turn call.
+        self.question = question
+        # How the decision was made: "two_call" | "fused" | "fused_fallback".
+        self.path = path
+        # Tokens spent deciding and phrasing the question this turn (the calls
+        # the fused mode replaces); recorded under turn_path.<path>.*.
+        self.tokens = tokens
+
+class InputBlockedError(Exception):
+    """
+    Raised by ChatAgent when the concurrent input risk check flags the user's
+    message. Nothing from that turn has been applied to history or state.
+    """
+
+    def __init__(self, risk):
+        super().__init__("User input blocked by risk check.")
+        self.risk = risk
+
+
+class BackgroundEventLoop:
+    """
+    Owns one long-lived asyncio event loop running on a daemon thread.
+
+    Sync (WSGI) request handlers submit coroutines to it instead of calling
+    asyncio.run() per request, so loop-bound resources (the MCP stdio session,
+    async HTTP pools) stay valid across requests and concurrent requests can
+    overlap their LLM waits on the same loop.
+    """
+
+    def __init__(self, name="chatbot-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the background loop and return a
+        concurrent.futures.Future for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the background loop and block the calling thread
+        until it finishes (or `timeout` seconds elapse).
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("BackgroundEventLoop.run() called from its own loop thread.")
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen, timeout=None):
+        """
+        Drive an async generator on the background loop from a sync caller,
+        yielding its items one by one (e.g. for a streaming Flask response).
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Runs on normal exhaustion and when the client disconnects early.
+            self.run(agen.aclose(), timeout=timeout)
+
+    def stop(self):
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self.loop.is_running():
+            self.loop.close()
+
 
 class MCPClient:
     """
@@ -241,6 +1668,35 @@ class MCPClient:
         self.session = None
         self.exit_stack = AsyncExitStack()
         self.available_tools = []
+        # Set by start(): the task that owns the connection and its stop signal.
+        self._task = None
+        self._stop = None
+
+    async def start(self, server_script_path):
+        """
+        Connect from a dedicated long-lived task and return once the session
+        is ready. The stdio transport's cancel scopes must be exited by the
+        task that entered them, so that same task also tears the session down
+        when close() is called.
+        """
+        self._stop = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.ensure_future(self._serve(server_script_path, ready))
+        await ready
+
+    async def _serve(self, server_script_path, ready):
+        try:
+            try:
+                await self.connect_to_server(server_script_path)
+            except BaseException as exc:
+                if not ready.done():
+                    ready.set_exception(exc)
+                return
+            ready.set_result(None)
+            await self._stop.wait()
+        finally:
+            self.session = None
+            await self.exit_stack.aclose()
 
     async def connect_to_server(self, server_script_path):
         server_params = StdioServerParameters(
@@ -274,7 +1730,61 @@ class MCPClient:
         return await self.session.call_tool(tool_name, params)
 
     async def close(self):
-        await self.exit_stack.aclose()
+        if self._task is None:
+            await self.exit_stack.aclose()
+            return
+        self._stop.set()
+        await self._task
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursting up to `capacity`.
+    acquire() returns immediately while tokens are available and otherwise
+    waits only as long as it takes for the next token to accrue.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Links worth following when crawling a company site.
+COMPANY_PAGE_PATTERN = re.compile(r"(about|team|company|culture|careers|service|product)", re.I)
+
+
+def _parse_company_page(html, page_url):
+    """
+    Visible text of an HTML page plus the absolute URLs of its links. CPU-bound;
+    the crawler runs it in a worker thread.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style", "noscript"]):
+        script.extract()
+    text = " ".join(soup.get_text(separator=" ").split())
+    links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if not href or href.startswith(("#", "mailto:", "tel:")):
+            continue
+        links.append(urldefrag(urljoin(page_url, href))[0])
+    return text, links
 
 
 class CompanyProfile:
@@ -290,6 +1800,27 @@ class CompanyProfile:
         self.culture_summary = culture_summary
         self.raw_snippets = raw_snippets
 
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "website": self.website,
+            "linkedin": self.linkedin,
+            "services_summary": self.services_summary,
+            "culture_summary": self.culture_summary,
+            "raw_snippets": self.raw_snippets,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get("name"),
+            data.get("website"),
+            data.get("linkedin"),
+            data.get("services_summary") or "",
+            data.get("culture_summary") or "",
+            data.get("raw_snippets") or [],
+        )
+
 
 class CompanyInsightsScraper:
     """
@@ -297,15 +1828,27 @@ class CompanyInsightsScraper:
     to build a short profile: services + culture.
     """
 
-    def __init__(self, openai_client=None, user_agent: str = "RecruitLensBot/1.0"):
-        self.client = openai_client or _create_openai_client()
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": user_agent,
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            }
+    def __init__(
+        self,
+        openai_client=None,
+        user_agent: str = "RecruitLensBot/1.0",
+        cache=None,
+        ttl_seconds=COMPANY_PROFILE_TTL_SECONDS,
+    ):
+        # Optional AsyncOpenAI override; None uses the shared pooled client.
+        self.client = openai_client
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        }
+        self.cache = cache or SQLiteCache(
+            COMPANY_PROFILE_CACHE_PATH,
+            COMPANY_PROFILE_CACHE_MAX_BYTES,
+            metrics_prefix="company_profile_cache",
         )
+        self.ttl_seconds = ttl_seconds
+        self._refreshes: dict[str, asyncio.Task] = {}
+        self._refresher = None
 
     async def scrape_company(
         self,
@@ -321,16 +1864,169 @@ class CompanyInsightsScraper:
         - Optionally fetch LinkedIn summary text (stubbed)
         - Ask the LLM to summarise services + culture
         """
+        snippets = await self._collect_snippets(website_url, linkedin_url, max_pages)
+        return await self._build_profile(company_name, website_url, linkedin_url, snippets)
+
+    @staticmethod
+    def _cache_key(company_name, website_url, linkedin_url):
+        return f"company:{company_name}|{website_url or ''}|{linkedin_url or ''}"
+
+    async def get_profile(
+        self,
+        *,
+        company_name: str,
+        website_url: str | None = None,
+        linkedin_url: str | None = None,
+        max_pages: int = 5,
+    ) -> "CompanyProfile":
+        """
+        Cached scrape_company(): serves the stored profile, even a stale one,
+        and refreshes stale entries in the background. Only a cold cache makes
+        the caller wait for a crawl.
+        """
+        key = self._cache_key(company_name, website_url, linkedin_url)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        args = (key, company_name, website_url, linkedin_url, max_pages)
+        if entry is None:
+            return await asyncio.shield(self._refresh_task(*args))
+        if self._refresh_due_in(entry) <= 0:
+            self._refresh_task(*args)
+        return CompanyProfile.from_dict(entry["profile"])
+
+    def _refresh_due_in(self, entry):
+        """
+        Seconds until a stored entry should be recrawled: once it is older
+        than the TTL, and not before the retry time of a failed recrawl.
+        """
+        now = time.time()
+        due_at = max(entry.get("fetched_at", 0) + self.ttl_seconds, entry.get("retry_at", 0))
+        return due_at - now
+
+    def _refresh_task(self, key, company_name, website_url, linkedin_url, max_pages):
+        """
+        Task that recrawls and stores one profile. Concurrent refreshes of the
+        same key share one task.
+        """
+        task = self._refreshes.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._do_refresh(key, company_name, website_url, linkedin_url, max_pages)
+            )
+            self._refreshes[key] = task
+            task.add_done_callback(lambda done: self._refresh_done(key, done))
+        return task
+
+    def _refresh_done(self, key, task):
+        self._refreshes.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning("Company profile refresh for %s failed: %s", key, task.exception())
+
+    async def _do_refresh(self, key, company_name, website_url, linkedin_url, max_pages):
+        """
+        Recrawl with conditional requests against the stored page validators,
+        and only re-summarise when the extracted text actually changed.
+        """
+        entry = await asyncio.to_thread(self.cache.get, key) or {}
+        page_cache = dict(entry.get("pages") or {})
+        snippets = await self._collect_snippets(
+            website_url, linkedin_url, max_pages, page_cache=page_cache
+        )
+        if not snippets:
+            # Site down or blocking us: an empty crawl is not a new profile.
+            # Keep the old one (and its validators and fetched_at) and try
+            # again soon rather than after a full TTL.
+            METRICS.incr("company_profile.empty_crawl")
+            if entry.get("profile"):
+                profile = CompanyProfile.from_dict(entry["profile"])
+            else:
+                profile = await self._build_profile(
+                    company_name, website_url, linkedin_url, snippets
+                )
+            await asyncio.to_thread(
+                self.cache.set,
+                key,
+                {
+                    **entry,
+                    "profile": profile.to_dict(),
+                    "retry_at": time.time() + COMPANY_PROFILE_RETRY_SECONDS,
+                },
+            )
+            return profile
+        text_hash = hashlib.sha256("\n\n".join(snippets).encode("utf-8")).hexdigest()
+        if entry.get("profile") and entry.get("text_hash") == text_hash:
+            METRICS.incr("company_profile.unchanged")
+            profile = CompanyProfile.from_dict(entry["profile"])
+        else:
+            METRICS.incr("company_profile.summarised")
+            profile = await self._build_profile(
+                company_name, website_url, linkedin_url, snippets
+            )
+        await asyncio.to_thread(
+            self.cache.set,
+            key,
+            {
+                "profile": profile.to_dict(),
+                "text_hash": text_hash,
+                "pages": page_cache,
+                "fetched_at": time.time(),
+            },
+        )
+        return profile
+
+    def start_refresher(self, **profile_kwargs):
+        """
+        Warm the profile cache now and keep it fresh: refresh whenever the
+        stored entry is older than the TTL. Must be called on the event loop.
+        """
+        if self._refresher is None:
+            self._refresher = asyncio.ensure_future(self._refresh_forever(profile_kwargs))
+
+    async def _refresh_forever(self, profile_kwargs):
+        company_name = profile_kwargs["company_name"]
+        website_url = profile_kwargs.get("website_url")
+        linkedin_url = profile_kwargs.get("linkedin_url")
+        max_pages = profile_kwargs.get("max_pages", 5)
+        key = self._cache_key(company_name, website_url, linkedin_url)
+        while True:
+            try:
+                entry = await asyncio.to_thread(self.cache.get, key)
+                if entry is None or self._refresh_due_in(entry) <= 0:
+                    await asyncio.shield(self._refresh_task(
+                        key, company_name, website_url, linkedin_url, max_pages
+                    ))
+                    entry = await asyncio.to_thread(self.cache.get, key)
+                delay = self._refresh_due_in(entry) if entry else COMPANY_PROFILE_RETRY_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logging.warning("Company profile refresh for %s failed: %s", company_name, exc)
+                delay = COMPANY_PROFILE_RETRY_SECONDS
+            await asyncio.sleep(max(delay, 1))
+
+    async def stop_refresher(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _collect_snippets(self, website_url, linkedin_url, max_pages, page_cache=None):
         snippets: list[str] = []
 
         if website_url:
-            snippets.extend(await self._scrape_site(website_url, max_pages=max_pages))
+            snippets.extend(
+                await self._scrape_site(website_url, max_pages=max_pages, page_cache=page_cache)
+            )
 
         if linkedin_url:
             linkedin_text = await self._fetch_linkedin_public_summary(linkedin_url)
             if linkedin_text:
                 snippets.append(linkedin_text)
+        return snippets
 
+    async def _build_profile(self, company_name, website_url, linkedin_url, snippets):
         merged_text = "\n\n".join(snippets[:20])  # keep token size sane
         services_summary, culture_summary = await self._summarise_with_llm(
             company_name=company_name,
@@ -348,64 +2044,112 @@ class CompanyInsightsScraper:
             raw_snippets=snippets,
         )
 
-    async def _scrape_site(self, base_url: str, max_pages: int = 5) -> list[str]:
+    async def _scrape_site(
+        self, base_url: str, max_pages: int = 5, page_cache: dict | None = None
+    ) -> list[str]:
         """
-        Very simple breadth-first crawl limited to a few internal pages.
-        Focuses on obvious 'About/Services/Careers' URLs.
+        Breadth-first crawl of up to `max_pages` internal pages, focused on
+        obvious 'About/Services/Careers' URLs. Pages are fetched concurrently,
+        at most CRAWL_MAX_PER_HOST at a time and CRAWL_RATE_PER_SECOND per host;
+        texts are returned in crawl (BFS) order.
+
+        `page_cache` maps URL -> {etag, last_modified, text, links}: pages in it
+        are requested conditionally, a 304 reuses the stored text and links,
+        and fetched pages are written back to it. Entries for pages this crawl
+        no longer reaches are dropped.
         """
-        import re
-        import time
-        from urllib.parse import urljoin, urlparse
-
-        to_visit: list[str] = [base_url]
-        visited: set[str] = set()
-        texts: list[str] = []
+        if BeautifulSoup is None:
+            logging.warning("bs4 is not installed; skipping crawl of %s", base_url)
+            return []
 
-        def is_same_domain(url: str) -> bool:
+        base_host = urlparse(base_url).netloc
+        frontier = deque([base_url])
+        seen = {base_url}
+        host_limits: dict[str, asyncio.Semaphore] = {}
+        host_buckets: dict[str, TokenBucket] = {}
+        pages: dict[int, str] = {}
+        pending: set[asyncio.Task] = set()
+        crawled: set[str] = set()
+        scheduled = 0
+
+        async def fetch(order, url):
+            # One bad page (invalid URL, unparsable HTML, ...) must not abort the crawl.
             try:
-                base = urlparse(base_url).netloc
-                netloc = urlparse(url).netloc
-                return not netloc or netloc == base
-            except Exception:
-                return False
-
-        while to_visit and len(visited) < max_pages:
-            url = to_visit.pop(0)
-            if url in visited:
-                continue
-            visited.add(url)
+                return await fetch_page(order, url)
+            except Exception as exc:
+                METRICS.incr("crawl.page_errors")
+                logging.warning("Crawl: skipping %s: %s", url, exc)
+                return order, None, []
+
+        async def fetch_page(order, url):
+            host = urlparse(url).netloc
+            limit = host_limits.setdefault(host, asyncio.Semaphore(CRAWL_MAX_PER_HOST))
+            bucket = host_buckets.setdefault(
+                host, TokenBucket(CRAWL_RATE_PER_SECOND, capacity=CRAWL_MAX_PER_HOST)
+            )
+            cached = page_cache.get(url) if page_cache is not None else None
+            headers = {}
+            if cached and cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached and cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+            async with limit:
+                await bucket.acquire()
+                try:
+                    resp = await client.get(url, headers=headers)
+                    if resp.status_code == 304 and cached:
+                        METRICS.incr("crawl.not_modified")
+                        return order, cached.get("text"), cached.get("links") or []
+                    resp.raise_for_status()
+                except httpx.HTTPError as exc:
+                    logging.debug("Crawl: skipping %s: %s", url, exc)
+                    return order, None, []
+            text, links = await asyncio.to_thread(_parse_company_page, resp.text, str(resp.url))
+            text = text[:5000]
+            if page_cache is not None:
+                page_cache[url] = {
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "text": text,
+                    "links": links,
+                }
+            return order, text, links
 
+        async with httpx.AsyncClient(
+            headers=self.headers, timeout=CRAWL_TIMEOUT_SECONDS, follow_redirects=True
+        ) as client:
             try:
-                resp = self.session.get(url, timeout=8)
-                resp.raise_for_status()
-            except Exception:
-                continue
-
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            for script in soup(["script", "style", "noscript"]):
-                script.extract()
-            text = " ".join(soup.get_text(separator=" ").split())
-            if len(text) > 200:
-                texts.append(text[:5000])
-
-            for a in soup.find_all("a", href=True):
-                href = a["href"].strip()
-                if not href or href.startswith(("#", "mailto:", "tel:")):
-                    continue
-                full = urljoin(base_url, href)
-                if not is_same_domain(full):
-                    continue
-                if full in visited or full in to_visit:
-                    continue
-                if re.search(r"(about|team|company|culture|careers|service|product)", full, re.I):
-                    to_visit.append(full)
-
-            time.sleep(0.3)
-
-        return texts
+                while frontier or pending:
+                    while frontier and scheduled < max_pages:
+                        url = frontier.popleft()
+                        crawled.add(url)
+                        pending.add(asyncio.create_task(fetch(scheduled, url)))
+                        scheduled += 1
+                    if not pending:
+                        break
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        order, text, links = task.result()
+                        if text and len(text) > 200:
+                            pages[order] = text
+                        for link in links:
+                            netloc = urlparse(link).netloc
+                            if netloc and netloc != base_host:
+                                continue
+                            if link in seen or not COMPANY_PAGE_PATTERN.search(link):
+                                continue
+                            seen.add(link)
+                            frontier.append(link)
+            finally:
+                # Never leave fetches running against a closed client.
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if page_cache is not None:
+            for url in set(page_cache) - crawled:
+                del page_cache[url]
+        return [pages[order] for order in sorted(pages)]
 
     async def _fetch_linkedin_public_summary(self, linkedin_url: str) -> str:
         """
@@ -454,28 +2198,26 @@ class CompanyInsightsScraper:
             "raw_text": text[:12000],
         }
 
-        def _complete() -> tuple[str, str]:
-            resp = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
-                ],
-                response_format={"type": "json_object"},
-                max_tokens=500,
-                temperature=0.2,
+        resp = await _achat_completion(
+            client=self.client,
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=500,
+            temperature=0.2,
+        )
+        content = resp.choices[0].message.content or "{}"
+        try:
+            data = json.loads(content)
+            return (
+                (data.get("services") or "").strip(),
+                (data.get("culture") or "").strip(),
             )
-            content = resp.choices[0].message.content or "{}"
-            try:
-                data = json.loads(content)
-                return (
-                    (data.get("services") or "").strip(),
-                    (data.get("culture") or "").strip(),
-                )
-            except Exception:
-                return "", ""
-
-        return await asyncio.to_thread(_complete)
+        except Exception:
+            return "", ""
 class Transcriber:
     """
     Handles Speech-to-Text using OpenAI Whisper and extracts basic prosodic features.
@@ -518,24 +2260,95 @@ class Transcriber:
             return {"text": "", "metadata": {}}
 
 
+class HistorySummarizer:
+    """
+    Folds older conversation turns into a compact running summary, so the
+    history carried by each prompt is bounded by the summary plus a short tail.
+    """
+    def __init__(self, model="gpt-4.1-mini", openai_client=None, max_tokens=HISTORY_SUMMARY_MAX_TOKENS):
+        # Optional AsyncOpenAI override; None uses the shared pooled client.
+        self.llm = openai_client
+        self.model = model
+        self.max_tokens = max_tokens
+
+    async def fold(self, summary, messages):
+        """
+        Return a new summary message covering `summary` (the previous summary
+        message, or None) plus `messages`:
+        {"role": "summary", "content": str, "metadata": {"messages", "wpm_total", "wpm_count", "refusals"}}.
+        The audio/refusal totals keep the analyzer's metrics exact once the
+        folded turns themselves are gone.
+        """
+        meta = dict((summary or {}).get("metadata") or {})
+        totals = {
+            "messages": meta.get("messages", 0) + len(messages),
+            "wpm_total": meta.get("wpm_total", 0),
+            "wpm_count": meta.get("wpm_count", 0),
+            "refusals": meta.get("refusals", 0),
+        }
+        for msg in messages:
+            if msg.get("role") != "user":
+                continue
+            msg_meta = msg.get("metadata") or {}
+            if msg_meta.get("wpm"):
+                totals["wpm_total"] += msg_meta["wpm"]
+                totals["wpm_count"] += 1
+            if msg_meta.get("refusal"):
+                totals["refusals"] += 1
+
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+        system_prompt = (
+            "You maintain a running summary of a job screening interview. "
+            "Merge the new turns into the current summary and return only the updated summary as plain text. "
+            "Keep every fact the candidate stated (names, numbers, dates, employers, projects, skills), "
+            "what they declined to answer, and notable communication traits "
+            "(hesitation, filler words, pronoun use, tone). Drop greetings and pleasantries. "
+            f"Stay under {int(self.max_tokens * 0.75)} words."
+        )
+        response = await _achat_completion(
+            client=self.llm,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {
+                    "role": "user",
+                    "content": (
+                        f"CURRENT SUMMARY:\n{(summary or {}).get('content') or '(none)'}\n\n"
+                        f"NEW TURNS:\n{transcript}"
+                    ),
+                },
+            ],
+            max_tokens=self.max_tokens,
+            temperature=0.2,
+        )
+        _record_llm_usage("history_summary", response)
+        text = (response.choices[0].message.content or "").strip()
+        return {"role": "summary", "content": text, "metadata": totals}
+
+
 class SoftSkillsAnalyzer:
     """
     Analyzes conversation history to extract OCEAN traits, soft skills, and PROSODY using a single LLM pass.
     """
-    def __init__(self, model="gpt-4.1-mini"):
-        self.llm = _create_openai_client()
+    def __init__(self, model="gpt-4.1-mini", openai_client=None):
+        # Optional AsyncOpenAI override; None uses the shared pooled client.
+        self.llm = openai_client
         self.model = model
 
-    async def generate_profile(self, conversation_history):
+    async def generate_profile(self, conversation_history, token_budget=ANALYZER_TOKEN_BUDGET):
         """
-        conversation_history: list of {"role": "user/assistant", "content": "...", "metadata": {...}}
+        conversation_history: list of {"role": "user/assistant", "content": "...", "metadata": {...}},
+        optionally headed by a running summary message (see HistorySummarizer).
+        The transcript (summary + newest user messages) is kept within token_budget.
         """
+        summary, messages = _split_history_summary(conversation_history)
         # Filter only user messages
-        user_msgs = [msg for msg in conversation_history if msg['role'] == 'user']
+        user_msgs = [msg for msg in messages if msg['role'] == 'user']
         
-        # 1. Aggregate Audio Metrics (if available)
-        total_wpm = 0
-        wpm_count = 0
+        # 1. Aggregate Audio Metrics (if available), including turns already folded into the summary
+        summary_meta = (summary or {}).get("metadata") or {}
+        total_wpm = summary_meta.get("wpm_total", 0)
+        wpm_count = summary_meta.get("wpm_count", 0)
         for msg in user_msgs:
             meta = msg.get("metadata", {})
             if meta.get("wpm"):
@@ -545,7 +2358,17 @@ class SoftSkillsAnalyzer:
         avg_wpm = int(total_wpm / wpm_count) if wpm_count > 0 else "N/A"
         
         # 2. Build Transcript
-        user_text = "\n".join([f"- {msg['content']}" for msg in user_msgs])
+        summary_text = (summary or {}).get("content") or ""
+        lines, _ = _fit_token_budget(
+            "soft_skills",
+            token_budget,
+            _count_tokens(summary_text),
+            [f"- {msg['content']}" for msg in user_msgs],
+            render=str,
+        )
+        user_text = "\n".join(lines)
+        if summary_text:
+            user_text = f"SUMMARY OF EARLIER ANSWERS:\n{summary_text}\n\nLATEST ANSWERS:\n{user_text}"
 
         if not user_text:
             return "{}"
@@ -579,28 +2402,157 @@ class SoftSkillsAnalyzer:
             "}"
         )
 
-        def _call_ai():
-            try:
-                response = self.llm.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"TRANSCRIPT:\n{user_text}"}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.2
-                )
-                return response.choices[0].message.content
-            except Exception as e:
-                logging.error(f"Error generating soft skills profile: {e}")
-                return "{}"
+        try:
+            response = await _achat_completion(
+                client=self.llm,
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"TRANSCRIPT:\n{user_text}"}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.2
+            )
+            _record_llm_usage("soft_skills", response)
+            return response.choices[0].message.content
+        except Exception as e:
+            logging.error(f"Error generating soft skills profile: {e}")
+            return "{}"
+
+# Constraints/indexes backing the MERGE keys used by RESUME_GRAPH_WRITE_QUERY.
+GRAPH_SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT candidate_id IF NOT EXISTS "
+    "FOR (c:Candidate) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT skill_name IF NOT EXISTS "
+    "FOR (s:Skill) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT metric_value IF NOT EXISTS "
+    "FOR (m:Metric) REQUIRE m.value IS UNIQUE",
+    "CREATE INDEX experience_candidate_idx IF NOT EXISTS "
+    "FOR (e:Experience) ON (e.candidate_id, e.idx)",
+]
+
+# Upserts one or more resumes in a single statement. Each row is built by
+# GraphRAG._resume_graph_row; experiences carry their own idx so metrics and
+# skills are attached to the experience being written, not matched afterwards.
+# The candidate's previous experiences (with their metric/skill edges) and
+# skill edges are removed first, so the graph always mirrors the latest upload;
+# shared Skill and Metric nodes are kept.
+RESUME_GRAPH_WRITE_QUERY = """
+UNWIND $rows AS row
+MERGE (c:Candidate {id: row.cid})
+SET c.full_name = row.candidate.full_name,
+    c.headline = row.candidate.headline,
+    c.location = row.candidate.location,
+    c.email = row.candidate.email,
+    c.phone = row.candidate.phone
+WITH c, row
+CALL {
+    WITH row
+    MATCH (old:Experience {candidate_id: row.cid})
+    DETACH DELETE old
+}
+CALL {
+    WITH c
+    MATCH (c)-[r:HAS_SKILL]->(:Skill)
+    DELETE r
+}
+CALL {
+    WITH c, row
+    UNWIND row.experiences AS exp
+    MERGE (e:Experience {candidate_id: row.cid, idx: exp.idx})
+    SET e.role = exp.role,
+        e.company = exp.company,
+        e.start_date = exp.start_date,
+        e.end_date = exp.end_date,
+        e.summary = exp.summary
+    MERGE (c)-[:HAS_EXPERIENCE]->(e)
+    WITH c, e, exp
+    CALL {
+        WITH e, exp
+        UNWIND exp.metrics AS metric
+        MERGE (m:Metric {value: metric})
+        MERGE (e)-[:MEASURED_BY]->(m)
+    }
+    CALL {
+        WITH c, e, exp
+        UNWIND exp.skills AS skillName
+        MERGE (s:Skill {name: skillName})
+        MERGE (c)-[:HAS_SKILL]->(s)
+        MERGE (e)-[:USED_SKILL]->(s)
+    }
+}
+CALL {
+    WITH c, row
+    UNWIND row.skills AS skillName
+    MERGE (s:Skill {name: skillName})
+    MERGE (c)-[:HAS_SKILL]->(s)
+}
+"""
+
+
+# Parameterized read templates over the Candidate/Experience/Skill/Metric
+# schema. Every template returns one row of (candidate, experiences, skills),
+# i.e. a trimmed resume_struct, so it can stand in for the full one in prompts.
+GRAPH_RETRIEVAL_QUERIES = {
+    "candidate_profile": """
+        MATCH (c:Candidate {id: $cid})
+        OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
+        WITH c, collect(s.name) AS skills
+        RETURN c {.full_name, .headline, .location} AS candidate,
+               [] AS experiences, skills[..10] AS skills
+    """,
+    "experience_overview": """
+        MATCH (c:Candidate {id: $cid})
+        OPTIONAL MATCH (c)-[:HAS_EXPERIENCE]->(e:Experience)
+        WITH c, e ORDER BY e.idx
+        RETURN c {.full_name, .headline} AS candidate,
+               collect(e {.role, .company, .start_date, .end_date}) AS experiences,
+               [] AS skills
+    """,
+    "experience_details": """
+        MATCH (c:Candidate {id: $cid})-[:HAS_EXPERIENCE]->(e:Experience)
+        WITH c, e ORDER BY e.idx LIMIT $limit
+        OPTIONAL MATCH (e)-[:USED_SKILL]->(s:Skill)
+        WITH c, e, collect(s.name) AS exp_skills
+        ORDER BY e.idx
+        RETURN c {.full_name} AS candidate,
+               collect(e {.role, .company, .summary, skills: exp_skills}) AS experiences,
+               [] AS skills
+    """,
+    "experience_metrics": """
+        MATCH (c:Candidate {id: $cid})-[:HAS_EXPERIENCE]->(e:Experience)
+        OPTIONAL MATCH (e)-[:MEASURED_BY]->(m:Metric)
+        WITH c, e, collect(m.value) AS metrics
+        ORDER BY size(metrics) DESC, e.idx
+        LIMIT $limit
+        RETURN c {.full_name} AS candidate,
+               collect(e {.role, .company, .summary, metrics: metrics}) AS experiences,
+               [] AS skills
+    """,
+}
+
+# Which retrieval template serves each interview slot.
+SLOT_GRAPH_QUERY = {
+    "greeting": "experience_overview",
+    "full_name": "candidate_profile",
+    "total_experience": "experience_overview",
+    "project_description": "experience_details",
+    "project_metric": "experience_metrics",
+    "project_bottleneck": "experience_details",
+    "project_solution": "experience_details",
+    "team_challenge": "experience_details",
+    "adaptability_example": "experience_details",
+    "leadership_example": "experience_details",
+    "notice_period": "candidate_profile",
+    "visa_status": "candidate_profile",
+}
 
-        return await asyncio.to_thread(_call_ai)
 
 class GraphRAG:
     """
-    Graph RAG that uses Neo4j + LangChain when available,
-    and falls back to a simple in-memory text store otherwise.
+    Graph RAG that uses Neo4j (through the async driver) when available,
+    and falls back to a simple in-memory text store otherwise. Call
+    `await connect()` on the serving event loop to enable graph mode.
     """
 
     def __init__(
@@ -611,12 +2563,15 @@ class GraphRAG:
         graph_llm_model="gpt-4o-mini",
         min_keyword_overlap=3,
     ):
-        # In-memory fallback state
-        self._text = ""
+        # Per-user resumes: bounded in-memory cache in front of the on-disk store
+        # (and Neo4j, when enabled), reloaded lazily on a miss.
         self._indexed = False
-        # Parsed candidate info and full resume structure from the latest indexed resume (if any)
-        self.candidate_info = {}
-        self.resume_struct = {}
+        self._resumes = LRUTTLCache(
+            max_entries=RESUME_CACHE_MAX_ENTRIES,
+            ttl_seconds=RESUME_CACHE_TTL_SECONDS,
+            metrics_prefix="resume_cache",
+        )
+        self.store_dir = pathlib.Path(RESUME_STORE_DIR)
 
         # Neo4j / LangChain state
         self.neo4j_uri = neo4j_uri or os.environ.get(
@@ -629,64 +2584,191 @@ class GraphRAG:
             "NEO4J_PASSWORD", "neo4j"
         )
         self.min_keyword_overlap = min_keyword_overlap
+        self.graph_llm_model = graph_llm_model
 
-        # Try to set up Neo4j graph + chain. If anything fails, we just
-        # operate in fallback mode without raising at import time.
-        self.graph = None
+        # Neo4j state; filled in by connect(). Until then (or if it fails) we
+        # operate in fallback mode.
+        self.driver = None
         self.chain = None
         self._use_graph = False
+
+    async def connect(self):
+        """
+        Open the Neo4j driver pool, create the schema and check whether the
+        graph already holds resumes. Must run on the event loop that will use
+        the driver. Returns whether graph mode is enabled.
+        """
+        driver = _create_neo4j_driver(
+            url=self.neo4j_uri,
+            username=self.neo4j_username,
+            password=self.neo4j_password,
+        )
+        if driver is None:
+            logging.info("GraphRAG: falling back to in-memory mode (no Neo4j).")
+            return False
         try:
-            graph = _create_neo4j_graph(
-                url=self.neo4j_uri,
-                username=self.neo4j_username,
-                password=self.neo4j_password,
-            )
-            chain = _create_neo4j_chain(graph, graph_llm_model)
-            if graph is not None and chain is not None:
-                self.graph = graph
-                self.chain = chain
-                self._use_graph = True
-                self._indexed = self._graph_has_content()
-                logging.info("GraphRAG: Neo4j graph mode enabled.")
-            else:
-                logging.info("GraphRAG: falling back to in-memory mode (no Neo4j).")
+            await driver.verify_connectivity()
+            self.driver = driver
+            await self._ensure_graph_schema()
+            self._indexed = await self._graph_has_content()
         except Exception as exc:
             logging.warning("GraphRAG: disabling Neo4j mode due to error: %s", exc)
-            self.graph = None
-            self.chain = None
-            self._use_graph = False
-            self._indexed = False
+            self.driver = None
+            await driver.close()
+            return False
+        self.chain = _create_neo4j_chain(self.driver, self.graph_llm_model)
+        self._use_graph = True
+        logging.info("GraphRAG: Neo4j graph mode enabled.")
+        return True
+
+    async def close(self):
+        if self.driver is not None:
+            await self.driver.close()
+            self.driver = None
+        self._use_graph = False
 
     def has_index(self):
         return self._indexed
 
+    def cached_resume(self, user_id):
+        """
+        The user's ResumeRecord if it is currently in memory, without any I/O.
+        """
+        return self._resumes.peek(user_id)
+
+    async def load_resume(self, user_id):
+        """
+        Return the user's ResumeRecord, reloading it from the on-disk store (or
+        from Neo4j) on a cache miss. Returns None if nothing is indexed for them.
+        """
+        record = self._resumes.get(user_id)
+        if record is not None:
+            return record
+        record = await asyncio.to_thread(self._read_resume_from_store, user_id)
+        if record is None and self._use_graph:
+            record = await self._read_resume_from_graph(user_id)
+        if record is not None:
+            if record.section_index is None:
+                record.section_index = self._build_section_index(record.text)
+            self._resumes.set(user_id, record)
+        return record
+
+    def retrieve_cv_context(self, user_id, slot=None, query_text="", k=None):
+        """
+        CV text to send with an LLM call about `slot`: the top-k sections ranked
+        by BM25 against the slot's retrieval terms plus `query_text` (e.g. the
+        candidate's latest message). Short CVs are returned whole. Uses only
+        the cached record; call load_resume() first.
+        """
+        record = self.cached_resume(user_id)
+        if record is None:
+            return ""
+        METRICS.incr("cv_retrieval.full_chars", len(record.text))
+        index = record.section_index
+        if len(record.text) <= CV_RETRIEVAL_MIN_CHARS or index is None:
+            METRICS.incr("cv_retrieval.sent_chars", len(record.text))
+            return record.text
+        query_tokens = self._keyword_tokens(
+            f"{SLOT_RETRIEVAL_TERMS.get(slot, '')} {query_text}"
+        )
+        sections = index.top_k(query_tokens, k or CV_RETRIEVAL_TOP_K)
+        if not sections:
+            # Nothing matched: fall back to the head of the CV (profile/summary).
+            sections = [s["text"] for s in index.sections[: k or CV_RETRIEVAL_TOP_K]]
+        context = "\n\n".join(sections)
+        METRICS.incr("cv_retrieval.sent_chars", len(context))
+        return context
+
     async def index_document(self, path, user_id: str):
         """
-        Index a resume:
-        - Read the file text
-        - Store raw text for fallback RAG
-        - If Neo4j + LangChain are available, extract resume structure and write to graph
+        Index a resume from a text file; see index_text.
         """
         path_obj = pathlib.Path(path).expanduser().resolve()
         text = await asyncio.to_thread(path_obj.read_text, encoding="utf-8")
+        return await self.index_text(user_id, text)
+
+    async def index_text(self, user_id: str, text: str):
+        """
+        Index a resume:
+        - Store raw text for fallback RAG
+        - If Neo4j is connected, write the extracted resume structure to the graph
+        """
         # Always keep raw text and parsed candidate info, regardless of graph mode.
-        self._text = text
-        resume_struct = _extract_resume_structure(text)
-        self.resume_struct = resume_struct or {}
-        self.candidate_info = resume_struct.get("candidate") or {}
+        resume_struct = await _extract_resume_structure(text)
+        record = ResumeRecord(
+            user_id, text, resume_struct, section_index=self._build_section_index(text)
+        )
+        await asyncio.to_thread(self._write_resume_to_store, record)
+        self._resumes.set(user_id, record)
 
-        if self._use_graph and self.graph is not None:
-            await asyncio.to_thread(
-                self._write_resume_to_graph, user_id, resume_struct
-            )
+        if self._use_graph:
+            await self._write_resume_to_graph(user_id, record.resume_struct)
 
         # Mark that we have an index (either in-memory only or with graph)
         self._indexed = True
+        return record
 
-    async def query(self, question):
-        if not self._indexed:
+    async def retrieve_graph_context(self, user_id, slot=None, limit=None):
+        """
+        Trimmed resume_struct for `slot`, fetched from Neo4j with the slot's
+        retrieval template. Returns None when graph mode is off or the graph
+        has nothing for this user. Records the size of the subgraph against
+        the full resume_struct, plus query latency, under graph_retrieval.*.
+        """
+        if not self._use_graph:
+            return None
+        template = SLOT_GRAPH_QUERY.get(slot, "experience_details")
+        started = time.perf_counter()
+        try:
+            rows = await self._read_query(
+                GRAPH_RETRIEVAL_QUERIES[template],
+                {"cid": user_id, "limit": limit or GRAPH_RETRIEVAL_MAX_EXPERIENCES},
+            )
+        except Exception as exc:
+            METRICS.incr("graph_retrieval.errors")
+            logging.warning("GraphRAG: %s retrieval failed for %s: %s", template, user_id, exc)
+            return None
+        METRICS.incr("graph_retrieval.calls")
+        METRICS.incr("graph_retrieval.latency_ms", int((time.perf_counter() - started) * 1000))
+        if not rows:
+            return None
+        row = rows[0]
+        context = {
+            "candidate": row.get("candidate") or {},
+            "experiences": row.get("experiences") or [],
+            "skills": row.get("skills") or [],
+        }
+        record = self.cached_resume(user_id)
+        if record is not None:
+            METRICS.incr(
+                "graph_retrieval.full_chars",
+                len(json.dumps(record.resume_struct, ensure_ascii=False)),
+            )
+        METRICS.incr("graph_retrieval.sent_chars", len(json.dumps(context, ensure_ascii=False)))
+        return context
+
+    async def query(self, question, user_id, slot=None):
+        """
+        Graph lookup for one user. In graph mode without a QA chain this runs
+        the slot's retrieval template (see retrieve_graph_context) and returns
+        the trimmed resume_struct as JSON; with a chain it asks the chain
+        `question`; otherwise it returns the raw resume text. Returns None if
+        the user has no resume. The interview itself uses
+        retrieve_graph_context directly for the speaker's resume_struct.
+        """
+        record = await self.load_resume(user_id)
+        if record is None:
             return None
 
+        if self._use_graph and self.chain is None:
+            context = await self.retrieve_graph_context(user_id, slot)
+            if context is not None:
+                template = SLOT_GRAPH_QUERY.get(slot, "experience_details")
+                return GraphQueryResult(
+                    answer=json.dumps(context, ensure_ascii=False),
+                    intermediate_steps=[{"query": template, "slot": slot}],
+                )
+
         if self._use_graph and self.chain is not None:
             def _run_chain():
                 result = self.chain.invoke({"query": question})
@@ -698,136 +2780,243 @@ class GraphRAG:
 
         # Fallback: return the raw text as context
         return GraphQueryResult(
-            answer=self._text,
+            answer=record.text,
             intermediate_steps=[],
         )
 
+    # ---- internal helpers for the on-disk resume store ----------------------
+
+    def _store_path(self, user_id):
+        digest = hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()
+        return self.store_dir / f"{digest}.json"
+
+    def _write_resume_to_store(self, record):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        path = self._store_path(record.user_id)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(record.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _read_resume_from_store(self, user_id):
+        path = self._store_path(user_id)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as exc:
+            logging.warning("GraphRAG: failed to read stored resume for %s: %s", user_id, exc)
+            return None
+        return ResumeRecord.from_dict(data)
+
     # ---- internal helpers for Neo4j mode -----------------------------------
 
-    def _graph_has_content(self):
-        if not self.graph:
-            return False
+    async def _read_query(self, query, params=None):
+        """
+        Run a read query on the driver pool and return the rows as dicts.
+        """
+        records, _, _ = await self.driver.execute_query(
+            query, params or {}, database_=NEO4J_DATABASE, routing_="r"
+        )
+        return [record.data() for record in records]
+
+    async def _ensure_graph_schema(self):
+        """
+        Create the constraints/indexes the resume MERGEs rely on. Idempotent;
+        failures are logged and leave graph mode enabled.
+        """
+        for statement in GRAPH_SCHEMA_STATEMENTS:
+            try:
+                await self.driver.execute_query(statement, database_=NEO4J_DATABASE)
+            except Exception as exc:
+                logging.warning("GraphRAG: schema statement failed (%s): %s", statement, exc)
+
+    async def _graph_has_content(self):
+        # Stops at the first Candidate instead of counting the whole label.
         try:
-            response = self.graph.query("MATCH (d:Document) RETURN count(d) AS count")
+            rows = await self._read_query("MATCH (c:Candidate) RETURN c.id AS id LIMIT 1")
         except Exception:
             return False
-        return bool(response and response[0].get("count", 0) > 0)
+        return bool(rows)
+
+    async def _read_resume_from_graph(self, user_id):
+        """
+        Rebuild a resume structure from the Candidate/Experience/Skill graph.
+        The raw CV text is not stored in Neo4j, so the record's text is empty.
+        """
+        try:
+            rows = await self._read_query(
+                """
+                MATCH (c:Candidate {id: $cid})
+                OPTIONAL MATCH (c)-[:HAS_EXPERIENCE]->(e:Experience)
+                OPTIONAL MATCH (e)-[:MEASURED_BY]->(m:Metric)
+                OPTIONAL MATCH (e)-[:USED_SKILL]->(es:Skill)
+                WITH c, e, collect(DISTINCT m.value) AS metrics, collect(DISTINCT es.name) AS exp_skills
+                ORDER BY e.idx
+                WITH c, collect(CASE WHEN e IS NULL THEN NULL ELSE {
+                    role: e.role, company: e.company, start_date: e.start_date,
+                    end_date: e.end_date, summary: e.summary,
+                    metrics: metrics, skills: exp_skills
+                } END) AS experiences
+                OPTIONAL MATCH (c)-[:HAS_SKILL]->(s:Skill)
+                RETURN c {.full_name, .headline, .location, .email, .phone} AS candidate,
+                       experiences, collect(DISTINCT s.name) AS skills
+                """,
+                {"cid": user_id},
+            )
+        except Exception as exc:
+            logging.warning("GraphRAG: failed to load resume for %s from Neo4j: %s", user_id, exc)
+            return None
+        if not rows:
+            return None
+        row = rows[0]
+        return ResumeRecord(
+            user_id,
+            "",
+            {
+                "candidate": row.get("candidate") or {},
+                "experiences": row.get("experiences") or [],
+                "skills": row.get("skills") or [],
+            },
+        )
 
-    def _split_into_sections(self, text):
+    def _split_into_sections(self, text, max_chars=1200):
         paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+        # PDF extraction often yields one paragraph per page; break long ones
+        # into line-aligned chunks so retrieval can be selective.
+        chunks = []
+        for paragraph in paragraphs:
+            current = ""
+            for line in paragraph.splitlines():
+                if current and len(current) + len(line) + 1 > max_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}\n{line}" if current else line
+            if current.strip():
+                chunks.append(current)
         sections = []
-        for idx, paragraph in enumerate(paragraphs):
-            keywords = self._extract_keywords(paragraph)
+        for idx, chunk in enumerate(chunks):
+            tokens = self._keyword_tokens(chunk)
             sections.append(
                 {
                     "index": idx,
-                    "text": paragraph,
-                    "keywords": sorted(keywords),
+                    "text": chunk,
+                    "keywords": sorted(set(tokens)),
+                    "tokens": tokens,
                 }
             )
         return sections
 
-    def _write_resume_to_graph(self, candidate_id, resume_struct):
-            """
-            Write candidate, experiences, and skills into Neo4j using the schema:
-            (:Candidate)-[:HAS_EXPERIENCE]->(:Experience)-[:USED_SKILL]->(:Skill)
-            and (:Candidate)-[:HAS_SKILL]->(:Skill).
-            """
-            if not self.graph:
-                return
-
-            candidate = resume_struct.get("candidate") or {}
-            experiences = resume_struct.get("experiences") or []
-            skills = resume_struct.get("skills") or []
+    def _build_section_index(self, text):
+        if not text:
+            return None
+        return CVSectionIndex(self._split_into_sections(text))
 
-            # Upsert candidate node
-            self.graph.query(
-                """
-                MERGE (c:Candidate {id: $cid})
-                SET c.full_name = $full_name,
-                    c.headline = $headline,
-                    c.location = $location,
-                    c.email = $email,
-                    c.phone = $phone
-                """,
-                {
-                    "cid": candidate_id,
-                    "full_name": candidate.get("full_name"),
-                    "headline": candidate.get("headline"),
-                    "location": candidate.get("location"),
-                    "email": candidate.get("email"),
-                    "phone": candidate.get("phone"),
-                },
-            )
+    @staticmethod
+    def _resume_graph_row(candidate_id, resume_struct):
+        """
+        Parameters for one resume in RESUME_GRAPH_WRITE_QUERY. Empty skill and
+        metric values are dropped, since MERGE cannot match on null.
+        """
+        resume_struct = resume_struct or {}
+        candidate = resume_struct.get("candidate") or {}
+        experiences = []
+        for idx, exp in enumerate(resume_struct.get("experiences") or []):
+            exp = exp or {}
+            experiences.append({
+                "idx": idx,
+                "role": exp.get("role"),
+                "company": exp.get("company"),
+                "start_date": exp.get("start_date"),
+                "end_date": exp.get("end_date"),
+                "summary": exp.get("summary"),
+                "metrics": [str(m) for m in exp.get("metrics") or [] if m],
+                "skills": [str(s) for s in exp.get("skills") or [] if s],
+            })
+        return {
+            "cid": candidate_id,
+            "candidate": {
+                key: candidate.get(key)
+                for key in ("full_name", "headline", "location", "email", "phone")
+            },
+            "experiences": experiences,
+            "skills": [str(s) for s in resume_struct.get("skills") or [] if s],
+        }
 
-            # Experiences and their skills/metrics
-            self.graph.query(
-                """
-                MATCH (c:Candidate {id: $cid})
-                WITH c, $experiences AS exps
-                UNWIND range(0, size(exps) - 1) AS i
-                WITH c, exps[i] AS exp, i
-                MERGE (e:Experience {candidate_id: $cid, idx: i})
-                SET e.role = exp.role,
-                    e.company = exp.company,
-                    e.start_date = exp.start_date,
-                    e.end_date = exp.end_date,
-                    e.summary = exp.summary
-                MERGE (c)-[:HAS_EXPERIENCE]->(e)
-                """,
-                {"cid": candidate_id, "experiences": experiences},
-            )
+    async def _execute_write(self, query, params):
+        """
+        Run `query` in one explicit write transaction (retried by the driver on
+        transient errors).
+        """
+        async def _work(tx):
+            result = await tx.run(query, params)
+            await result.consume()
 
-            # Attach metrics to experiences
-            self.graph.query(
-                """
-                MATCH (e:Experience {candidate_id: $cid})
-                WITH e, $experiences AS exps
-                UNWIND exps AS exp
-                WITH e, exp
-                WHERE e.idx = exp.idx
-                UNWIND exp.metrics AS metric
-                MERGE (m:Metric {value: metric})
-                MERGE (e)-[:MEASURED_BY]->(m)
-                """,
-                {"cid": candidate_id, "experiences": [
-                    dict(exp, idx=i) for i, exp in enumerate(experiences)
-                ]},
-            )
+        async with self.driver.session(database=NEO4J_DATABASE) as session:
+            await session.execute_write(_work)
 
-            # Skills for experiences and candidate
-            self.graph.query(
-                """
-                MATCH (c:Candidate {id: $cid})
-                WITH c, $experiences AS exps
-                UNWIND exps AS exp
-                UNWIND exp.skills AS skillName
-                MERGE (s:Skill {name: skillName})
-                WITH c, s, exp
-                MERGE (c)-[:HAS_SKILL]->(s)
-                WITH s, exp
-                MATCH (e:Experience {candidate_id: $cid, idx: exp.idx})
-                MERGE (e)-[:USED_SKILL]->(s)
-                """,
-                {"cid": candidate_id, "experiences": [
-                    dict(exp, idx=i) for i, exp in enumerate(experiences)
-                ]},
-            )
+    async def _write_resume_to_graph(self, candidate_id, resume_struct):
+        """
+        Write candidate, experiences, and skills into Neo4j using the schema:
+        (:Candidate)-[:HAS_EXPERIENCE]->(:Experience)-[:USED_SKILL]->(:Skill)
+        and (:Candidate)-[:HAS_SKILL]->(:Skill), in a single transaction.
+        """
+        await self.write_resumes_to_graph([(candidate_id, resume_struct)])
 
-            # Top-level skills list
-            if skills:
-                self.graph.query(
-                    """
-                    MATCH (c:Candidate {id: $cid})
-                    UNWIND $skills AS skillName
-                    MERGE (s:Skill {name: skillName})
-                    MERGE (c)-[:HAS_SKILL]->(s)
-                    """,
-                    {"cid": candidate_id, "skills": skills},
-                )
+    async def write_resumes_to_graph(self, resumes, batch_size=None):
+        """
+        Bulk-write (candidate_id, resume_struct) pairs, `batch_size` resumes
+        per transaction. Returns the number of resumes written.
+        """
+        if self.driver is None:
+            return 0
+        batch_size = batch_size or GRAPH_WRITE_BATCH_SIZE
+        written = 0
+        batch = []
+        for candidate_id, resume_struct in resumes:
+            batch.append(self._resume_graph_row(candidate_id, resume_struct))
+            if len(batch) >= batch_size:
+                await self._execute_write(RESUME_GRAPH_WRITE_QUERY, {"rows": batch})
+                written += len(batch)
+                batch = []
+        if batch:
+            await self._execute_write(RESUME_GRAPH_WRITE_QUERY, {"rows": batch})
+            written += len(batch)
+        METRICS.incr("graph.resumes_written", written)
+        return written
+
+    async def backfill_graph(self, batch_size=None):
+        """
+        Write every resume in the on-disk store to Neo4j in bulk, e.g. after
+        enabling graph mode or wiping the database. Returns the count written.
+        """
+        if not self._use_graph:
+            logging.warning("GraphRAG: graph mode is disabled; nothing to backfill.")
+            return 0
+        batch_size = batch_size or GRAPH_WRITE_BATCH_SIZE
+
+        def _read_stored(paths):
+            resumes = []
+            for path in paths:
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, json.JSONDecodeError) as exc:
+                    logging.warning("GraphRAG: skipping unreadable %s: %s", path, exc)
+                    continue
+                if data.get("user_id") and data.get("resume_struct"):
+                    resumes.append((data["user_id"], data["resume_struct"]))
+            return resumes
 
+        paths = await asyncio.to_thread(lambda: sorted(self.store_dir.glob("*.json")))
+        written = 0
+        for start in range(0, len(paths), batch_size):
+            resumes = await asyncio.to_thread(_read_stored, paths[start:start + batch_size])
+            written += await self.write_resumes_to_graph(resumes, batch_size=batch_size)
+        return written
 
     def _extract_keywords(self, text):
+        return set(self._keyword_tokens(text))
+
+    def _keyword_tokens(self, text):
         stopwords = {
             "the",
             "and",
@@ -854,7 +3043,109 @@ class GraphRAG:
             ).split()
             if len(token) > 2 and token not in stopwords
         ]
-        return set(tokens)
+        return tokens
+
+
+# Planner slot definitions and system prompt. Built once so the system prompt is
+# byte-identical across calls (the first block of the cacheable prompt prefix).
+PLANNER_REQUIRED_SLOTS = {
+    "greeting": "Internal flag to ensure the bot greets the candidate warmly using their name and CV context (no user input required).",
+    "project_description": "A concrete description of one important project the candidate worked on.",
+    "project_metric": "What metric or KPI they used to evaluate that project's success.",
+    "project_bottleneck": "The main bottleneck or hardest part of that project.",
+    "project_solution": "How they tackled and resolved that bottleneck.",
+    "team_challenge": "A specific time they faced a challenge with a team member or stakeholder.",
+    "adaptability_example": "A time they had to learn something new quickly or pivot their strategy.",
+    "leadership_example": "An example of when they took ownership or led an initiative (even if not a manager).",
+    "notice_period": "Their current notice period or when they can realistically start.",
+    "visa_status": "Their current visa or work authorization status relevant to the job.",
+}
+
+
+# Shared by the planner prompt and the fused planner + speaker prompt.
+_PLANNER_RULES = (
+    "You are an interview planner agent for a technical hiring bot.\n"
+    "Your ONLY job is to manage a structured interview flow and output JSON describing "
+    "what should happen next. You NEVER speak directly to the user.\n\n"
+    "Interview mission:\n"
+    "- Collect the candidate's key details in this order:\n"
+    "  1) greeting (mark as completed automatically after the bot greets the candidate)\n"
+    "  2) project_description\n"
+    "  3) project_metric\n"
+    "  4) project_bottleneck\n"
+    "  5) project_solution\n"
+    "  6) team_challenge\n"
+    "  7) adaptability_example\n"
+    "  8) leadership_example\n"
+    "  9) notice_period\n"
+    "  10) visa_status\n\n"
+    "You are given two inputs: first a candidate profile that stays the same for the whole interview "
+    "(resume_struct, job_requirements), then the per-turn input (state, latest_user_message, "
+    "cv_context, history_summary, history). Among them:\n"
+    "- cv_context: the sections of the candidate's CV most relevant to the next missing slot.\n"
+    "- history_summary: a running summary of earlier turns; history holds only the most recent turns.\n"
+    "- resume_struct: structured JSON parsed from the CV with candidate + experiences + skills.\n"
+    "- job_requirements: text describing the role's requirements.\n"
+    "You MUST base your choice of next slot on BOTH the candidate's CV (cv_context / resume_struct) "
+    "and the job requirements, prioritizing questions that clarify how their past projects and skills "
+    "match the job needs.\n\n"
+    "Required slots and their meanings:\n"
+    f"{json.dumps(PLANNER_REQUIRED_SLOTS, indent=2)}\n\n"
+    "State object:\n"
+    "- slots: mapping from slot name to its current value (or null if unknown)\n"
+    "- goal_completed: whether all important information has been gathered\n"
+    "- ended: whether the interview has already been closed\n\n"
+    "Rules:\n"
+    "1. If ended is true, always output next_action = \"END\" and goal_completed = true.\n"
+    "2. Otherwise, if you can reliably fill any slots from the latest user message, "
+    "   add them to updated_slots.\n"
+    "3. When possible, infer project-related slots directly from resume_struct or cv_context, "
+    "   instead of asking the user to repeat obvious CV facts.\n"
+    "4. Use history and latest_user_message to avoid sounding robotic: if the user clearly refuses "
+    "   or says they don't know (e.g. 'I can't tell you that', 'I don't know', 'prefer not to say'), "
+    "   do NOT simply repeat the same question again. You may instead:\n"
+    "   - mark that slot as effectively unknown in updated_slots (for example, 'UNKNOWN'), and pick a\n"
+    "     different missing slot, or\n"
+    "   - switch target_slot to a different high-value slot that moves the interview forward.\n"
+    "5. If after updates all required slots are filled, set goal_completed = true and "
+    "   next_action = \"END\".\n"
+    "6. If some slots are still missing, set next_action = \"ASK_SLOT\" and target_slot "
+    "   to the MOST appropriate missing slot, following the order above as a guideline.\n"
+    "7. Do NOT ask about anything outside these slots (no company secrets, internal metrics, etc.).\n"
+)
+
+PLANNER_SYSTEM_PROMPT = _PLANNER_RULES + (
+    "8. Never include natural language questions or greetings. Only output JSON.\n\n"
+    "You must respond with a single JSON object of the form:\n"
+    '{\n'
+    '  \"next_action\": \"ASK_SLOT\" | \"END\",\n'
+    '  \"target_slot\": string or null,\n'
+    '  \"updated_slots\": { \"slot_name\": \"value\", ... },\n'
+    '  \"goal_completed\": boolean\n'
+    "}\n"
+)
+
+FUSED_TURN_SYSTEM_PROMPT = _PLANNER_RULES + (
+    "8. In this mode you ALSO write the only text the candidate sees: when next_action is \"ASK_SLOT\", "
+    "put ONE clear, natural question collecting target_slot in question.\n"
+    "   - For project-related slots, ground it in ONE concrete project from resume_struct.experiences, "
+    "naming the company or project when possible, and ask for specifics (what they did, metrics, "
+    "bottlenecks, decisions, impact).\n"
+    "   - For generic slots (full_name, total_experience, notice_period, visa_status) keep it short and "
+    "factual; for total_experience name their companies and ask for \"years and months\".\n"
+    "   - If latest_user_message refuses or says they don't know, acknowledge that politely and offer a "
+    "softer way to answer (e.g. a rough range) instead of repeating a previous question.\n"
+    "   - Be concise, friendly and professional. Never mention slot names or internal fields.\n"
+    "   When next_action is \"END\", question is null.\n\n"
+    "You must respond with a single JSON object of the form:\n"
+    '{\n'
+    '  \"next_action\": \"ASK_SLOT\" | \"END\",\n'
+    '  \"target_slot\": string or null,\n'
+    '  \"updated_slots\": { \"slot_name\": \"value\", ... },\n'
+    '  \"goal_completed\": boolean,\n'
+    '  \"question\": string or null\n'
+    "}\n"
+)
 
 
 class ChatAgent:
@@ -862,19 +3153,58 @@ class ChatAgent:
     Orchestrates LLM calls, optional Graph RAG context, and MCP tool usage.
     """
 
-    def __init__(self, mcp_client, rag, model="gpt-4.1-mini"):
+    def __init__(self, mcp_client, rag, model="gpt-4.1-mini", openai_client=None):
         self.mcp_client = mcp_client
         self.rag = rag
         self.model = model
-        self.llm = _create_openai_client()
-        # In-memory conversation histories keyed by user_id.
-        # For production, persist this in a database or cache.
-        self._histories = {}
-        # Per-user interview states for goal-oriented flows.
-        self._interviews = {}
+        # Optional AsyncOpenAI override; None uses the shared pooled client.
+        self.llm = openai_client
+        # Conversation history + interview state per user_id, stored as
+        # {"history": [...], "state": InterviewState.to_dict()}. Older turns are
+        # folded into a running summary message at the head of the history.
+        self.sessions = create_shared_cache(
+            SESSION_STORE_URL,
+            max_entries=SESSION_MAX_ENTRIES,
+            ttl_seconds=SESSION_TTL_SECONDS,
+            key_prefix="session:",
+            metrics_prefix="session_store",
+            max_bytes=SESSION_STORE_MAX_BYTES,
+        )
+        # Role-level suggestion box data shared by every user with that role.
+        self._role_suggestions = create_shared_cache(
+            SUGGESTIONS_CACHE_URL,
+            max_entries=SUGGESTIONS_CACHE_MAX_ENTRIES,
+            ttl_seconds=SUGGESTIONS_CACHE_TTL_SECONDS,
+            key_prefix="suggestions:",
+            metrics_prefix="suggestions_cache",
+        )
+        self._role_flights = SingleFlight(metrics_prefix="suggestions_cache")
+        self.role_catalog = RoleCatalog()
+        # Memoized stable planner prompt prefixes keyed by (user, resume, job).
+        self._planner_prefixes = LRUTTLCache(
+            max_entries=RESUME_CACHE_MAX_ENTRIES,
+            ttl_seconds=RESUME_CACHE_TTL_SECONDS,
+            metrics_prefix="planner_prefix_cache",
+        )
+        self.summarizer = HistorySummarizer()
+        # Speculatively generated next questions per user_id (in-process only:
+        # they hold running tasks).
+        self._prefetched_questions = LRUTTLCache(
+            max_entries=SESSION_MAX_ENTRIES,
+            ttl_seconds=SPECULATIVE_QUESTION_TTL_SECONDS,
+            on_evict=self._drop_prefetched_question,
+        )
+        # In-flight history folds per user_id.
+        self._history_folds = {}
+        # Per-user locks serialising session writes (turn saves vs folds) in
+        # this process; across processes folds use the record's version.
+        self._session_locks = weakref.WeakValueDictionary()
         #
         self.analyzer = SoftSkillsAnalyzer()
         self._owner_phone = "owner"
+        # Owner reports are delivered by background workers; see start_jobs().
+        self.jobs = JobQueue()
+        self.jobs.register("owner_report", self._run_owner_report_job)
         # Audio Transcriber
         self.transcriber = Transcriber()
 
@@ -898,8 +3228,9 @@ class ChatAgent:
 
         payload = {"role": role, "max_skills": limit}
 
-        def _complete() -> str:
-            resp = self.llm.chat.completions.create(
+        try:
+            resp = await _achat_completion(
+                client=self.llm,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -909,10 +3240,7 @@ class ChatAgent:
                 max_tokens=400,
                 temperature=DEFAULT_TEMPERATURE,
             )
-            return resp.choices[0].message.content or "{}"
-
-        try:
-            content = await asyncio.to_thread(_complete)
+            content = resp.choices[0].message.content or "{}"
             data = json.loads(content)
             skills_list = data.get("skills") or []
             skills: list[str] = [
@@ -941,8 +3269,9 @@ class ChatAgent:
 
         payload = {"role": role, "skills": skills}
 
-        def _complete() -> str:
-            resp = self.llm.chat.completions.create(
+        try:
+            resp = await _achat_completion(
+                client=self.llm,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -952,33 +3281,112 @@ class ChatAgent:
                 max_tokens=400,
                 temperature=DEFAULT_TEMPERATURE,
             )
-            return resp.choices[0].message.content or "{}"
-
-        try:
-            content = await asyncio.to_thread(_complete)
+            content = resp.choices[0].message.content or "{}"
             data = json.loads(content)
             tips_list = data.get("tips") or []
             return [str(t).strip() for t in tips_list if isinstance(t, str) and str(t).strip()]
         except Exception:
             return []
 
-    def _maybe_prefix_greeting(self, state: InterviewState, answer: str) -> str:
+    async def _cached_role_suggestion(self, key, generate):
         """
-        Ensure we initiate the conversation with a friendly greeting (using the
-        candidate's name when available) exactly once per interview.
+        Cached, single-flighted role-level suggestion data. Empty results (the
+        generators' failure value) are not cached.
+        """
+        cached = await asyncio.to_thread(self._role_suggestions.get, key)
+        if cached is not None:
+            return cached
+
+        async def _load():
+            value = await generate()
+            if value:
+                await asyncio.to_thread(self._role_suggestions.set, key, value)
+            return value
+
+        return await self._role_flights.do(key, _load)
+
+    async def cached_role_tech_keywords(self, role: str, limit: int = 15) -> list[str]:
+        """
+        generate_role_tech_keywords, served from the role catalog when the role
+        matches a canonical one, else cached across users by normalised role.
+        """
+        entry = await asyncio.to_thread(self.role_catalog.match, role)
+        if entry is not None:
+            return entry["skills"][:limit]
+        return await self._cached_role_suggestion(
+            f"skills:{limit}:{normalize_role(role)}",
+            lambda: self.generate_role_tech_keywords(role, limit=limit),
+        )
+
+    async def cached_attitude_tips(self, role: str, skills: list[str]) -> list[str]:
+        """
+        generate_attitude_tips, served from the role catalog when the role
+        matches a canonical one, else cached across users by normalised role.
+        """
+        entry = await asyncio.to_thread(self.role_catalog.match, role)
+        if entry is not None:
+            return entry["tips"]
+        return await self._cached_role_suggestion(
+            f"tips:{normalize_role(role)}",
+            lambda: self.generate_attitude_tips(role, skills),
+        )
+
+    def _resume_context(self, user_id):
+        """
+        (cv_text, resume_struct, candidate_info) from this user's resume, or
+        empty values if it is not loaded. Callers load it first via
+        self.rag.load_resume(user_id).
+        """
+        record = self.rag.cached_resume(user_id) if self.rag else None
+        if record is None:
+            return "", {}, {}
+        return record.text, record.resume_struct, record.candidate_info
+
+    async def _slot_resume_struct(self, user_id, slot):
+        """
+        The part of the resume_struct relevant to `slot`: the slot's subgraph
+        when Neo4j is connected, otherwise the full cached resume_struct.
+        """
+        if self.rag:
+            context = await self.rag.retrieve_graph_context(user_id, slot)
+            if context is not None:
+                return context
+        _, resume_struct, _ = self._resume_context(user_id)
+        return resume_struct
+
+    def _cv_context(self, user_id, slot, query_text=""):
+        """
+        CV sections relevant to `slot` (see GraphRAG.retrieve_cv_context).
+        """
+        if not self.rag:
+            return ""
+        return self.rag.retrieve_cv_context(user_id, slot=slot, query_text=query_text)
+
+    def _next_missing_slot(self, state, skip=None):
+        """
+        The first unfilled slot in the order the planner works through
+        (PLANNER_REQUIRED_SLOTS), ignoring `skip`. Slots the planner never asks
+        about (e.g. total_experience) are not considered.
+        """
+        for slot in PLANNER_REQUIRED_SLOTS:
+            if slot != skip and slot in state.slots and not state.slots.get(slot):
+                return slot
+        return None
+
+    def _greeting_preface(self, state: InterviewState, user_id) -> str | None:
+        """
+        Return the one-off greeting (using the candidate's name when available)
+        and mark the state as greeted, or None if we already greeted.
         """
         if getattr(state, "greeted", False):
-            return answer
+            return None
 
         name = None
         if state.slots.get("full_name"):
             name = state.slots["full_name"]
         else:
-            try:
-                candidate = getattr(self.rag, "candidate_info", {}) or {}
-                name = candidate.get("full_name")
-            except Exception:
-                name = None
+            _, _, candidate = self._resume_context(user_id)
+            name = candidate.get("full_name")
 
         if name:
             preface = (
@@ -993,105 +3401,81 @@ class ChatAgent:
 
         state.greeted = True
         state.slots["greeting"] = "completed"
+        return preface
+
+    def _maybe_prefix_greeting(self, state: InterviewState, answer: str, user_id) -> str:
+        """
+        Ensure we initiate the conversation with a friendly greeting (using the
+        candidate's name when available) exactly once per interview.
+        """
+        preface = self._greeting_preface(state, user_id)
+        if preface is None:
+            return answer
         if answer.strip():
             return f"{preface}\n\n{answer}"
         return preface
 
-    async def _call_llm(self, system_prompt, user_content):
-        def _complete() -> str:
-            response = self.llm.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-                max_tokens=800,
-                temperature=DEFAULT_TEMPERATURE,
-            )
-            return response.choices[0].message.content or ""
+    async def _llm_completion(self, system_prompt, user_content):
+        return await _achat_completion(
+            client=self.llm,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            max_tokens=800,
+            temperature=DEFAULT_TEMPERATURE,
+        )
 
-        return await asyncio.to_thread(_complete)
+    async def _call_llm(self, system_prompt, user_content):
+        response = await self._llm_completion(system_prompt, user_content)
+        return response.choices[0].message.content or ""
 
-    async def _call_planner(
-        self, user_id, user_message, state, history
-    ):
+    async def _stream_llm(self, system_prompt, user_content, decision=None):
         """
-        Planner-level call: given the current interview state and latest user message,
-        decide which slot to ask about next or whether to end.
+        Streaming counterpart of _call_llm: yields text deltas as they arrive.
+        With `decision`, the stream's tokens are recorded as a speaker call and
+        added to decision.tokens.
         """
-        required_slots = {
-            "greeting": "Internal flag to ensure the bot greets the candidate warmly using their name and CV context (no user input required).",
-            "project_description": "A concrete description of one important project the candidate worked on.",
-            "project_metric": "What metric or KPI they used to evaluate that project's success.",
-            "project_bottleneck": "The main bottleneck or hardest part of that project.",
-            "project_solution": "How they tackled and resolved that bottleneck.",
-            "team_challenge": "A specific time they faced a challenge with a team member or stakeholder.",
-            "adaptability_example": "A time they had to learn something new quickly or pivot their strategy.",
-            "leadership_example": "An example of when they took ownership or led an initiative (even if not a manager).",
-            "notice_period": "Their current notice period or when they can realistically start.",
-            "visa_status": "Their current visa or work authorization status relevant to the job.",
-        }
-
-        cv_context = self.rag._text if self.rag and self.rag.has_index() else ""
-        resume_struct = getattr(self.rag, "resume_struct", {}) if self.rag else {}
-        job_requirements = os.environ.get("JOB_REQUIREMENTS", "")
-        # Keep a small recent window of turns to inform behaviour without bloating the prompt.
-        recent_history = history[-8:] if history else []
+        def on_usage(chunk):
+            decision.tokens += _record_llm_usage("speaker", chunk)
+
+        started = False
+        async for delta in _astream_completion(
+            client=self.llm,
+            on_usage=on_usage if decision is not None else None,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            max_tokens=800,
+            temperature=DEFAULT_TEMPERATURE,
+        ):
+            if not started:
+                # Match the .strip() the non-streaming speakers apply.
+                delta = delta.lstrip()
+                if not delta:
+                    continue
+                started = True
+            yield delta
 
-        system_prompt = (
-            "You are an interview planner agent for a technical hiring bot.\n"
-            "Your ONLY job is to manage a structured interview flow and output JSON describing "
-            "what should happen next. You NEVER speak directly to the user.\n\n"
-            "Interview mission:\n"
-            "- Collect the candidate's key details in this order:\n"
-            "  1) greeting (mark as completed automatically after the bot greets the candidate)\n"
-            "  2) project_description\n"
-            "  3) project_metric\n"
-            "  4) project_bottleneck\n"
-            "  5) project_solution\n"
-            "  6) team_challenge\n"
-            "  7) adaptability_example\n"
-            "  8) leadership_example\n"
-            "  9) notice_period\n"
-            "  10) visa_status\n\n"
-            "You are also given:\n"
-            "- cv_context: raw or summarized text from the candidate's CV.\n"
-            "- resume_struct: structured JSON parsed from the CV with candidate + experiences + skills.\n"
-            "- job_requirements: text describing the role's requirements.\n"
-            "You MUST base your choice of next slot on BOTH the candidate's CV (cv_context / resume_struct) "
-            "and the job requirements, prioritizing questions that clarify how their past projects and skills "
-            "match the job needs.\n\n"
-            "Required slots and their meanings:\n"
-            f"{json.dumps(required_slots, indent=2)}\n\n"
-            "State object:\n"
-            "- slots: mapping from slot name to its current value (or null if unknown)\n"
-            "- goal_completed: whether all important information has been gathered\n"
-            "- ended: whether the interview has already been closed\n\n"
-            "Rules:\n"
-            "1. If ended is true, always output next_action = \"END\" and goal_completed = true.\n"
-            "2. Otherwise, if you can reliably fill any slots from the latest user message, "
-            "   add them to updated_slots.\n"
-            "3. When possible, infer project-related slots directly from resume_struct or cv_context, "
-            "   instead of asking the user to repeat obvious CV facts.\n"
-            "4. Use history and latest_user_message to avoid sounding robotic: if the user clearly refuses "
-            "   or says they don't know (e.g. 'I can't tell you that', 'I don't know', 'prefer not to say'), "
-            "   do NOT simply repeat the same question again. You may instead:\n"
-            "   - mark that slot as effectively unknown in updated_slots (for example, 'UNKNOWN'), and pick a\n"
-            "     different missing slot, or\n"
-            "   - switch target_slot to a different high-value slot that moves the interview forward.\n"
-            "5. If after updates all required slots are filled, set goal_completed = true and "
-            "   next_action = \"END\".\n"
-            "6. If some slots are still missing, set next_action = \"ASK_SLOT\" and target_slot "
-            "   to the MOST appropriate missing slot, following the order above as a guideline.\n"
-            "7. Do NOT ask about anything outside these slots (no company secrets, internal metrics, etc.).\n"
-            "8. Never include natural language questions or greetings. Only output JSON.\n\n"
-            "You must respond with a single JSON object of the form:\n"
-            '{\n'
-            '  \"next_action\": \"ASK_SLOT\" | \"END\",\n'
-            '  \"target_slot\": string or null,\n'
-            '  \"updated_slots\": { \"slot_name\": \"value\", ... },\n'
-            '  \"goal_completed\": boolean\n'
-            "}\n"
+    def _planner_input(self, user_id, user_message, state, history):
+        """
+        The per-turn planner message (shared by the planner and fused turn calls).
+        """
+        # Only the CV sections relevant to the next missing slot, not the whole text.
+        cv_context = self._cv_context(
+            user_id, self._next_missing_slot(state), user_message
+        )
+        # Running summary of older turns plus a small recent window, trimmed to the token budget.
+        summary, messages = _split_history_summary(history)
+        summary_text = (summary or {}).get("content") or ""
+        recent_history, _ = _fit_token_budget(
+            "planner",
+            PLANNER_HISTORY_TOKEN_BUDGET,
+            _count_tokens(summary_text),
+            messages[-HISTORY_TAIL_MESSAGES:],
         )
 
         planner_input = {
@@ -1103,53 +3487,291 @@ class ChatAgent:
             },
             "latest_user_message": user_message,
             "cv_context": cv_context,
-            "resume_struct": resume_struct,
-            "job_requirements": job_requirements,
+            "history_summary": summary_text,
             "history": recent_history,
         }
+        return planner_input
 
-        def _complete():
-            response = self.llm.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": json.dumps(planner_input)},
-                ],
-                max_tokens=600,
-                temperature=DEFAULT_TEMPERATURE,
+    async def _call_planner(
+        self, user_id, user_message, state, history
+    ):
+        """
+        Planner-level call: given the current interview state and latest user message,
+        decide which slot to ask about next or whether to end.
+
+        The request is laid out for upstream prompt caching: a constant system
+        prompt, then a byte-identical profile message per (user, job), then a
+        small per-turn message.
+        """
+        planner_input = self._planner_input(user_id, user_message, state, history)
+
+        response = await _achat_completion(
+            client=self.llm,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": PLANNER_SYSTEM_PROMPT},
+                {"role": "user", "content": self._planner_profile_message(user_id)},
+                {"role": "user", "content": json.dumps(planner_input)},
+            ],
+            max_tokens=600,
+            temperature=DEFAULT_TEMPERATURE,
+            prompt_cache_key=f"planner:{user_id}",
+        )
+        tokens = _record_llm_usage("planner", response)
+        raw = response.choices[0].message.content or "{}"
+        try:
+            data = json.loads(raw)
+        ## if it fails to get into json format
+        except json.JSONDecodeError:
+            # Fallback: simple default asking for name.
+            return PlannerDecision(
+                next_action="ASK_SLOT",
+                target_slot="name",
+                updated_slots={},
+                goal_completed=False,
+                tokens=tokens,
             )
-            raw = response.choices[0].message.content or "{}"
-            try:
-                data = json.loads(raw)
-            ## if it fails to get into json format
-            except json.JSONDecodeError:
-                # Fallback: simple default asking for name.
-                return PlannerDecision(
-                    next_action="ASK_SLOT",
-                    target_slot="name",
-                    updated_slots={},
-                    goal_completed=False,
-                )
 
-            next_action = data.get("next_action", "ASK_SLOT")
-            target_slot = data.get("target_slot")
-            updated_slots = data.get("updated_slots") or {}
-            goal_completed = bool(data.get("goal_completed", False))
+        next_action = data.get("next_action", "ASK_SLOT")
+        target_slot = data.get("target_slot")
+        updated_slots = data.get("updated_slots") or {}
+        goal_completed = bool(data.get("goal_completed", False))
 
-            if not isinstance(updated_slots, dict):
-                updated_slots = {}
+        if not isinstance(updated_slots, dict):
+            updated_slots = {}
 
-            return PlannerDecision(
-                next_action=str(next_action),
-                target_slot=str(target_slot) if target_slot is not None else None,
-                updated_slots={str(k): str(v) for k, v in updated_slots.items()},
-                goal_completed=goal_completed,
+        return PlannerDecision(
+            next_action=str(next_action),
+            target_slot=str(target_slot) if target_slot is not None else None,
+            updated_slots={str(k): str(v) for k, v in updated_slots.items()},
+            goal_completed=goal_completed,
+            tokens=tokens,
+        )
+
+    def _use_fused_turn(self, user_id):
+        """
+        Whether this user is in the FUSED_TURN_FRACTION bucket served by the
+        fused planner + speaker call (stable per user, for A/B comparison).
+        """
+        if FUSED_TURN_FRACTION <= 0:
+            return False
+        if FUSED_TURN_FRACTION >= 1:
+            return True
+        digest = hashlib.sha256(f"fused_turn:{user_id}".encode("utf-8")).hexdigest()
+        return int(digest[:8], 16) / 0xFFFFFFFF < FUSED_TURN_FRACTION
+
+    async def _call_fused_turn(self, user_id, user_message, state, history):
+        """
+        Planner and speaker in one JSON completion: the slot decision plus the
+        question for it. Returns (PlannerDecision carrying the question, or
+        None if the response fails validation; tokens spent).
+        """
+        planner_input = self._planner_input(user_id, user_message, state, history)
+        response = await _achat_completion(
+            client=self.llm,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": FUSED_TURN_SYSTEM_PROMPT},
+                {"role": "user", "content": self._planner_profile_message(user_id)},
+                {"role": "user", "content": json.dumps(planner_input)},
+            ],
+            max_tokens=900,
+            temperature=DEFAULT_TEMPERATURE,
+            response_format={"type": "json_object"},
+            prompt_cache_key=f"fused_turn:{user_id}",
+        )
+        tokens = _record_llm_usage("fused_turn", response)
+        try:
+            data = json.loads(response.choices[0].message.content or "")
+        except json.JSONDecodeError:
+            return None, tokens
+        decision = self._validate_fused_turn(data, state)
+        if decision is not None:
+            decision.tokens = tokens
+        return decision, tokens
+
+    def _validate_fused_turn(self, data, state):
+        """
+        PlannerDecision from a fused turn response, or None unless it has a
+        known next_action, dict updated_slots and, for ASK_SLOT, a real slot
+        (not the virtual greeting) with a non-empty question.
+        """
+        if not isinstance(data, dict):
+            return None
+        next_action = data.get("next_action")
+        target_slot = data.get("target_slot")
+        updated_slots = data.get("updated_slots") or {}
+        question = data.get("question")
+        if next_action not in ("ASK_SLOT", "END") or not isinstance(updated_slots, dict):
+            return None
+        if next_action == "ASK_SLOT":
+            if target_slot not in state.slots or target_slot == "greeting":
+                return None
+            if not isinstance(question, str) or not question.strip():
+                return None
+            question = question.strip()
+        else:
+            question = None
+        return PlannerDecision(
+            next_action=next_action,
+            target_slot=str(target_slot) if target_slot is not None else None,
+            updated_slots={str(k): str(v) for k, v in updated_slots.items()},
+            goal_completed=bool(data.get("goal_completed", False)),
+            question=question,
+            path="fused",
+        )
+
+    async def _decide_turn(self, user_id, user_message, state, history):
+        """
+        The planner decision for this turn: from the fused call for users in
+        the fused bucket (falling back to the planner call if its response is
+        invalid or the call fails), otherwise from the planner alone.
+        """
+        if not self._use_fused_turn(user_id):
+            return await self._call_planner(user_id, user_message, state, history)
+        try:
+            decision, fused_tokens = await self._call_fused_turn(
+                user_id, user_message, state, history
             )
+        except Exception as exc:
+            logging.warning("Fused turn call failed, using planner + speaker: %s", exc)
+            decision, fused_tokens = None, 0
+        if decision is not None:
+            return decision
+        METRICS.incr("turn_path.fused.fallbacks")
+        decision = await self._call_planner(user_id, user_message, state, history)
+        decision.path = "fused_fallback"
+        # The rejected fused call is part of what this path costs.
+        decision.tokens += fused_tokens
+        return decision
+
+    def _record_turn_path(self, decision, started):
+        """
+        A/B counters per decision path: turns, time from the start of the turn
+        until the answer text is complete, and the tokens of the calls that
+        decide and phrase the question (planner/fused and question speaker;
+        deepen and goodbye calls are common to all paths and not counted).
+        """
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        METRICS.incr(f"turn_path.{decision.path}.turns")
+        METRICS.incr(f"turn_path.{decision.path}.latency_ms_total", round(elapsed_ms))
+        METRICS.set(f"turn_path.{decision.path}.last_latency_ms", round(elapsed_ms, 1))
+        METRICS.incr(f"turn_path.{decision.path}.tokens_total", decision.tokens)
+        METRICS.set(f"turn_path.{decision.path}.last_tokens", decision.tokens)
+
+    def _planner_profile_message(self, user_id):
+        """
+        The stable (user, job) part of the planner prompt, memoized so every
+        turn sends exactly the same bytes and hits the provider's prompt cache.
+        """
+        record = self.rag.cached_resume(user_id) if self.rag else None
+        job_requirements = os.environ.get("JOB_REQUIREMENTS", "")
+        key = (
+            user_id,
+            record.fingerprint if record is not None else None,
+            hashlib.sha256(job_requirements.encode("utf-8")).hexdigest(),
+        )
+        message = self._planner_prefixes.get(key)
+        if message is None:
+            profile = {
+                "resume_struct": record.resume_struct if record is not None else {},
+                "job_requirements": job_requirements,
+            }
+            message = json.dumps(profile, sort_keys=True, ensure_ascii=False)
+            self._planner_prefixes.set(key, message)
+        return message
+
+    async def _load_session(self, user_id):
+        """
+        (history, state) for this user; state is None if no interview has started.
+        The returned objects are copies: call _save_session to persist changes.
+        """
+        data = await asyncio.to_thread(self.sessions.get, user_id)
+        if not data:
+            return [], None
+        state = InterviewState.from_dict(data["state"]) if data.get("state") else None
+        return list(data.get("history") or []), state
+
+    def _session_lock(self, user_id):
+        lock = self._session_locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[user_id] = lock
+        return lock
+
+    async def _save_session(self, user_id, history, state):
+        """
+        Persist the user's history (running summary + last SESSION_MAX_TURNS
+        messages) and state, then fold older turns into the summary in the
+        background if the unsummarised part has grown past the fold threshold.
+        Each save bumps the record's version, which makes an in-flight fold
+        from any process give up rather than overwrite this turn.
+        """
+        summary, messages = _split_history_summary(history)
+        history[:] = ([summary] if summary else []) + messages[-SESSION_MAX_TURNS:]
+        async with self._session_lock(user_id):
+            current = await asyncio.to_thread(self.sessions.get, user_id)
+            data = {
+                "history": history,
+                "state": state.to_dict() if state is not None else None,
+                "version": (current or {}).get("version", 0) + 1,
+            }
+            await asyncio.to_thread(self.sessions.set, user_id, data)
+        if len(messages) > HISTORY_TAIL_MESSAGES + HISTORY_FOLD_BATCH:
+            self._fold_history_task(user_id)
+
+    def _fold_history_task(self, user_id):
+        """
+        Task folding this user's older turns into the running summary; one per
+        user at a time.
+        """
+        task = self._history_folds.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fold_history(user_id))
+            self._history_folds[user_id] = task
+            task.add_done_callback(lambda done: self._fold_history_done(user_id, done))
+        return task
+
+    def _fold_history_done(self, user_id, task):
+        self._history_folds.pop(user_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            METRICS.incr("history_summary.errors")
+            logging.warning("History summary for %s failed: %s", user_id, task.exception())
+
+    async def _fold_history(self, user_id):
+        """
+        Summarise everything but the last HISTORY_TAIL_MESSAGES messages into
+        the running summary. The summary is written with compare_and_set
+        against the version the fold started from, under the user's session
+        lock, so it is dropped if any turn was saved meanwhile (here or in
+        another process); it is retried after the next turn.
+        """
+        data = await asyncio.to_thread(self.sessions.get, user_id) or {}
+        summary, messages = _split_history_summary(list(data.get("history") or []))
+        folded = messages[:-HISTORY_TAIL_MESSAGES]
+        if len(folded) < HISTORY_FOLD_BATCH:
+            return
+        new_summary = await self.summarizer.fold(summary, folded)
 
-        return await asyncio.to_thread(_complete)
+        version = data.get("version", 0)
+        new_data = {
+            "history": [new_summary] + messages[len(folded):],
+            "state": data.get("state"),
+            "version": version + 1,
+        }
+        async with self._session_lock(user_id):
+            written = await asyncio.to_thread(
+                self.sessions.compare_and_set, user_id, new_data, version
+            )
+        if not written:
+            METRICS.incr("history_summary.conflicts")
+            return
+        METRICS.incr("history_summary.folds")
+        METRICS.incr("history_summary.folded_messages", len(folded))
+        METRICS.set("history_summary.last_tokens", _count_tokens(new_summary["content"]))
 
-    def _get_or_create_interview_state(self, user_id):
-        if user_id not in self._interviews:
+    def _get_or_create_interview_state(self, user_id, state=None):
+        if state is None:
             # Initialize slots aligned with planner expectations.
             slots = {
                 "full_name": None,
@@ -1165,77 +3787,27 @@ class ChatAgent:
                 "visa_status": None,
             }
             # If we already parsed a resume, pre-fill what we can (e.g. full_name).
-            try:
-                candidate = getattr(self.rag, "candidate_info", {}) or {}
-                resume_struct = getattr(self.rag, "resume_struct", {}) or {}
-            except Exception:
-                candidate = {}
-                resume_struct = {}
+            _, resume_struct, candidate = self._resume_context(user_id)
             if candidate.get("full_name"):
                 slots["full_name"] = candidate["full_name"]
             total_xp = (
                 candidate.get("total_experience_years")
                 or candidate.get("total_experience")
                 or resume_struct.get("total_experience_years")
-                or resume_struct.get("total_experience")
-            )
-            if total_xp:
-                slots["total_experience"] = str(total_xp)
-
-            self._interviews[user_id] = InterviewState(slots=slots)
-        return self._interviews[user_id]
-
-    async def answer_question(self, user_message):
-        graph_result = await self.rag.query(user_message)
-
-        if graph_result:
-            return await self._answer_with_graph(user_message, graph_result)
-        else:
-            return (self._call_llm("tell me about your experience in domain", user_message)).strip()
-    # async def _answer_without_graph(self, user_message):
-    #     system_prompt = (
-    #         "You are a helpful assistant. "
-    #         "Answer the user using your own knowledge when no graph context is available."
-    #     )
-    #     reply = await self._call_llm(system_prompt, user_message)
-    #     return reply.strip()
-
-    async def _answer_with_graph(
-        self, user_message, graph_result
-    ):
-        structured_context = json.dumps(
-            {
-                "graph_answer": graph_result.answer,
-                "intermediate_steps": graph_result.intermediate_steps,
-            },
-            ensure_ascii=False,
-            indent=2,
-        )
-
-        system_prompt = (
-            "You are a graph-aware assistant. "
-            "You are given (a) the graph query answer produced by a Neo4jGraphQAChain "
-            "and (b) the intermediate traversal steps that show how the chain navigated the graph. "
-            "Treat the graph answer as authoritative but verify it using the intermediate steps. "
-            "If the steps look incomplete, explain the gap and suggest follow-up queries."
-        )
-
-        user_payload = (
-            f"User question:\n{user_message}\n\n"
-            f"Graph retrieval context (answer + steps):\n{structured_context}"
-        )
+                or resume_struct.get("total_experience")
+            )
+            if total_xp:
+                slots["total_experience"] = str(total_xp)
 
-        reply = await self._call_llm(system_prompt, user_payload)
-        return reply.strip()
+            state = InterviewState(slots=slots)
+        return state
 
     async def send_answer_to_whatsapp(self, phone, message):
         await self.mcp_client.send_whatsapp_message(user_phone=phone, message=message)
 
-    async def _speak_question_for_slot(
-        self, target_slot, state, latest_user_message=None
-    ):
+    async def _question_prompt(self, user_id, target_slot, state, latest_user_message=None):
         """
-        Speaker-level helper to turn a planner-selected slot into a natural-language question.
+        Build the (system_prompt, user_payload) pair for the slot question speaker.
         """
         system_prompt = (
             "You are an interviewer chatbot for a hiring process. "
@@ -1243,8 +3815,9 @@ class ChatAgent:
             "You are given:\n"
             "- target_slot: the field you must collect next (e.g. project_description, project_metric).\n"
             "- known_information: the current slot values.\n"
-            "- resume_struct: structured CV JSON with candidate + experiences + skills.\n"
-            "- cv_context: raw or summarized text from the candidate's CV.\n"
+            "- resume_struct: structured CV JSON with candidate + experiences + skills "
+            "(possibly only the parts relevant to target_slot).\n"
+            "- cv_context: the sections of the candidate's CV most relevant to target_slot.\n"
             "- job_requirements: text describing the role's requirements.\n"
             "- latest_user_message: what the candidate just said.\n\n"
             "Your job is to ask ONE clear, natural follow-up question to collect that specific piece "
@@ -1270,24 +3843,141 @@ class ChatAgent:
             "Be concise, friendly, and professional. Do NOT mention slot names or internal fields. "
             "Prefer questions that clarify how the candidate's past projects and skills match the job needs."
         )
+        resume_struct = await self._slot_resume_struct(user_id, target_slot)
+        cv_context = self._cv_context(user_id, target_slot, latest_user_message or "")
         user_payload = json.dumps(
             {
                 "target_slot": target_slot,
                 "known_information": state.slots,
-                "cv_context": self.rag._text if self.rag and self.rag.has_index() else "",
-                "resume_struct": getattr(self.rag, "resume_struct", {}) if self.rag else {},
+                "cv_context": cv_context,
+                "resume_struct": resume_struct,
                 "job_requirements": os.environ.get("JOB_REQUIREMENTS", ""),
                 "latest_user_message": latest_user_message or "",
             },
             ensure_ascii=False,
         )
-        reply = await self._call_llm(system_prompt, user_payload)
-        return reply.strip()
+        return system_prompt, user_payload
 
-    async def _speak_deepen_future_slot(self, slot_name, slot_value, state):
+    async def _speak_question_for_slot(
+        self, user_id, target_slot, state, latest_user_message=None, decision=None
+    ):
         """
-        When the candidate has already answered a future slot earlier than expected,
-        acknowledge that understanding and politely ask them to go a bit deeper.
+        Speaker-level helper to turn a planner-selected slot into a natural-language question.
+        Its tokens are added to `decision.tokens` when a decision is given.
+        """
+        response = await self._llm_completion(
+            *await self._question_prompt(user_id, target_slot, state, latest_user_message)
+        )
+        tokens = _record_llm_usage("speaker", response)
+        if decision is not None:
+            decision.tokens += tokens
+        return (response.choices[0].message.content or "").strip()
+
+    def _predict_next_slot(self, state, asked_slot):
+        """
+        The slot the planner most likely picks after the candidate answers
+        `asked_slot`: the next missing one in the planner's own order.
+        """
+        return self._next_missing_slot(state, skip=asked_slot)
+
+    async def _speculate_question(self, user_id, slot, state):
+        """
+        Generate the question for `slot` ahead of the candidate's reply.
+        Returns (text, tokens spent).
+        """
+        response = await self._llm_completion(*await self._question_prompt(user_id, slot, state))
+        tokens = _record_llm_usage("speculative_question", response)
+        METRICS.incr("question_prefetch.spent_tokens", tokens)
+        self._record_prefetch_waste()
+        return (response.choices[0].message.content or "").strip(), tokens
+
+    def _record_prefetch_waste(self):
+        METRICS.set(
+            "question_prefetch.wasted_tokens",
+            METRICS.get("question_prefetch.spent_tokens") - METRICS.get("question_prefetch.used_tokens"),
+        )
+
+    def _count_prefetch(self, outcome):
+        METRICS.incr(f"question_prefetch.{outcome}")
+        hits = METRICS.get("question_prefetch.hits")
+        misses = METRICS.get("question_prefetch.misses")
+        METRICS.set("question_prefetch.hit_rate", round(hits / (hits + misses), 4))
+
+    def _start_question_prefetch(self, user_id, state, asked_slot):
+        """
+        With SPECULATIVE_QUESTIONS on, start generating the likely next
+        question in the background while the candidate composes their reply.
+        """
+        if not SPECULATIVE_QUESTIONS or state.ended or self._use_fused_turn(user_id):
+            return
+        slot = self._predict_next_slot(state, asked_slot)
+        if slot is None:
+            return
+        self._discard_prefetched_question(user_id)
+        # Snapshot: the caller's state object keeps changing on later turns.
+        snapshot = InterviewState.from_dict(state.to_dict())
+        task = asyncio.ensure_future(self._speculate_question(user_id, slot, snapshot))
+        # Failures surface (and are logged) when the prefetch is taken.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._prefetched_questions.set(
+            user_id, {"slot": slot, "interview_id": snapshot.interview_id, "task": task}
+        )
+        METRICS.incr("question_prefetch.started")
+
+    def _discard_prefetched_question(self, user_id):
+        """
+        Drop this user's pending prefetch (a miss), cancelling it if still running.
+        """
+        entry = self._prefetched_questions.pop(user_id)
+        if entry is not None:
+            self._drop_prefetched_question(user_id, entry)
+
+    def _drop_prefetched_question(self, user_id, entry):
+        """
+        Count an unused prefetch as a miss and cancel it if still running.
+        Also called for entries the cache evicts or expires.
+        """
+        self._count_prefetch("misses")
+        if not entry["task"].done():
+            entry["task"].cancel()
+            METRICS.incr("question_prefetch.cancelled")
+
+    async def _take_prefetched_question(self, user_id, target_slot, state):
+        """
+        The prefetched question if it was generated for `target_slot` in this
+        interview, else None (any other prefetch is discarded as a miss).
+        """
+        entry = self._prefetched_questions.peek(user_id)
+        if entry is None:
+            return None
+        if entry["slot"] != target_slot or entry["interview_id"] != state.interview_id:
+            self._discard_prefetched_question(user_id)
+            return None
+        self._prefetched_questions.pop(user_id)
+        try:
+            text, tokens = await entry["task"]
+        except asyncio.CancelledError:
+            # The prefetch was cancelled (e.g. at shutdown): a miss. If this
+            # turn itself is being cancelled, let that propagate.
+            if not entry["task"].cancelled():
+                raise
+            self._count_prefetch("misses")
+            return None
+        except Exception as exc:
+            logging.warning("Speculative question for %s failed: %s", user_id, exc)
+            self._count_prefetch("misses")
+            return None
+        if not text:
+            self._count_prefetch("misses")
+            return None
+        self._count_prefetch("hits")
+        METRICS.incr("question_prefetch.used_tokens", tokens)
+        self._record_prefetch_waste()
+        return text
+
+    def _deepen_prompt(self, user_id, slot_name, slot_value, state):
+        """
+        Build the (system_prompt, user_payload) pair for the deepen-future-slot speaker.
         """
         system_prompt = (
             "You are an interviewer chatbot for a hiring process.\n"
@@ -1302,17 +3992,26 @@ class ChatAgent:
                 "slot_name": slot_name,
                 "slot_value": slot_value,
                 "known_information": state.slots,
-                "cv_context": self.rag._text if self.rag and self.rag.has_index() else "",
+                "cv_context": self._cv_context(user_id, slot_name, str(slot_value or "")),
                 "job_requirements": os.environ.get("JOB_REQUIREMENTS", ""),
             },
             ensure_ascii=False,
         )
-        reply = await self._call_llm(system_prompt, user_payload)
+        return system_prompt, user_payload
+
+    async def _speak_deepen_future_slot(self, user_id, slot_name, slot_value, state):
+        """
+        When the candidate has already answered a future slot earlier than expected,
+        acknowledge that understanding and politely ask them to go a bit deeper.
+        """
+        reply = await self._call_llm(
+            *self._deepen_prompt(user_id, slot_name, slot_value, state)
+        )
         return reply.strip()
 
-    async def _speak_goodbye(self, state):
+    def _goodbye_prompt(self, state):
         """
-        Speaker-level helper to generate a short closing message when the interview ends.
+        Build the (system_prompt, user_payload) pair for the closing message.
         """
         system_prompt = (
             "You are an interviewer chatbot. The interview is complete and you have "
@@ -1320,14 +4019,41 @@ class ChatAgent:
             "briefly on what you learned, and say goodbye in a sentence or two."
         )
         user_payload = json.dumps({"slots": state.slots}, ensure_ascii=False)
-        reply = await self._call_llm(system_prompt, user_payload)
+        return system_prompt, user_payload
+
+    async def _speak_goodbye(self, state):
+        """
+        Speaker-level helper to generate a short closing message when the interview ends.
+        """
+        reply = await self._call_llm(*self._goodbye_prompt(state))
         return reply.strip()
 
-    async def _send_owner_report(self, user_id, state):
+    async def start_jobs(self):
+        """Start the background job workers on the running event loop."""
+        await self.jobs.start()
+
+    async def stop_jobs(self):
+        await self.jobs.stop()
+
+    async def _queue_owner_report(self, user_id, state, history):
+        """
+        Enqueue the owner report for a finished interview. The interview id is
+        the idempotency key, so a repeated END for the same interview sends
+        one report.
+        """
+        payload = {"user_id": user_id, "state": state.to_dict(), "history": history}
+        await self.jobs.enqueue("owner_report", f"owner_report:{user_id}:{state.interview_id}", payload)
+
+    async def _run_owner_report_job(self, payload):
+        await self._send_owner_report(
+            payload["user_id"], InterviewState.from_dict(payload["state"]), payload["history"]
+        )
+
+    async def _send_owner_report(self, user_id, state, history):
         """
         After an interview ends, produce a structured report and send it to the owner via WhatsApp.
+        Runs as an "owner_report" job; raising makes the queue retry it.
         """
-        history = self._histories.get(user_id, [])
 
         # 1. Run Soft Skills Analysis (OCEAN)
         soft_skills_json_str = await self.analyzer.generate_profile(history)
@@ -1362,9 +4088,11 @@ class ChatAgent:
         # 3. Combine them
         full_report = f"{report_text}\n\n{soft_skills_section}"
 
-        await self.mcp_client.send_whatsapp_message(
+        result = await self.mcp_client.send_whatsapp_message(
             message=full_report.strip(),
         )
+        if getattr(result, "isError", False):
+            raise RuntimeError(f"WhatsApp report delivery failed: {result.content}")
 
     async def start_interview(self, user_id):
         """
@@ -1377,26 +4105,21 @@ class ChatAgent:
         - lets the candidate say something first
         - the next user turn will go through handle_message(), which will start the routed interview
         """
-        if not self.rag.has_index():
-            return {
-                "answer": "Please upload your latest resume.",
-                "interview_state": None,
-                "tool_calls": [],
-                "flagged": False,
-                "reason": "resume_missing",
-            }
+        if await self.rag.load_resume(user_id) is None:
+            return self._resume_missing_response()
 
-        history = self._histories.setdefault(user_id, [])
-        state = self._get_or_create_interview_state(user_id)
+        history, state = await self._load_session(user_id)
+        state = self._get_or_create_interview_state(user_id, state)
 
         # For the initial kick‑off we only send a greeting / context message.
         # The first actual interview question will be generated after the user
         # replies, inside handle_message().
-        answer = self._maybe_prefix_greeting(state, "")
+        answer = self._maybe_prefix_greeting(state, "", user_id)
         tool_calls: list[dict] = []
         next_input_mode = "text"
 
         history.append({"role": "assistant", "content": answer})
+        await self._save_session(user_id, history, state)
 
         return {
             "answer": answer,
@@ -1409,53 +4132,80 @@ class ChatAgent:
             "next_input_mode": next_input_mode,
         }
 
-    ##Entry point of the app
-    async def handle_message(
-        self,
-        user_id,
-        message,
-        audio_metrics=None
-    ):
+    def _resume_missing_response(self):
+        return {
+            "answer": "Please upload your latest resume.",
+            "interview_state": None,
+            "tool_calls": [],
+            "flagged": False,
+            "reason": "resume_missing",
+        }
+
+    def _build_user_turn(self, message, audio_metrics=None):
         """
-        Single entrypoint for the app/React frontend.
-        Router logic:
-        - Update interview state from the user's latest message (planner).
-        - Decide whether to ask a new question or end the interview.
-        - Optionally send the final answer to WhatsApp for the user.
-        - After goal completion and goodbye, send a structured report to the owner.
-        - Randomly require some answers (especially deeper project questions)
-          to be provided via voice, so that the prosody/OCEAN analyser has signal.
+        Build the history entry for the user's message, attaching audio metrics
+        (WPM) for SoftSkillsAnalyzer and flagging refusal-style replies as a
+        behavioural signal.
         """
-        if not self.rag.has_index():
-            return {
-                "answer": "Please upload your latest resume.",
-                "interview_state": None,
-                "tool_calls": [],
-                "flagged": False,
-                "reason": "resume_missing",
-            }
-        # Track raw history for context if needed later.
-        history = self._histories.setdefault(user_id, [])
-
-        # Attach metrics (WPM) to the message for SoftSkillsAnalyzer and
-        # detect refusal-style replies as a behavioural signal.
         msg_obj = {"role": "user", "content": message}
         if audio_metrics:
             msg_obj["metadata"] = dict(audio_metrics)
         if is_refusal_message(message):
             meta = msg_obj.setdefault("metadata", {})
             meta["refusal"] = True
-        history.append(msg_obj)
+        return msg_obj
+
+    async def _await_input_check(self, input_check):
+        if input_check is None:
+            return
+        risk = await input_check
+        if not risk.get("allowed", True):
+            raise InputBlockedError(risk)
+
+    async def _plan_turn(self, user_id, message, audio_metrics=None, input_check=None):
+        """
+        Run the planner for the user's latest message and apply its decision.
+
+        If `input_check` (an awaitable resolving to a classify_prompt_risk
+        result) is given, it runs concurrently with the planner call. History
+        and interview state are only touched once the check has passed; a
+        flagged message raises InputBlockedError and the planner result is
+        discarded.
+
+        Returns (history, state, previous_slots, decision); the caller saves
+        them with _save_session once the turn is complete.
+        """
+        # Track raw history for context if needed later.
+        history, state = await self._load_session(user_id)
+        msg_obj = self._build_user_turn(message, audio_metrics)
 
-        state = self._get_or_create_interview_state(user_id)
+        state = self._get_or_create_interview_state(user_id, state)
         # Snapshot slots before planner updates so we can detect newly filled ones.
         previous_slots = dict(state.slots)
 
-        decision = await self._call_planner(
-            user_id=user_id, user_message=message, state=state, history=history
+        planner_task = asyncio.ensure_future(
+            self._decide_turn(
+                user_id=user_id,
+                user_message=message,
+                state=state,
+                history=history + [msg_obj],
+            )
         )
+        try:
+            await self._await_input_check(input_check)
+        except BaseException:
+            planner_task.cancel()
+            raise
+        decision = await planner_task
+
+        history.append(msg_obj)
+        self._apply_planner_decision(state, decision)
+        return history, state, previous_slots, decision
 
-        # Apply any slot updates from the planner.
+    def _apply_planner_decision(self, state, decision):
+        """
+        Apply the planner's slot updates to the interview state.
+        """
         for key, value in decision.updated_slots.items():
             if key in state.slots:
                 state.slots[key] = value
@@ -1466,81 +4216,146 @@ class ChatAgent:
 
         state.goal_completed = decision.goal_completed
 
+    def _future_slot_to_deepen(self, decision, state, previous_slots):
+        """
+        If the candidate's last answer also filled a *future* slot in the
+        sequence, return that slot name so we can acknowledge it and ask them to
+        go a bit deeper. Returns None otherwise.
+        """
+        slot_index = {name: idx for idx, name in enumerate(INTERVIEW_SLOT_ORDER)}
+        newly_filled = []
+        for key, value in decision.updated_slots.items():
+            if key not in state.slots:
+                continue
+            before_val = previous_slots.get(key)
+            after_val = state.slots.get(key)
+            if (before_val is None or str(before_val).strip() == "") and after_val:
+                newly_filled.append(key)
+
+        target_idx = slot_index.get(decision.target_slot, -1) if decision.target_slot else -1
+        future_slots = [
+            s for s in newly_filled if slot_index.get(s, len(INTERVIEW_SLOT_ORDER)) > target_idx
+        ]
+        if future_slots and state.slots.get(future_slots[0]):
+            return future_slots[0]
+        return None
+
+    def _should_require_voice(self, target_slot):
+        """
+        For some project / behavioural slots, randomly require VOICE input next
+        so that we can collect prosodic features via the /voice endpoint.
+        """
+        voice_eligible_slots = {
+            "project_description",
+            "project_metric",
+            "project_bottleneck",
+            "project_solution",
+            "team_challenge",
+            "adaptability_example",
+            "leadership_example",
+        }
+        try:
+            return (
+                target_slot in voice_eligible_slots
+                and random.random() < 0.4  # ~40% of these will be voice-only
+            )
+        except Exception:
+            return False
+
+    def _turn_response(self, state, answer, tool_calls, next_input_mode):
+        return {
+            "answer": answer,
+            "interview_state": {
+                "slots": state.slots,
+                "goal_completed": state.goal_completed,
+                "ended": state.ended,
+            },
+            "tool_calls": tool_calls,
+            "next_input_mode": next_input_mode,
+        }
+
+    ##Entry point of the app
+    async def handle_message(
+        self,
+        user_id,
+        message,
+        audio_metrics=None,
+        input_check=None,
+    ):
+        """
+        Single entrypoint for the app/React frontend.
+        Router logic:
+        - Update interview state from the user's latest message (planner).
+        - Decide whether to ask a new question or end the interview.
+        - Optionally send the final answer to WhatsApp for the user.
+        - After goal completion and goodbye, send a structured report to the owner.
+        - Randomly require some answers (especially deeper project questions)
+          to be provided via voice, so that the prosody/OCEAN analyser has signal.
+
+        `input_check` is an optional awaitable risk check for `message` that is
+        raced against the planner call; InputBlockedError is raised if it flags
+        the message.
+        """
+        if await self.rag.load_resume(user_id) is None:
+            await self._await_input_check(input_check)
+            return self._resume_missing_response()
+        started = time.perf_counter()
+        history, state, previous_slots, decision = await self._plan_turn(
+            user_id, message, audio_metrics, input_check
+        )
+
         tool_calls = []
         # Default: text input for next turn, unless we decide to force voice.
         next_input_mode = "text"
+        target_slot = None
 
         if decision.next_action == "END":
             state.ended = True
+            self._discard_prefetched_question(user_id)
             answer = await self._speak_goodbye(state)
-            # After we say goodbye, prepare and send a report to the owner.
-            await self._send_owner_report(user_id, state)
         else:
             # Planner decided we still need to ask about some slot.
             target_slot = decision.target_slot or "goals"
             if target_slot == "greeting":
                 state.greeted = True
                 target_slot = "project_description"
-            answer = await self._speak_question_for_slot(
-                target_slot=target_slot, state=state, latest_user_message=message
+            answer = decision.question or await self._take_prefetched_question(
+                user_id, target_slot, state
             )
+            if answer is None:
+                answer = await self._speak_question_for_slot(
+                    user_id=user_id,
+                    target_slot=target_slot, state=state, latest_user_message=message,
+                    decision=decision,
+                )
 
-            # If the candidate's last answer also filled any *future* slots in the
-            # sequence, gently acknowledge and ask them to go a bit deeper on one.
-            slot_index = {name: idx for idx, name in enumerate(INTERVIEW_SLOT_ORDER)}
-            newly_filled = []
-            for key, value in decision.updated_slots.items():
-                if key not in state.slots:
-                    continue
-                before_val = previous_slots.get(key)
-                after_val = state.slots.get(key)
-                if (before_val is None or str(before_val).strip() == "") and after_val:
-                    newly_filled.append(key)
-
-            target_idx = slot_index.get(decision.target_slot, -1) if decision.target_slot else -1
-            future_slots = [
-                s for s in newly_filled if slot_index.get(s, len(INTERVIEW_SLOT_ORDER)) > target_idx
-            ]
-            if future_slots:
-                future_slot = future_slots[0]
-                future_value = state.slots.get(future_slot)
-                if future_value:
-                    deepen_text = await self._speak_deepen_future_slot(
-                        slot_name=future_slot,
-                        slot_value=future_value,
-                        state=state,
-                    )
-                    # Combine reaffirmation + original next question.
-                    answer = f"{deepen_text}\n\n{answer}"
-
-            # For some project / behavioural slots, randomly require VOICE input next
-            # so that we can collect prosodic features via the /voice endpoint.
-            voice_eligible_slots = {
-                "project_description",
-                "project_metric",
-                "project_bottleneck",
-                "project_solution",
-                "team_challenge",
-                "adaptability_example",
-                "leadership_example",
-            }
-            try:
-                if (
-                    decision.target_slot in voice_eligible_slots
-                    and random.random() < 0.4  # ~40% of these will be voice-only
-                ):
-                    next_input_mode = "voice"
-                    answer = (
-                        "I need to hear this one — please tap the Voice button and tell me about it.\n\n"
-                        f"{answer}"
-                    )
-            except Exception:
-                next_input_mode = "text"
+            future_slot = self._future_slot_to_deepen(decision, state, previous_slots)
+            if future_slot:
+                deepen_text = await self._speak_deepen_future_slot(
+                    user_id=user_id,
+                    slot_name=future_slot,
+                    slot_value=state.slots.get(future_slot),
+                    state=state,
+                )
+                # Combine reaffirmation + original next question.
+                answer = f"{deepen_text}\n\n{answer}"
+
+            if self._should_require_voice(decision.target_slot):
+                next_input_mode = "voice"
+                answer = f"{VOICE_REQUIRED_NOTICE}\n\n{answer}"
 
         # Greet the candidate by name once, if we have their name from the resume or slots.
-        answer = self._maybe_prefix_greeting(state, answer)
+        answer = self._maybe_prefix_greeting(state, answer, user_id)
+        self._record_turn_path(decision, started)
 
         history.append({"role": "assistant", "content": answer})
+        await self._save_session(user_id, history, state)
+        self._start_question_prefetch(user_id, state, target_slot)
+
+        if decision.next_action == "END":
+            # Queue the owner report only once the ended session is saved, so
+            # the report covers the goodbye and a retried END finds ended=True.
+            await self._queue_owner_report(user_id, state, history)
 
         # if send_to_whatsapp and phone:
         #     await self.send_answer_to_whatsapp(phone, answer)
@@ -1548,37 +4363,300 @@ class ChatAgent:
         #         {"tool": "notify_user_via_whatsapp", "target": phone}
         #     )
 
-        return {
-            "answer": answer,
-            "interview_state": {
-                "slots": state.slots,
-                "goal_completed": state.goal_completed,
-                "ended": state.ended,
-            },
-            "tool_calls": tool_calls,
+        return self._turn_response(state, answer, tool_calls, next_input_mode)
+
+    async def handle_message_stream(
+        self,
+        user_id,
+        message,
+        audio_metrics=None,
+        input_check=None,
+    ):
+        """
+        Streaming variant of handle_message for the /chat/stream endpoint.
+
+        Yields events as dicts:
+        - {"type": "state", ...}: planner decision + interview state, as soon as
+          the planner returns.
+        - {"type": "token", "text": ...}: answer text deltas, in display order.
+        - {"type": "done", **result}: the same payload handle_message returns.
+
+        The concatenated token texts equal the final "answer". InputBlockedError
+        is raised before any event if `input_check` flags the message.
+        """
+        if await self.rag.load_resume(user_id) is None:
+            await self._await_input_check(input_check)
+            yield {"type": "done", **self._resume_missing_response()}
+            return
+        started = time.perf_counter()
+        history, state, previous_slots, decision = await self._plan_turn(
+            user_id, message, audio_metrics, input_check
+        )
+
+        tool_calls = []
+        next_input_mode = "text"
+        future_slot = None
+        target_slot = None
+        if decision.next_action == "END":
+            state.ended = True
+        else:
+            target_slot = decision.target_slot or "goals"
+            if target_slot == "greeting":
+                state.greeted = True
+                target_slot = "project_description"
+            future_slot = self._future_slot_to_deepen(decision, state, previous_slots)
+            if self._should_require_voice(decision.target_slot):
+                next_input_mode = "voice"
+
+        yield {
+            "type": "state",
+            "next_action": decision.next_action,
+            "target_slot": target_slot,
             "next_input_mode": next_input_mode,
+            "interview_state": self._turn_response(state, "", tool_calls, next_input_mode)[
+                "interview_state"
+            ],
         }
 
+        parts: list[str] = []
+
+        def _emit(text):
+            parts.append(text)
+            return {"type": "token", "text": text}
+
+        # Build speaker prompts before the greeting marks its slot, exactly as
+        # handle_message sees the state.
+        ready_question = question_prompt = None
+        if decision.next_action == "END":
+            self._discard_prefetched_question(user_id)
+            prompts = [self._goodbye_prompt(state)]
+        else:
+            prompts = []
+            if future_slot:
+                prompts.append(
+                    self._deepen_prompt(user_id, future_slot, state.slots.get(future_slot), state)
+                )
+            ready_question = decision.question or await self._take_prefetched_question(
+                user_id, target_slot, state
+            )
+            if ready_question is None:
+                question_prompt = await self._question_prompt(user_id, target_slot, state, message)
+                prompts.append(question_prompt)
+
+        # Same layout as handle_message: greeting, voice notice, deepen text,
+        # then the question (or the goodbye), separated by blank lines.
+        preface = self._greeting_preface(state, user_id)
+        if preface:
+            yield _emit(preface)
+        if next_input_mode == "voice":
+            yield _emit(f"\n\n{VOICE_REQUIRED_NOTICE}" if parts else VOICE_REQUIRED_NOTICE)
+
+        for prompt in prompts:
+            separator_pending = bool(parts)
+            # Only the question speaker counts towards the turn path's tokens.
+            counted = decision if prompt is question_prompt else None
+            async for delta in self._stream_llm(*prompt, decision=counted):
+                if separator_pending:
+                    yield _emit("\n\n")
+                    separator_pending = False
+                yield _emit(delta)
+        if ready_question:
+            yield _emit(f"\n\n{ready_question}" if parts else ready_question)
+
+        answer = "".join(parts).rstrip()
+        self._record_turn_path(decision, started)
+        history.append({"role": "assistant", "content": answer})
+        await self._save_session(user_id, history, state)
+        self._start_question_prefetch(user_id, state, target_slot)
+
+        if decision.next_action == "END":
+            # Queue the owner report only once the ended session is saved.
+            await self._queue_owner_report(user_id, state, history)
+
+        yield {"type": "done", **self._turn_response(state, answer, tool_calls, next_input_mode)}
+
+
+def _as_binary_stream(source):
+    """
+    Accept a path, raw bytes or a binary file-like object and return something
+    the PDF/DOCX parsers can read from.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if hasattr(source, "read"):
+        return source
+    return open(source, "rb")
+
+
+def _pdf_to_text(source, max_pages=None):
+    """
+    Extract text from a PDF (path, bytes or binary stream), stopping after
+    `max_pages` pages. Top-level so it can run in DocumentExtractor's worker
+    processes.
+    """
+    text = []
+    stream = _as_binary_stream(source)
+    try:
+        reader = PyPDF2.PdfReader(stream)
+        for idx, page in enumerate(reader.pages):
+            if max_pages is not None and idx >= max_pages:
+                logging.warning("PDF has more than %d pages; ignoring the rest.", max_pages)
+                break
+            text.append(page.extract_text() or "")
+    finally:
+        if stream is not source:
+            stream.close()
+    return "\n\n".join(text)
+
+
+def _docx_to_text(source):
+    """
+    Extract text from a DOCX given as a path, bytes or binary stream.
+    """
+    stream = _as_binary_stream(source)
+    try:
+        return docx2txt.process(stream) or ""
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+class ExtractionPoolError(RuntimeError):
+    """
+    Raised by DocumentExtractor when the process pool failed underneath an
+    extraction (not the document itself), so the caller should retry later
+    rather than treat the document as unreadable.
+    """
+
+
+class DocumentExtractor:
+    """
+    Runs CPU-bound PDF/DOCX text extraction in a process pool so large resumes
+    parse in parallel across cores without stalling the event loop. Each file
+    gets a timeout (EXTRACT_TIMEOUT_SECONDS) and PDFs a page limit
+    (EXTRACT_MAX_PAGES). `mp_context` is passed to ProcessPoolExecutor (None:
+    the platform's default start method).
+    """
+
+    def __init__(
+        self,
+        max_workers=EXTRACT_MAX_WORKERS,
+        timeout=EXTRACT_TIMEOUT_SECONDS,
+        max_pages=EXTRACT_MAX_PAGES,
+        mp_context=None,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.mp_context = mp_context
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=self.mp_context
+                )
+            return self._pool
+
+    def _reset_pool(self, pool):
+        """
+        Drop a pool whose worker is stuck on a file past its timeout; the
+        next extraction starts a fresh one.
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        # ProcessPoolExecutor cannot cancel a running task, so stop its
+        # processes directly.
+        for proc in list(getattr(pool, "_processes", {}).values()):
+            proc.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract_text(self, source, ext):
+        """
+        Return the text of a PDF/DOCX document (`ext` like ".pdf"). `source` is
+        raw bytes or a path; bytes are handed to the worker process directly,
+        so nothing touches the disk. Raises RuntimeError if extraction times
+        out, and ExtractionPoolError if the pool keeps breaking under it.
+        """
+        ext = (ext or "").lower()
+        if isinstance(source, (bytearray, memoryview)):
+            source = bytes(source)
+        elif not isinstance(source, bytes):
+            source = str(source)
+        if ext == ".pdf":
+            func, args = _pdf_to_text, (source, self.max_pages)
+        elif ext in (".docx", ".doc"):
+            func, args = _docx_to_text, (source,)
+        else:
+            raise ValueError(f"Unsupported document type: {ext!r}")
+
+        loop = asyncio.get_running_loop()
+        broken = None
+        for _ in range(2):
+            pool = self._get_pool()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, func, *args), timeout=self.timeout
+                )
+            except asyncio.TimeoutError as exc:
+                METRICS.incr("extract.timeouts")
+                self._reset_pool(pool)
+                raise RuntimeError(
+                    f"Extracting {ext} document took longer than {self.timeout}s"
+                ) from exc
+            except BrokenProcessPool as exc:
+                # Another file's timeout reset (or a crashed worker) took the
+                # pool down mid-flight; this file was not at fault, so run it
+                # again on a fresh pool.
+                METRICS.incr("extract.pool_retries")
+                self._reset_pool(pool)
+                broken = exc
+        raise ExtractionPoolError(
+            f"Extraction process pool failed while extracting {ext} document"
+        ) from broken
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
 
 class Preprocess:
+    def __init__(self, extractor=None):
+        self.extractor = extractor or DocumentExtractor()
+
     def init(self):
         pass
 
         
     def extract_pdf(self,pdf_path, txt_path):
-        text = []
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                text.append(page.extract_text())
+        text = _pdf_to_text(pdf_path)
         with open(txt_path, "w", encoding="utf-8") as out:
-            out.write("\n\n".join(text))
+            out.write(text)
 
     def extract_docx_to_text(self,docx_path, txt_path):
-        text = docx2txt.process(docx_path) or ""
+        text = _docx_to_text(docx_path)
         with open(txt_path, "w", encoding="utf-8") as out:
             out.write(text)
 
+    async def aextract_text(self, source, ext):
+        """
+        Extract text from a PDF/DOCX (bytes or path) in the extractor's
+        process pool. Plain-text documents are decoded in place.
+        """
+        if (ext or "").lower() in (".pdf", ".docx", ".doc"):
+            return await self.extractor.extract_text(source, ext)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source).decode("utf-8", errors="replace")
+        return await asyncio.to_thread(
+            pathlib.Path(source).read_text, encoding="utf-8", errors="replace"
+        )
+
     def heuristic_prompt_injections(self,text):
         l_case = text.lower()
         for pat in SUSPICIOUS_PATTERNS:
@@ -1586,6 +4664,22 @@ class Preprocess:
                 return True
         return False
     
+    async def aclassify_prompt_risk(self, text):
+        """
+        Async classify_prompt_risk on the shared AsyncOpenAI client, so the
+        moderation round-trip can run concurrently with other work on the
+        event loop.
+        """
+        heuristic_flag = self.heuristic_prompt_injections(text)
+        try:
+            resp = await openai_clients.async_().moderations.create(
+                model = "omni-moderation-latest",
+                input=text
+            )
+        except Exception:
+            resp = None
+        return self._risk_result(heuristic_flag, resp)
+
     def classify_prompt_risk(self,text):
         """
         heuristic flag + small openai classifier to detect for the misuse
@@ -1593,12 +4687,17 @@ class Preprocess:
         heuristic_flag = self.heuristic_prompt_injections(text)
 
         try:
-            classifier = OpenAI()
+            classifier = _create_openai_client()
             resp = classifier.moderations.create(
                 model = "omni-moderation-latest",
                 input=text
             )
+        except Exception:
+            resp = None
+        return self._risk_result(heuristic_flag, resp)
 
+    def _risk_result(self, heuristic_flag, resp):
+        try:
             result = resp.results[0]
             harmful_flag = bool(getattr(result, "flagged", False))
 
@@ -1627,4 +4726,4 @@ class Preprocess:
             "heuristic_flag" : heuristic_flag,
             "harmful_flag"  : harmful_flag,
             "categories"    : categories
-        }    
+        }
@@ -2,13 +2,19 @@ import asyncio
 import json
 import logging
 import os
-import tempfile
-from pathlib import Path
+import sys
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
-from utils import GraphRAG, Preprocess
+from utils import (
+    CANONICAL_ROLES,
+    ChatAgent,
+    ExtractionPoolError,
+    GraphRAG,
+    Preprocess,
+    build_role_catalog,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +25,15 @@ AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 AWS_ENDPOINT_URL = os.environ.get("AWS_ENDPOINT_URL")
 S3_BUCKET_RESUMES = os.environ.get("S3_BUCKET_RESUMES", "recruitlens-resumes")
 SQS_QUEUE_URL = os.environ.get("SQS_QUEUE_URL")
+# Max resumes processed concurrently by this worker process.
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", "5"))
+# Initial visibility timeout; slow jobs get it extended by the same amount
+# every WORKER_VISIBILITY_TIMEOUT / 2 seconds while they are still running.
+WORKER_VISIBILITY_TIMEOUT = int(os.environ.get("WORKER_VISIBILITY_TIMEOUT", "60"))
+# How long processed receipts may wait before a partial delete batch is flushed.
+WORKER_DELETE_FLUSH_SECONDS = float(os.environ.get("WORKER_DELETE_FLUSH_SECONDS", "1.0"))
+
+SQS_MAX_BATCH = 10
 
 
 def _make_aws_clients():
@@ -45,42 +60,32 @@ async def _index_resume_from_s3(
     """
     logger.info("Worker: processing resume for user=%s key=%s", user_id, s3_key)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_dir = Path(tmpdir)
-        local_path = tmp_dir / Path(s3_key).name
+    # 1) Read the object body straight into memory; resumes are small and the
+    #    parsers work on bytes, so nothing is written to local disk.
+    try:
+        obj = await asyncio.to_thread(s3.get_object, Bucket=S3_BUCKET_RESUMES, Key=s3_key)
+        data = await asyncio.to_thread(obj["Body"].read)
+    except (BotoCoreError, ClientError) as exc:
+        logger.error("Worker: failed to download %s from S3: %s", s3_key, exc)
+        return
 
-        # 1) Download from S3
-        try:
-            s3.download_file(S3_BUCKET_RESUMES, s3_key, str(local_path))
-        except (BotoCoreError, ClientError) as exc:
-            logger.error("Worker: failed to download %s from S3: %s", s3_key, exc)
-            return
+    # 2) Mirror the same extraction logic as /upload in app.py; PDF/DOCX
+    #    parsing runs in the preprocessor's process pool.
+    try:
+        text = await preprocessor.aextract_text(data, ext)
+    except ExtractionPoolError:
+        # Not the document's fault: let the message be redelivered.
+        raise
+    except Exception as exc:
+        logger.error("Worker: failed to extract text for %s: %s", s3_key, exc)
+        return
 
-        # 2) Mirror the same extraction logic as /upload in app.py
-        index_path = local_path
-        ext_lower = (ext or "").lower()
-        try:
-            if ext_lower == ".pdf":
-                txt_path = local_path.with_name(f"{local_path.name}.txt")
-                preprocessor.extract_pdf(str(local_path), str(txt_path))
-                index_path = txt_path
-            elif ext_lower in (".docx", ".doc"):
-                txt_path = local_path.with_name(f"{local_path.name}.txt")
-                preprocessor.extract_docx_to_text(str(local_path), str(txt_path))
-                index_path = txt_path
-        except Exception as exc:
-            logger.error("Worker: failed to extract text for %s: %s", local_path, exc)
-            return
-
-        # 3) Index into GraphRAG under this user_id
-        async def _run():
-            await rag.index_document(str(index_path), user_id=user_id)
-
-        await _run()
-        logger.info("Worker: successfully indexed resume for user=%s", user_id)
-
-
-def _process_message(rag: GraphRAG, preprocessor: Preprocess, s3, message: dict) -> None:
+    # 3) Index into GraphRAG under this user_id
+    await rag.index_text(user_id, text)
+    logger.info("Worker: successfully indexed resume for user=%s", user_id)
+
+
+async def _process_message(rag: GraphRAG, preprocessor: Preprocess, s3, message: dict) -> None:
     body_raw = message.get("Body", "")
     try:
         payload = json.loads(body_raw)
@@ -100,7 +105,132 @@ def _process_message(rag: GraphRAG, preprocessor: Preprocess, s3, message: dict)
         logger.warning("Worker: resume_uploaded message missing s3_key: %r", payload)
         return
 
-    asyncio.run(_index_resume_from_s3(rag, preprocessor, s3, user_id, s3_key, ext))
+    await _index_resume_from_s3(rag, preprocessor, s3, user_id, s3_key, ext)
+
+
+async def _extend_visibility(sqs, receipt: str) -> None:
+    """
+    Heartbeat for a slow job: keep pushing the message's visibility timeout
+    out so SQS does not redeliver it while we are still working on it.
+    """
+    interval = max(WORKER_VISIBILITY_TIMEOUT / 2, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(
+                sqs.change_message_visibility,
+                QueueUrl=SQS_QUEUE_URL,
+                ReceiptHandle=receipt,
+                VisibilityTimeout=WORKER_VISIBILITY_TIMEOUT,
+            )
+        except (BotoCoreError, ClientError) as exc:
+            logger.warning("Worker: failed to extend visibility: %s", exc)
+
+
+async def _handle_message(
+    rag: GraphRAG,
+    preprocessor: Preprocess,
+    s3,
+    sqs,
+    message: dict,
+    processed: asyncio.Queue,
+) -> None:
+    receipt = message.get("ReceiptHandle")
+    heartbeat = asyncio.create_task(_extend_visibility(sqs, receipt)) if receipt else None
+    try:
+        await _process_message(rag, preprocessor, s3, message)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Worker: error processing message: %s", exc)
+        # Let SQS redrive policy / DLQ handle retries.
+        return
+    finally:
+        if heartbeat:
+            heartbeat.cancel()
+    if receipt:
+        await processed.put({"ReceiptHandle": receipt})
+
+
+async def _delete_processed(sqs, processed: asyncio.Queue) -> None:
+    """
+    Delete processed messages with delete_message_batch, flushing when a full
+    batch is ready or WORKER_DELETE_FLUSH_SECONDS after the first receipt.
+    """
+    while True:
+        batch = [await processed.get()]
+        deadline = asyncio.get_running_loop().time() + WORKER_DELETE_FLUSH_SECONDS
+        while len(batch) < SQS_MAX_BATCH:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(processed.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await _delete_batch(sqs, batch)
+
+
+async def _delete_batch(sqs, batch: list[dict]) -> None:
+    # Ids must be unique within one request.
+    entries = [dict(entry, Id=str(i)) for i, entry in enumerate(batch)]
+    try:
+        resp = await asyncio.to_thread(
+            sqs.delete_message_batch, QueueUrl=SQS_QUEUE_URL, Entries=entries
+        )
+    except (BotoCoreError, ClientError) as exc:
+        logger.error("Worker: failed to delete %d processed messages: %s", len(entries), exc)
+        return
+    for failure in resp.get("Failed", []):
+        logger.warning("Worker: failed to delete message: %s", failure)
+
+
+async def run_worker(rag: GraphRAG, preprocessor: Preprocess, s3, sqs) -> None:
+    """
+    Poll SQS for up to 10 messages at a time and process them concurrently,
+    keeping at most WORKER_CONCURRENCY jobs in flight. Jobs share GraphRAG's
+    Neo4j connection pool.
+    """
+    await rag.connect()
+    processed: asyncio.Queue = asyncio.Queue()
+    deleter = asyncio.create_task(_delete_processed(sqs, processed))
+    in_flight: set[asyncio.Task] = set()
+
+    try:
+        while True:
+            free = WORKER_CONCURRENCY - len(in_flight)
+            if free <= 0:
+                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                resp = await asyncio.to_thread(
+                    sqs.receive_message,
+                    QueueUrl=SQS_QUEUE_URL,
+                    MaxNumberOfMessages=min(SQS_MAX_BATCH, free),
+                    WaitTimeSeconds=20,
+                    VisibilityTimeout=WORKER_VISIBILITY_TIMEOUT,
+                )
+            except (BotoCoreError, ClientError) as exc:
+                logger.error("Worker: error receiving from SQS: %s", exc)
+                await asyncio.sleep(1)
+                continue
+
+            for msg in resp.get("Messages", []):
+                task = asyncio.create_task(
+                    _handle_message(rag, preprocessor, s3, sqs, msg, processed)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+    finally:
+        # Let running jobs finish and flush their deletes before exiting.
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        deleter.cancel()
+        remaining = []
+        while not processed.empty():
+            remaining.append(processed.get_nowait())
+        for i in range(0, len(remaining), SQS_MAX_BATCH):
+            await _delete_batch(sqs, remaining[i:i + SQS_MAX_BATCH])
+        await rag.close()
 
 
 def main() -> None:
@@ -112,36 +242,55 @@ def main() -> None:
     rag = GraphRAG()
     preprocessor = Preprocess()
 
-    logger.info("Worker: started. Polling queue: %s", SQS_QUEUE_URL)
+    logger.info(
+        "Worker: started. Polling queue: %s (concurrency=%d)", SQS_QUEUE_URL, WORKER_CONCURRENCY
+    )
 
-    while True:
+    try:
+        asyncio.run(run_worker(rag, preprocessor, s3, sqs))
+    except KeyboardInterrupt:
+        logger.info("Worker: stopped.")
+    finally:
+        preprocessor.extractor.close()
+
+
+def backfill_graph() -> None:
+    """
+    Write every stored resume into Neo4j in batched transactions.
+    """
+    async def _backfill() -> int:
+        rag = GraphRAG()
+        await rag.connect()
         try:
-            resp = sqs.receive_message(
-                QueueUrl=SQS_QUEUE_URL,
-                MaxNumberOfMessages=1,
-                WaitTimeSeconds=20,
-                VisibilityTimeout=60,
-            )
-        except (BotoCoreError, ClientError) as exc:
-            logger.error("Worker: error receiving from SQS: %s", exc)
-            continue
+            return await rag.backfill_graph()
+        finally:
+            await rag.close()
 
-        messages = resp.get("Messages", [])
-        if not messages:
-            continue
+    written = asyncio.run(_backfill())
+    logger.info("Worker: backfilled %d resumes into Neo4j", written)
 
-        for msg in messages:
-            receipt = msg.get("ReceiptHandle")
-            try:
-                _process_message(rag, preprocessor, s3, msg)
-                if receipt:
-                    sqs.delete_message(QueueUrl=SQS_QUEUE_URL, ReceiptHandle=receipt)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Worker: error processing message: %s", exc)
-                # Let SQS redrive policy / DLQ handle retries.
+
+def build_roles(roles_file: str | None = None) -> None:
+    """
+    Precompute sidebar skills/tips for canonical roles into the role catalog.
+    Roles come from `roles_file` (one per line) or utils.CANONICAL_ROLES.
+    """
+    if roles_file:
+        with open(roles_file, encoding="utf-8") as f:
+            roles = [line.strip() for line in f if line.strip()]
+    else:
+        roles = CANONICAL_ROLES
+    agent = ChatAgent(mcp_client=None, rag=None)
+    written = asyncio.run(build_role_catalog(agent, roles))
+    logger.info("Worker: wrote %d of %d roles to the role catalog", written, len(roles))
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["backfill-graph"]:
+        backfill_graph()
+    elif sys.argv[1:2] == ["build-role-catalog"]:
+        build_roles(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        main()
 
 